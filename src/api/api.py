@@ -5,7 +5,19 @@ Startup Investment Evaluation System - RAG Search & Analysis Generation
 
 import os
 import sys
-from collections import Counter
+import re
+import hashlib
+import functools
+import atexit
+import logging
+import logging.handlers
+import queue
+import urllib.parse
+import time
+import asyncio
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 
 from pathlib import Path
 from dotenv import load_dotenv
@@ -19,29 +31,158 @@ load_dotenv()
 
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
-from openai import OpenAI
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import List, Dict, Optional, Tuple
+from openai import AsyncOpenAI
+import anyio
+from cachetools import TTLCache
 import httpx
+import orjson
 from bs4 import BeautifulSoup
 
 # Import RAG pipeline
-from src.rag.rag_pipeline import VectorStore
+from src.rag.rag_pipeline import VectorStore, maximal_marginal_relevance
+from src.rag.batching import DynamicBatcher
+
+# Import response caches
+from src.cache import SemanticCache
 
 # Import prompt engineering module
 from src.prompts.dashboard_prompts import (
+    DASHBOARD_SECTIONS,
     get_dashboard_system_prompt,
     get_dashboard_user_prompt,
+    get_section_system_prompt,
+    build_section_prompt,
+    get_batched_dashboard_prompt,
+    split_batched_dashboards,
     format_context_for_prompt,
     get_chat_system_prompt,
     format_chat_context,
     get_retrieval_decision_prompt
 )
 
+# ========== SETTINGS ==========
+
+def clean_env_value(value):
+    if value is None:
+        return None
+    value = value.strip()
+    if (value.startswith("'") and value.endswith("'")) or \
+       (value.startswith('"') and value.endswith('"')):
+        value = value[1:-1]
+    return value
+
+
+class Settings(BaseSettings):
+    """API configuration, parsed once from the environment / .env at import."""
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", frozen=True)
+    
+    chroma_api_key: Optional[str] = None
+    chroma_tenant: Optional[str] = None
+    chroma_db: Optional[str] = None
+    openai_api_key: Optional[str] = None
+    thread_pool_size: int = 64
+    log_level: str = "INFO"
+    search_batch_size: int = 16
+    search_batch_delay: float = 0.05
+    openai_max_concurrency: int = 16
+    search_provider: str = "duckduckgo"
+    brave_api_key: Optional[str] = None
+    
+    @field_validator("*", mode="before")
+    @classmethod
+    def _strip_quotes(cls, value):
+        return clean_env_value(value) if isinstance(value, str) else value
+
+
+settings = Settings()
+
+# ========== LOGGING ==========
+
+def configure_logging(level: str = "INFO") -> logging.Logger:
+    """
+    Route API logs through a queue so request handlers never block on stdout.
+    
+    Records are handed to a QueueHandler; a background QueueListener writes them
+    to a StreamHandler. Safe to call more than once.
+    """
+    api_logger = logging.getLogger("investiq.api")
+    api_logger.setLevel(level.upper())
+    
+    if not api_logger.handlers:
+        log_queue = queue.SimpleQueue()
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+        )
+        listener = logging.handlers.QueueListener(log_queue, stream_handler)
+        listener.start()
+        atexit.register(listener.stop)
+        
+        api_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        api_logger.propagate = False
+    
+    return api_logger
+
+
+logger = configure_logging(settings.log_level)
+
+# ========== LIFECYCLE ==========
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Initialize shared clients before serving and release them on shutdown.
+    
+    The vector store and OpenAI client are created eagerly so the first request
+    does not pay for the Chroma handshake, and misconfigured credentials fail
+    the startup instead of the first request.
+    """
+    # asyncio.to_thread uses the loop's default executor; sync endpoints use anyio's limiter
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE)
+    )
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREAD_POOL_SIZE
+    
+    app.state.vector_store = await asyncio.to_thread(get_vector_store)
+    app.state.openai_client = get_openai_client()
+    
+    # Open the pooled OpenAI connection before the first real request
+    try:
+        await app.state.openai_client.models.list()
+    except Exception as e:
+        logger.warning("OpenAI warm-up request failed: %s", e)
+    
+    # Open the embeddings connection and pre-fill the query embedding cache
+    try:
+        await asyncio.to_thread(app.state.vector_store.embed_queries, list(DASHBOARD_TOPIC_QUERIES))
+    except Exception as e:
+        logger.warning("Embedding warm-up request failed: %s", e)
+    
+    app.state.company_list_task = asyncio.create_task(_refresh_company_list_periodically())
+    
+    yield
+    
+    app.state.company_list_task.cancel()
+    
+    global openai_client, http_client
+    await app.state.openai_client.close()
+    openai_client = None
+    
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+
+
 app = FastAPI(
     title="InvestIQ API - RAG-Powered Investment Analysis",
     description="Semantic search and AI-generated investment analysis using RAG",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -54,28 +195,66 @@ app.add_middleware(
 # Global instances
 vector_store = None
 openai_client = None
+http_client = None
+
+# Worker threads available for blocking ChromaDB/OpenAI calls
+THREAD_POOL_SIZE = settings.thread_pool_size
+
+# Upper bound on in-flight OpenAI calls from parallel section generation
+openai_semaphore = asyncio.Semaphore(settings.openai_max_concurrency)
+SECTION_MAX_TOKENS = 600
+
+# Dashboard context selection: candidates fetched per selected chunk, MMR
+# relevance/diversity trade-off, and per-chunk character budget in the prompt
+MMR_FETCH_FACTOR = 2
+MMR_LAMBDA = 0.5
+DASHBOARD_CHUNK_CHARS = 800
+BATCHED_DASHBOARD_MAX_TOKENS = 16000  # gpt-4o output limit is 16384
+# Company-independent dashboard sub-queries; embedded once at startup
+DASHBOARD_TOPIC_QUERIES = (
+    "funding investors series round capital valuation",
+    "business model revenue pricing customers GTM",
+    "founders CEO leadership team executives",
+    "hiring jobs positions growth expansion",
+    "product platform features technology AI",
+    "customers clients partnerships enterprise",
+    "awards press recognition"
+)
 
+# Company list snapshot, refreshed in the background (see refresh_company_list)
+COMPANY_LIST_TTL = 300  # seconds
+# How long a company's chunks stay in memory for local vector search (per worker).
+# Staleness: a re-ingest that changes the company's registered chunk count rebuilds
+# the index on the next search; one that keeps the count (or a registry this
+# process cannot see) is picked up within this window
+LOCAL_INDEX_TTL = 300  # seconds
+_companies_cache = {"data": None, "ts": 0.0, "vector_db_connected": None}
+
+# Semantic response caches (24h TTL)
+dashboard_cache = SemanticCache(distance_threshold=0.05, ttl_seconds=24 * 3600)
+search_cache = SemanticCache(distance_threshold=0.05, ttl_seconds=24 * 3600)
+# First-turn chat answers; shorter TTL since they may include live web results
+chat_cache = SemanticCache(distance_threshold=0.05, ttl_seconds=3600)
+# Generated dashboards keyed on the exact retrieved content; catches repeats the
+# semantic cache misses and never serves a report built from different chunks
+dashboard_content_cache = TTLCache(maxsize=1024, ttl=3600)
+
+# Retrieved chunks per submitted Batch API job, used to build cache metadata
+# once the batch completes (batch_id -> {company_name: chunks})
+_dashboard_batches: Dict[str, Dict[str, List[Dict]]] = {}
+_cached_batches = set()
 
-# ========== UTILITY FUNCTIONS ==========
-
-def clean_env_value(value):
-    if value is None:
-        return None
-    value = value.strip()
-    if (value.startswith("'") and value.endswith("'")) or \
-       (value.startswith('"') and value.endswith('"')):
-        value = value[1:-1]
-    return value
 
+# ========== UTILITY FUNCTIONS ==========
 
 def get_vector_store():
     """Get or create vector store instance."""
     global vector_store
     if vector_store is None:
-        api_key = clean_env_value(os.getenv('CHROMA_API_KEY'))
-        tenant = clean_env_value(os.getenv('CHROMA_TENANT'))
-        database = clean_env_value(os.getenv('CHROMA_DB'))
-        openai_api_key = clean_env_value(os.getenv('OPENAI_API_KEY'))
+        api_key = settings.chroma_api_key
+        tenant = settings.chroma_tenant
+        database = settings.chroma_db
+        openai_api_key = settings.openai_api_key
         
         if not all([api_key, tenant, database, openai_api_key]):
             raise RuntimeError("Missing credentials in .env")
@@ -84,58 +263,244 @@ def get_vector_store():
             api_key=api_key,
             tenant=tenant,
             database=database,
-            openai_api_key=openai_api_key
+            openai_api_key=openai_api_key,
+            local_index_ttl=LOCAL_INDEX_TTL
         )
     return vector_store
 
 
 def get_openai_client():
-    """Get OpenAI client."""
+    """Get async OpenAI client backed by a pooled HTTP/2 connection."""
     global openai_client
     if openai_client is None:
-        api_key = clean_env_value(os.getenv('OPENAI_API_KEY'))
+        api_key = settings.openai_api_key
         if not api_key:
             raise RuntimeError("Missing OPENAI_API_KEY in .env")
-        openai_client = OpenAI(api_key=api_key)
+        openai_client = AsyncOpenAI(
+            api_key=api_key,
+            http_client=httpx.AsyncClient(
+                http2=True,
+                # Keep the multiplexed connection open between bursts (httpx default: 5s)
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=50,
+                    keepalive_expiry=60.0
+                ),
+                timeout=httpx.Timeout(60.0, connect=5.0)
+            )
+        )
     return openai_client
 
 
-def retrieve_context_for_dashboard(company_name: str, top_k: int = 15) -> List[Dict]:
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client for outbound web requests (kept-alive connections)."""
+    global http_client
+    if http_client is None:
+        http_client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(
+                max_keepalive_connections=20,
+                max_connections=100,
+                keepalive_expiry=30.0
+            ),
+            headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            },
+            follow_redirects=True
+        )
+    return http_client
+
+
+def refresh_company_list() -> List[str]:
+    """
+    Reload the company list from the vector store into the snapshot.
+    
+    Also records whether ChromaDB itself answered, for /health: the list can
+    come from the registry file alone, so a cheap count() probes the collection.
+    """
+    vs = get_vector_store()
+    try:
+        companies = sorted(vs.get_company_list())
+    except Exception:
+        _companies_cache["vector_db_connected"] = False
+        raise
+    try:
+        vs.count_chunks()
+        connected = True
+    except Exception as e:
+        logger.warning("Vector DB probe failed: %s", e)
+        connected = False
+    _companies_cache["data"] = companies
+    _companies_cache["ts"] = time.time()
+    _companies_cache["vector_db_connected"] = connected
+    return companies
+
+
+def cached_company_list(ttl: int = COMPANY_LIST_TTL) -> List[str]:
+    """Get the company list snapshot, refreshing it if missing or older than ttl seconds."""
+    if _companies_cache["data"] is None or time.time() - _companies_cache["ts"] > ttl:
+        return refresh_company_list()
+    return _companies_cache["data"]
+
+
+@functools.lru_cache(maxsize=4)
+def _company_matcher(companies: Tuple[str, ...]) -> Tuple[re.Pattern, Dict[str, str]]:
+    """
+    Compile one regex matching any company name ("acme-ai" or "acme ai").
+    
+    Longer names come first in the alternation so they win over their prefixes.
+    Returns the pattern and a map from matched lowercase text to company name.
+    """
+    variants = {}
+    for comp in companies:
+        for variant in (comp.lower(), comp.replace("-", " ").lower()):
+            variants.setdefault(variant, comp)
+    pattern = re.compile("|".join(
+        re.escape(v) for v in sorted(variants, key=len, reverse=True)
+    ))
+    return pattern, variants
+
+
+def match_company(message: str, companies: List[str]) -> Optional[str]:
+    """Return the first company mentioned in a message, in a single scan."""
+    if not companies:
+        return None
+    pattern, variants = _company_matcher(tuple(companies))
+    match = pattern.search(message.lower())
+    return variants[match.group(0)] if match else None
+
+
+async def _refresh_company_list_periodically(interval: int = COMPANY_LIST_TTL):
+    """Keep the company list snapshot warm so requests never wait on ChromaDB."""
+    while True:
+        try:
+            await asyncio.to_thread(refresh_company_list)
+        except Exception as e:
+            logger.warning("Company list refresh failed: %s", e)
+        await asyncio.sleep(interval)
+
+
+async def _search_queries_concurrently(
+    vs: VectorStore,
+    company_name: str,
+    queries: List[str],
+    top_k: int
+) -> List[List[Dict]]:
+    """Run one search per query concurrently; failed queries contribute no results."""
+    results = await asyncio.gather(
+        *[vs.asearch(company_name=company_name, query=query, top_k=top_k) for query in queries],
+        return_exceptions=True
+    )
+    
+    results_per_query = []
+    for query, result in zip(queries, results):
+        if isinstance(result, Exception):
+            logger.error("Dashboard retrieval error for '%s': %s", query, result)
+            continue
+        results_per_query.append(result)
+    return results_per_query
+
+
+async def retrieve_context_for_dashboard(company_name: str, top_k: int = 15) -> List[Dict]:
     """Retrieve context for dashboard."""
     vs = get_vector_store()
     
-    queries = [
-        f"{company_name} company overview mission",
-        "funding investors series round capital valuation",
-        "business model revenue pricing customers GTM",
-        "founders CEO leadership team executives",
-        "hiring jobs positions growth expansion",
-        "product platform features technology AI",
-        "customers clients partnerships enterprise",
-        "awards press recognition"
-    ]
+    queries = [f"{company_name} company overview mission", *DASHBOARD_TOPIC_QUERIES]
+    
+    # One batched embedding request + one multi-vector ChromaDB query for all queries.
+    # Over-fetch so MMR has candidates to diversify from.
+    top_k_per_query = max(2, top_k * MMR_FETCH_FACTOR // len(queries))
+    try:
+        results_per_query = await asyncio.to_thread(
+            vs.multi_search,
+            company_name,
+            queries,
+            top_k_per_query,
+            include_embeddings=True
+        )
+    except Exception as e:
+        logger.warning("Batched dashboard retrieval failed, searching per query: %s", e)
+        results_per_query = await _search_queries_concurrently(
+            vs, company_name, queries, top_k_per_query
+        )
+    
+    # Deduplicate across queries, keeping the closest match of each chunk
+    best = {}
+    for results in results_per_query:
+        for result in results:
+            key = (result['source_type'], result['chunk_index'])
+            prev = best.get(key)
+            if prev is None or result.get('distance', 999) < prev.get('distance', 999):
+                best[key] = result
+    
+    # Relevant but non-redundant chunks; vectors are only needed for selection
+    selected = maximal_marginal_relevance(list(best.values()), top_k, lambda_mult=MMR_LAMBDA)
+    for result in selected:
+        result.pop('embedding', None)
+    return selected
+
+
+def _embed_batch(texts: List[str]) -> List[List[float]]:
+    """Embed a batch of texts in one request (query embedding cache applies)."""
+    return get_vector_store().embed_queries(texts)
+
+
+def _search_batch(requests: List[Dict]) -> List:
+    """
+    Run a batch of searches with one ChromaDB query per (company, source filter).
+    
+    Each request dict carries company_name, query, top_k, filter_by_source_type
+    and query_embedding. A failing group yields its exception for only its
+    own requests.
+    """
+    vs = get_vector_store()
     
-    all_results = []
-    seen_chunks = set()
+    groups = defaultdict(list)
+    for idx, req in enumerate(requests):
+        groups[(req['company_name'], req['filter_by_source_type'])].append(idx)
     
-    for query in queries:
+    results = [None] * len(requests)
+    for (company_name, filter_source), indices in groups.items():
+        group = [requests[i] for i in indices]
+        embeddings = [req['query_embedding'] for req in group]
         try:
-            results = vs.search(
-                company_name=company_name,
-                query=query,
-                top_k=max(2, top_k // len(queries))
+            per_query = vs.multi_search(
+                company_name,
+                [req['query'] for req in group],
+                max(req['top_k'] for req in group),
+                filter_source,
+                query_embeddings=embeddings if all(e is not None for e in embeddings) else None
             )
-            
-            for result in results:
-                chunk_id = f"{result['source_type']}_{result['chunk_index']}"
-                if chunk_id not in seen_chunks:
-                    all_results.append(result)
-                    seen_chunks.add(chunk_id)
-        except:
+        except Exception as e:
+            for i in indices:
+                results[i] = e
             continue
+        
+        for i, req, found in zip(indices, group, per_query):
+            results[i] = found[:req['top_k']]
     
-    all_results.sort(key=lambda x: x.get('distance', 999))
-    return all_results[:top_k]
+    return results
+
+
+embedding_batcher = DynamicBatcher(
+    _embed_batch,
+    max_batch_size=settings.search_batch_size,
+    max_delay=settings.search_batch_delay
+)
+search_batcher = DynamicBatcher(
+    _search_batch,
+    max_batch_size=settings.search_batch_size,
+    max_delay=settings.search_batch_delay
+)
+
+
+async def embed_cache_key(text: str) -> Optional[List[float]]:
+    """Embed a cache key; returns None if embedding fails so callers skip the cache."""
+    try:
+        return await embedding_batcher.submit(text)
+    except Exception as e:
+        logger.warning("Cache key embedding failed: %s", e)
+        return None
 
 
 def format_payload(company_name: str, chunks: List[Dict]) -> str:
@@ -180,6 +545,18 @@ class DashboardRequest(BaseModel):
     max_tokens: int = Field(4000, ge=1000, le=8000)
     temperature: float = Field(0.3, ge=0.0, le=1.0)
     model: str = Field("gpt-4o")
+    parallel_sections: bool = Field(False, description="Generate the 8 sections as parallel calls")
+    section_model: Optional[str] = Field(None, description="Model for parallel sections (defaults to model)")
+
+
+class DashboardBatchRequest(BaseModel):
+    company_names: List[str] = Field(..., min_length=1)
+    top_k: int = Field(15, ge=5, le=30)
+    max_tokens: int = Field(4000, ge=1000, le=8000)
+    temperature: float = Field(0.3, ge=0.0, le=1.0)
+    model: str = Field("gpt-4o")
+    # Dashboards generated per LLM request (batch prompting); 1 = one request per company
+    companies_per_request: int = Field(1, ge=1, le=5)
 
 
 class DashboardResponse(BaseModel):
@@ -236,7 +613,10 @@ def root():
             "stats": "GET /stats - Vector store statistics",
             "rag_search": "GET/POST /rag/search - Semantic search through company data",
             "dashboard_rag": "GET/POST /dashboard/rag - Generate investment analysis",
-            "chat": "POST /chat - Chat interface with agentic RAG (LLM decides when to retrieve)"
+            "dashboard_rag_stream": "GET/POST /dashboard/rag/stream - Stream investment analysis (SSE)",
+            "dashboard_rag_batch": "POST /dashboard/rag/batch, GET /dashboard/rag/batch/{batch_id} - Bulk generation via OpenAI Batch API",
+            "chat": "POST /chat - Chat interface with agentic RAG (LLM decides when to retrieve)",
+            "chat_stream": "POST /chat/stream - Stream chat responses (SSE, sources first)"
         },
         "docs": "http://localhost:8000/docs",
         "test_urls": {
@@ -250,31 +630,36 @@ def root():
 
 @app.get("/health")
 def health():
+    # Reports the status recorded by the last company list refresh, so probes
+    # only reach ChromaDB when the snapshot is stale
     try:
-        vs = get_vector_store()
-        companies = vs.get_company_list()
-        return {
-            "status": "ok",
-            "vector_db_connected": True,
-            "companies_indexed": len(companies)
-        }
-    except:
-        return {"status": "ok", "vector_db_connected": False}
+        companies = cached_company_list()
+        connected = _companies_cache["vector_db_connected"]
+    except Exception:
+        logger.exception("Health check: vector DB unavailable")
+        connected = False
+    if not connected:
+        return ORJSONResponse(
+            status_code=503,
+            content={"status": "degraded", "vector_db_connected": False}
+        )
+    return {
+        "status": "ok",
+        "vector_db_connected": True,
+        "companies_indexed": len(companies)
+    }
 
 
 @app.get("/companies")
 def list_companies():
     """List all companies."""
-    companies = []
-    
-    # Try to get from vector DB
+    # Served from the in-memory snapshot; ChromaDB is only hit when it is stale
     try:
-        vs = get_vector_store()
-        companies = vs.get_company_list()
-        return sorted(companies)
-    except Exception as e:
-        print(f"Error getting companies: {e}")
-        return []
+        companies = cached_company_list()
+    except Exception:
+        logger.exception("Error getting companies")
+        raise HTTPException(status_code=503, detail="Vector database unavailable")
+    return list(companies)
 
 
 # ========== RAG SEARCH ==========
@@ -283,18 +668,35 @@ def list_companies():
 async def search_post(request: SearchRequest):
     """RAG Search (POST) - Semantic search through company data"""
     try:
-        vs = get_vector_store()
-        
         filter_source = request.filter_source
         if filter_source in ["string", "null", ""]:
             filter_source = None
         
-        results = vs.search(
-            company_name=request.company_name,
-            query=request.query,
-            top_k=request.top_k,
-            filter_by_source_type=filter_source
-        )
+        # Check semantic cache (the query embedding is reused for the search on a miss)
+        cache_namespace = f"search:{request.company_name}:{request.top_k}:{filter_source}"
+        query_embedding = await embed_cache_key(request.query)
+        
+        cached = None
+        if query_embedding is not None:
+            cached = search_cache.check(query_embedding, namespace=cache_namespace)
+        
+        if cached:
+            results = cached['response']
+        else:
+            results = await search_batcher.submit({
+                'company_name': request.company_name,
+                'query': request.query,
+                'top_k': request.top_k,
+                'filter_by_source_type': filter_source,
+                'query_embedding': query_embedding
+            })
+            if query_embedding is not None and results:
+                search_cache.store(
+                    prompt=request.query,
+                    response=results,
+                    vector=query_embedding,
+                    namespace=cache_namespace
+                )
         
         return SearchResponse(
             company_name=request.company_name,
@@ -303,8 +705,7 @@ async def search_post(request: SearchRequest):
             total_results=len(results)
         )
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Search failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -327,14 +728,152 @@ async def search_get(
 
 # ========== ANALYSIS GENERATION ==========
 
+_SECTION_MARKERS = tuple(f"## {name}" for name, _ in DASHBOARD_SECTIONS)
+_SECTION_RE = re.compile("|".join(map(re.escape, _SECTION_MARKERS)))
+
+
+def _dashboard_cache_namespace(request: DashboardRequest) -> str:
+    """Cache namespace for a dashboard request's company and generation parameters"""
+    # The company is part of the namespace: similar names (e.g. "acme-ai" and
+    # "acme-labs") embed within the match threshold and must not share dashboards
+    namespace = (
+        f"dashboard:{request.company_name.strip().lower()}:{request.model}:{request.top_k}:"
+        f"{request.max_tokens}:{request.temperature}"
+    )
+    if request.parallel_sections:
+        namespace += f":sections:{request.section_model or request.model}"
+    return namespace
+
+
+def _dashboard_content_key(request: DashboardRequest, chunks: List[Dict]) -> Tuple[str, str, str]:
+    """Exact cache key from the company, generation parameters and retrieved chunk ids"""
+    content_hash = hashlib.blake2b(
+        b"\n".join(sorted(f"{c['source_type']}:{c['chunk_index']}".encode() for c in chunks)),
+        digest_size=16
+    ).hexdigest()
+    return (request.company_name, _dashboard_cache_namespace(request), content_hash)
+
+
+def _dashboard_messages(company_name: str, chunks: List[Dict]) -> List[Dict]:
+    """Build the chat messages for dashboard generation from retrieved chunks"""
+    # Format context using prompt engineering module
+    formatted_context = format_context_for_prompt(
+        company_name, chunks, max_chunk_chars=DASHBOARD_CHUNK_CHARS
+    )
+    
+    # Generate prompts using prompt engineering module
+    return [
+        {"role": "system", "content": get_dashboard_system_prompt()},
+        {"role": "user", "content": get_dashboard_user_prompt(company_name, formatted_context)}
+    ]
+
+
+async def _generate_dashboard_sections(
+    client,
+    request: DashboardRequest,
+    chunks: List[Dict]
+) -> Tuple[str, int]:
+    """
+    Generate the dashboard as one concurrent call per section.
+    
+    Each call sees the full retrieved context but writes a single section, so
+    wall-clock time is roughly that of the longest section. Sections are
+    joined in the required order; a missing header is added back.
+    
+    Returns:
+        Tuple of (dashboard markdown, total tokens used)
+    """
+    formatted_context = format_context_for_prompt(
+        request.company_name, chunks, max_chunk_chars=DASHBOARD_CHUNK_CHARS
+    )
+    model = request.section_model or request.model
+    max_tokens = max(SECTION_MAX_TOKENS, request.max_tokens // len(DASHBOARD_SECTIONS))
+    
+    async def generate(section_name: str):
+        async with openai_semaphore:
+            return await client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": get_section_system_prompt(section_name)},
+                    {"role": "user", "content": build_section_prompt(
+                        section_name, request.company_name, formatted_context
+                    )}
+                ],
+                max_tokens=max_tokens,
+                temperature=request.temperature
+            )
+    
+    responses = await asyncio.gather(*[generate(name) for name, _ in DASHBOARD_SECTIONS])
+    
+    parts = []
+    for (name, _), response in zip(DASHBOARD_SECTIONS, responses):
+        content = (response.choices[0].message.content or "").strip()
+        header = f"## {name}"
+        if not content.startswith(header):
+            content = f"{header}\n\n{content}"
+        parts.append(content)
+    
+    total_tokens = sum(response.usage.total_tokens for response in responses)
+    return "\n\n".join(parts), total_tokens
+
+
+def _dashboard_metadata(
+    request: DashboardRequest,
+    chunks: List[Dict],
+    dashboard: str,
+    total_tokens: Optional[int]
+) -> Dict:
+    """Verify a generated dashboard and build its response metadata"""
+    # Single pass over the dashboard for all section markers
+    sections = len(set(_SECTION_RE.findall(dashboard)))
+    not_disclosed = dashboard.count("Not disclosed")
+    
+    logger.info(
+        "✓ Generated | Sections: %d/%d | 'Not disclosed': %dx",
+        sections, len(_SECTION_MARKERS), not_disclosed
+    )
+    
+    return {
+        'chunks_retrieved': len(chunks),
+        'sources_used': list({c['source_type'] for c in chunks}),
+        'model': request.model,
+        'generation': 'parallel_sections' if request.parallel_sections else 'single_call',
+        'tokens_used': {'total': total_tokens},
+        'not_disclosed_count': not_disclosed,
+        'sections_present': sections,
+        'status': 'success'
+    }
+
+
+def _sse_event(data: Dict, event: Optional[str] = None) -> str:
+    """Encode one Server-Sent Events frame"""
+    frame = f"event: {event}\n" if event else ""
+    return f"{frame}data: {orjson.dumps(data).decode()}\n\n"
+
+
 @app.post("/dashboard/rag", response_model=DashboardResponse)
 async def dashboard_post(request: DashboardRequest):
     """Generate Investment Analysis Report (POST) - RAG Pipeline"""
     try:
-        print(f"\n🚀 Generating dashboard: {request.company_name}")
+        logger.info("🚀 Generating dashboard: %s", request.company_name)
+        
+        # Check semantic cache
+        cache_namespace = _dashboard_cache_namespace(request)
+        key_embedding = await embed_cache_key(request.company_name)
+        
+        if key_embedding is not None:
+            cached = dashboard_cache.check(key_embedding, namespace=cache_namespace)
+            if cached:
+                logger.info("✓ Cache hit (distance %.4f)", cached['distance'])
+                return DashboardResponse(
+                    company_name=request.company_name,
+                    dashboard=cached['response'],
+                    metadata={**cached['metadata'], 'status': 'cache_hit'},
+                    context_sources=cached['metadata'].get('sources_used', [])
+                )
         
         # Retrieve context
-        chunks = retrieve_context_for_dashboard(request.company_name, request.top_k)
+        chunks = await retrieve_context_for_dashboard(request.company_name, request.top_k)
         
         if not chunks:
             return DashboardResponse(
@@ -344,70 +883,203 @@ async def dashboard_post(request: DashboardRequest):
                 context_sources=[]
             )
         
-        print(f"✓ Retrieved {len(chunks)} chunks")
-        
-        # Format context using prompt engineering module
-        formatted_context = format_context_for_prompt(request.company_name, chunks)
+        logger.info("✓ Retrieved %d chunks", len(chunks))
         
-        # Generate prompts using prompt engineering module
-        system_prompt = get_dashboard_system_prompt()
-        user_prompt = get_dashboard_user_prompt(request.company_name, formatted_context)
+        content_key = _dashboard_content_key(request, chunks)
+        cached = dashboard_content_cache.get(content_key)
+        if cached:
+            logger.info("✓ Content cache hit")
+            dashboard, metadata = cached
+            return DashboardResponse(
+                company_name=request.company_name,
+                dashboard=dashboard,
+                metadata={**metadata, 'status': 'cache_hit'},
+                context_sources=metadata['sources_used']
+            )
         
         # Call GPT
         client = get_openai_client()
         
-        response = client.chat.completions.create(
-            model=request.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=request.max_tokens,
-            temperature=request.temperature
-        )
-        
-        dashboard = response.choices[0].message.content
+        if request.parallel_sections:
+            dashboard, total_tokens = await _generate_dashboard_sections(client, request, chunks)
+        else:
+            response = await client.chat.completions.create(
+                model=request.model,
+                messages=_dashboard_messages(request.company_name, chunks),
+                max_tokens=request.max_tokens,
+                temperature=request.temperature
+            )
+            dashboard = response.choices[0].message.content
+            total_tokens = response.usage.total_tokens
         
         # Verify
-        sections = sum(1 for s in [
-            "## Company Overview", "## Business Model and GTM",
-            "## Funding & Investor Profile", "## Growth Momentum",
-            "## Visibility & Market Sentiment", "## Risks and Challenges",
-            "## Outlook", "## Disclosure Gaps"
-        ] if s in dashboard)
-        
-        not_disclosed = dashboard.count("Not disclosed")
+        metadata = _dashboard_metadata(request, chunks, dashboard, total_tokens)
+        dashboard_content_cache[content_key] = (dashboard, metadata)
         
-        print(f"✓ Generated | Sections: {sections}/8 | 'Not disclosed': {not_disclosed}x")
+        if key_embedding is not None:
+            dashboard_cache.store(
+                prompt=request.company_name,
+                response=dashboard,
+                vector=key_embedding,
+                namespace=cache_namespace,
+                metadata=metadata
+            )
         
         return DashboardResponse(
             company_name=request.company_name,
             dashboard=dashboard,
-            metadata={
-                'chunks_retrieved': len(chunks),
-                'sources_used': list(set(c['source_type'] for c in chunks)),
-                'model': request.model,
-                'tokens_used': {'total': response.usage.total_tokens},
-                'not_disclosed_count': not_disclosed,
-                'sections_present': sections,
-                'status': 'success'
-            },
-            context_sources=list(set(c['source_type'] for c in chunks))
+            metadata=metadata,
+            context_sources=metadata['sources_used']
         )
         
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Dashboard generation failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/dashboard/rag/stream")
+async def dashboard_stream_post(request: DashboardRequest):
+    """
+    Generate Investment Analysis Report as Server-Sent Events (POST)
+    
+    Emits a `delta` event per generated text fragment as GPT produces it,
+    then a single `done` event carrying the same metadata and context
+    sources as the JSON endpoint. Errors after streaming starts are sent
+    as an `error` event. Always generated as a single call; `parallel_sections`
+    is ignored, and the result is cached and labelled as a single-call dashboard.
+    """
+    # The stream is one monolithic call, so cache namespace and metadata must not
+    # claim a parallel-sections result
+    request = request.model_copy(update={"parallel_sections": False})
+    
+    async def event_stream():
+        try:
+            logger.info("🚀 Streaming dashboard: %s", request.company_name)
+            
+            # Check semantic cache
+            cache_namespace = _dashboard_cache_namespace(request)
+            key_embedding = await embed_cache_key(request.company_name)
+            
+            if key_embedding is not None:
+                cached = dashboard_cache.check(key_embedding, namespace=cache_namespace)
+                if cached:
+                    logger.info("✓ Cache hit (distance %.4f)", cached['distance'])
+                    yield _sse_event({'content': cached['response']}, event="delta")
+                    yield _sse_event({
+                        'metadata': {**cached['metadata'], 'status': 'cache_hit'},
+                        'context_sources': cached['metadata'].get('sources_used', [])
+                    }, event="done")
+                    return
+            
+            # Retrieve context
+            chunks = await retrieve_context_for_dashboard(request.company_name, request.top_k)
+            
+            if not chunks:
+                yield _sse_event({'content': _empty_dashboard(request.company_name)}, event="delta")
+                yield _sse_event({
+                    'metadata': {"status": "no_context", "chunks_retrieved": 0},
+                    'context_sources': []
+                }, event="done")
+                return
+            
+            logger.info("✓ Retrieved %d chunks", len(chunks))
+            
+            content_key = _dashboard_content_key(request, chunks)
+            cached = dashboard_content_cache.get(content_key)
+            if cached:
+                logger.info("✓ Content cache hit")
+                dashboard, metadata = cached
+                yield _sse_event({'content': dashboard}, event="delta")
+                yield _sse_event({
+                    'metadata': {**metadata, 'status': 'cache_hit'},
+                    'context_sources': metadata['sources_used']
+                }, event="done")
+                return
+            
+            # Call GPT with streaming, forwarding fragments as they arrive
+            client = get_openai_client()
+            
+            stream = await client.chat.completions.create(
+                model=request.model,
+                messages=_dashboard_messages(request.company_name, chunks),
+                max_tokens=request.max_tokens,
+                temperature=request.temperature,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            
+            parts = []
+            total_tokens = None
+            
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    total_tokens = chunk.usage.total_tokens
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    parts.append(content)
+                    yield _sse_event({'content': content}, event="delta")
+            
+            dashboard = "".join(parts)
+            
+            # Verify
+            metadata = _dashboard_metadata(request, chunks, dashboard, total_tokens)
+            dashboard_content_cache[content_key] = (dashboard, metadata)
+            
+            if key_embedding is not None:
+                dashboard_cache.store(
+                    prompt=request.company_name,
+                    response=dashboard,
+                    vector=key_embedding,
+                    namespace=cache_namespace,
+                    metadata=metadata
+                )
+            
+            yield _sse_event({
+                'metadata': metadata,
+                'context_sources': metadata['sources_used']
+            }, event="done")
+            
+        except Exception as e:
+            logger.exception("Dashboard stream failed")
+            yield _sse_event({'detail': str(e)}, event="error")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/dashboard/rag/stream/{company_name}")
+async def dashboard_stream_get(
+    company_name: str,
+    top_k: int = Query(15, ge=5, le=30),
+    max_tokens: int = Query(4000, ge=1000, le=8000),
+    temperature: float = Query(0.3, ge=0.0, le=1.0),
+    model: str = Query("gpt-4o")
+):
+    """Generate Investment Analysis Report as Server-Sent Events (GET)"""
+    request = DashboardRequest(
+        company_name=company_name,
+        top_k=top_k,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        model=model
+    )
+    return await dashboard_stream_post(request)
+
+
 @app.get("/dashboard/rag/{company_name}")
 async def dashboard_get(
     company_name: str,
     top_k: int = Query(15, ge=5, le=30),
     max_tokens: int = Query(4000, ge=1000, le=8000),
     temperature: float = Query(0.3, ge=0.0, le=1.0),
-    model: str = Query("gpt-4o")
+    model: str = Query("gpt-4o"),
+    parallel_sections: bool = Query(False),
+    section_model: Optional[str] = Query(None)
 ):
     """Generate Investment Analysis Report (GET) - RAG Pipeline"""
     request = DashboardRequest(
@@ -415,64 +1087,305 @@ async def dashboard_get(
         top_k=top_k,
         max_tokens=max_tokens,
         temperature=temperature,
-        model=model
+        model=model,
+        parallel_sections=parallel_sections,
+        section_model=section_model
     )
     return await dashboard_post(request)
 
 
-async def perform_web_search(query: str, max_results: int = 3) -> List[Dict]:
+@app.post("/dashboard/rag/batch")
+async def dashboard_batch_post(request: DashboardBatchRequest):
     """
-    Perform web search using DuckDuckGo HTML search.
-    Returns list of search results with title, snippet, and URL.
+    Submit dashboard generation for many companies to the OpenAI Batch API
+    
+    Intended for non-interactive bulk runs (e.g. nightly regeneration). Context
+    is retrieved now; the completions run within OpenAI's 24h window at batch
+    pricing. Poll GET /dashboard/rag/batch/{batch_id} to load the results into
+    the dashboard cache.
     """
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            # Use DuckDuckGo HTML search
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        company_names = list(dict.fromkeys(request.company_names))
+        logger.info("📦 Preparing dashboard batch: %d companies", len(company_names))
+        
+        # Retrieve context for all companies concurrently
+        all_chunks = await asyncio.gather(*[
+            retrieve_context_for_dashboard(name, request.top_k) for name in company_names
+        ])
+        
+        batch_chunks = {}
+        skipped = []
+        
+        for company_name, chunks in zip(company_names, all_chunks):
+            if chunks:
+                batch_chunks[company_name] = chunks
+            else:
+                skipped.append(company_name)
+        
+        # Group companies per request; the custom_id is the group's companies as a
+        # JSON list, so any character in a company name round-trips
+        names = list(batch_chunks)
+        size = request.companies_per_request
+        lines = []
+        
+        for group in (names[i:i + size] for i in range(0, len(names), size)):
+            if len(group) == 1:
+                messages = _dashboard_messages(group[0], batch_chunks[group[0]])
+                max_tokens = request.max_tokens
+            else:
+                messages = [
+                    {"role": "system", "content": get_dashboard_system_prompt()},
+                    {"role": "user", "content": get_batched_dashboard_prompt([
+                        (name, format_context_for_prompt(
+                            name, batch_chunks[name], max_chunk_chars=DASHBOARD_CHUNK_CHARS
+                        ))
+                        for name in group
+                    ])}
+                ]
+                max_tokens = min(request.max_tokens * len(group), BATCHED_DASHBOARD_MAX_TOKENS)
+            
+            lines.append(orjson.dumps({
+                "custom_id": orjson.dumps(group).decode(),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": request.model,
+                    "messages": messages,
+                    "max_tokens": max_tokens,
+                    "temperature": request.temperature
+                }
+            }))
+        
+        if not lines:
+            raise HTTPException(status_code=404, detail="No context found for any requested company")
+        
+        client = get_openai_client()
+        
+        batch_file = await client.files.create(
+            file=("dashboards.jsonl", b"\n".join(lines)),
+            purpose="batch"
+        )
+        
+        # Generation parameters travel with the batch so results can be cached
+        # under the same namespace as the interactive endpoint
+        batch = await client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+            metadata={
+                "model": request.model,
+                "top_k": str(request.top_k),
+                "max_tokens": str(request.max_tokens),
+                "temperature": str(request.temperature)
             }
-            response = await client.get(
-                'https://html.duckduckgo.com/html/',
-                params={'q': query},
-                headers=headers,
-                follow_redirects=True
+        )
+        
+        _dashboard_batches[batch.id] = batch_chunks
+        
+        logger.info(
+            "✓ Submitted batch %s | %d requests | %d skipped",
+            batch.id, len(lines), len(skipped)
+        )
+        
+        return {
+            "batch_id": batch.id,
+            "status": batch.status,
+            "companies_submitted": list(batch_chunks),
+            "companies_skipped": skipped
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Dashboard batch submission failed")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/dashboard/rag/batch/{batch_id}")
+async def dashboard_batch_get(batch_id: str):
+    """
+    Check a dashboard batch and cache its results once completed
+    
+    Completed dashboards are verified like interactive ones and stored in the
+    dashboard semantic cache, so later /dashboard/rag requests with the same
+    parameters are served without another GPT call.
+    """
+    try:
+        client = get_openai_client()
+        batch = await client.batches.retrieve(batch_id)
+        
+        result = {
+            "batch_id": batch.id,
+            "status": batch.status,
+            "request_counts": {
+                "total": batch.request_counts.total,
+                "completed": batch.request_counts.completed,
+                "failed": batch.request_counts.failed
+            } if batch.request_counts else None
+        }
+        
+        if batch.status != "completed" or not batch.output_file_id:
+            return result
+        
+        output = await client.files.content(batch.output_file_id)
+        
+        dashboards = {}
+        failed = []
+        
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            item = orjson.loads(line)
+            group = orjson.loads(item["custom_id"])
+            response = item.get("response") or {}
+            if item.get("error") or response.get("status_code") != 200:
+                failed.extend(group)
+                continue
+            body = response["body"]
+            content = body["choices"][0]["message"]["content"]
+            total_tokens = body.get("usage", {}).get("total_tokens")
+            
+            if len(group) == 1:
+                dashboards[group[0]] = (content, total_tokens)
+                continue
+            
+            # Batch-prompted request: split per company, attributing tokens evenly
+            share = total_tokens // len(group) if total_tokens else None
+            for company_name, dashboard in zip(group, split_batched_dashboards(content, len(group))):
+                if dashboard is None:
+                    failed.append(company_name)
+                else:
+                    dashboards[company_name] = (dashboard, share)
+        
+        result["dashboards_completed"] = list(dashboards)
+        result["dashboards_failed"] = failed
+        
+        if batch_id in _cached_batches or not dashboards:
+            return result
+        
+        params = batch.metadata or {}
+        batch_chunks = _dashboard_batches.get(batch_id, {})
+        company_names = list(dashboards)
+        
+        try:
+            vs = get_vector_store()
+            embeddings = await asyncio.to_thread(vs.embed_queries, company_names)
+        except Exception as e:
+            logger.warning("Batch cache embedding error: %s", e)
+            return result
+        
+        for company_name, embedding in zip(company_names, embeddings):
+            dashboard, total_tokens = dashboards[company_name]
+            request = DashboardRequest(
+                company_name=company_name,
+                top_k=int(params.get("top_k", 15)),
+                max_tokens=int(params.get("max_tokens", 4000)),
+                temperature=float(params.get("temperature", 0.3)),
+                model=params.get("model", "gpt-4o")
+            )
+            chunks = batch_chunks.get(company_name, [])
+            dashboard_cache.store(
+                prompt=company_name,
+                response=dashboard,
+                vector=embedding,
+                namespace=_dashboard_cache_namespace(request),
+                metadata=_dashboard_metadata(request, chunks, dashboard, total_tokens)
             )
+        
+        _cached_batches.add(batch_id)
+        _dashboard_batches.pop(batch_id, None)
+        
+        logger.info("✓ Cached %d dashboards from batch %s", len(dashboards), batch_id)
+        result["dashboards_cached"] = len(dashboards)
+        
+        return result
+        
+    except Exception as e:
+        logger.exception("Dashboard batch status check failed")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+BRAVE_SEARCH_URL = "https://api.search.brave.com/res/v1/web/search"
+
+
+async def _brave_web_search(client: httpx.AsyncClient, query: str, max_results: int) -> List[Dict]:
+    """Query the Brave Search JSON API; results need no HTML parsing."""
+    response = await client.get(
+        BRAVE_SEARCH_URL,
+        params={'q': query, 'count': max_results},
+        headers={'Accept': 'application/json', 'X-Subscription-Token': settings.brave_api_key}
+    )
+    
+    if response.status_code != 200:
+        return []
+    
+    return [
+        {
+            'title': result.get('title', ''),
+            'snippet': result.get('description', ''),
+            'url': result.get('url', ''),
+            'source': 'web_search'
+        }
+        for result in response.json().get('web', {}).get('results', [])[:max_results]
+    ]
+
+
+async def _duckduckgo_web_search(client: httpx.AsyncClient, query: str, max_results: int) -> List[Dict]:
+    """Scrape DuckDuckGo HTML search results."""
+    response = await client.get(
+        'https://html.duckduckgo.com/html/',
+        params={'q': query}
+    )
+    
+    if response.status_code != 200:
+        return []
+    
+    soup = BeautifulSoup(response.text, 'lxml')
+    results = []
+    
+    # Parse DuckDuckGo results
+    for result in soup.select('.result')[:max_results]:
+        title_elem = result.select_one('.result__title')
+        snippet_elem = result.select_one('.result__snippet')
+        url_elem = result.select_one('.result__url')
+        
+        if title_elem and snippet_elem:
+            title = title_elem.get_text(strip=True)
+            snippet = snippet_elem.get_text(strip=True)
+            url = url_elem.get('href') if url_elem else ''
             
-            if response.status_code != 200:
-                return []
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            results = []
-            
-            # Parse DuckDuckGo results
-            for result in soup.select('.result')[:max_results]:
-                title_elem = result.select_one('.result__title')
-                snippet_elem = result.select_one('.result__snippet')
-                url_elem = result.select_one('.result__url')
-                
-                if title_elem and snippet_elem:
-                    title = title_elem.get_text(strip=True)
-                    snippet = snippet_elem.get_text(strip=True)
-                    url = url_elem.get('href') if url_elem else ''
-                    
-                    # Clean up DuckDuckGo redirect URL
-                    if url and '//duckduckgo.com/l/' in url:
-                        # Extract actual URL from redirect
-                        import urllib.parse
-                        parsed = urllib.parse.urlparse(url)
-                        params = urllib.parse.parse_qs(parsed.query)
-                        url = params.get('uddg', [url])[0]
-                    
-                    results.append({
-                        'title': title,
-                        'snippet': snippet,
-                        'url': url,
-                        'source': 'web_search'
-                    })
-            
-            return results
+            # Clean up DuckDuckGo redirect URL
+            if url and '//duckduckgo.com/l/' in url:
+                # Extract actual URL from redirect
+                parsed = urllib.parse.urlparse(url)
+                params = urllib.parse.parse_qs(parsed.query)
+                url = params.get('uddg', [url])[0]
+            
+            results.append({
+                'title': title,
+                'snippet': snippet,
+                'url': url,
+                'source': 'web_search'
+            })
+    
+    return results
+
+
+async def perform_web_search(query: str, max_results: int = 3) -> List[Dict]:
+    """
+    Perform web search over the shared, pooled HTTP client.
+    
+    Uses the Brave Search JSON API when SEARCH_PROVIDER=brave and BRAVE_API_KEY
+    is set, otherwise falls back to DuckDuckGo HTML search.
+    Returns list of search results with title, snippet, and URL.
+    """
+    try:
+        client = get_http_client()
+        if settings.search_provider.lower() == "brave" and settings.brave_api_key:
+            return await _brave_web_search(client, query, max_results)
+        return await _duckduckgo_web_search(client, query, max_results)
     except Exception as e:
-        print(f"Web search error: {e}")
+        logger.warning("Web search error: %s", e)
         return []
 
 
@@ -518,9 +1431,9 @@ def get_stats():
     
 
 @app.get("/rag/analytics")
-def rag_analytics(company_name: str):
+async def rag_analytics(company_name: str):
     try:
-        chunks = retrieve_context_for_dashboard(company_name, top_k=30)
+        chunks = await retrieve_context_for_dashboard(company_name, top_k=30)
 
         counter = Counter([c.get("source_type", "unknown") for c in chunks])
         sources = [{"source": k, "count": v} for k, v in counter.items()]
@@ -535,6 +1448,195 @@ def rag_analytics(company_name: str):
         raise HTTPException(status_code=500, detail=str(e))
 # ========== CHAT INTERFACE ==========
 
+async def _prepare_chat(request: ChatRequest, client) -> Dict:
+    """
+    Run the agentic retrieval steps for a chat turn and build the LLM messages.
+    
+    Returns:
+        Dict with 'messages', 'needs_retrieval', 'company_name', 'search_query',
+        'chunks', 'web_results' and 'used_web_search'
+    """
+    vs = get_vector_store()
+    
+    # Determine if retrieval is needed
+    needs_retrieval = False
+    company_name = request.company_name
+    search_query = None
+    
+    # If company is pre-selected, use it (no decision call or company list needed)
+    if company_name:
+        needs_retrieval = True
+        search_query = request.message
+    else:
+        # Get available companies for retrieval decision
+        available_companies = await asyncio.to_thread(cached_company_list)
+        
+        # Use GPT to decide if retrieval is needed
+        decision_prompt = get_retrieval_decision_prompt(
+            user_message=request.message,
+            conversation_history=[{"role": m.role, "content": m.content} for m in request.conversation_history],
+            available_companies=available_companies
+        )
+        
+        decision_response = await client.chat.completions.create(
+            model="gpt-4o-mini",  # Use cheaper model for decision
+            messages=[
+                {"role": "system", "content": "You are a retrieval decision assistant. Respond only with valid JSON."},
+                {"role": "user", "content": decision_prompt}
+            ],
+            temperature=0.1,
+            max_tokens=60,
+            response_format={"type": "json_object"}
+        )
+        
+        try:
+            # Compact keys: r = needs_retrieval, c = company_name, q = search_query
+            content = decision_response.choices[0].message.content.strip()
+            try:
+                # JSON mode guarantees valid JSON, not single-line JSON
+                decision = orjson.loads(content)
+            except ValueError:
+                # Prose before the object: the requested one-line JSON ends the reply
+                decision = orjson.loads(content.splitlines()[-1])
+            needs_retrieval = bool(decision.get("r", False))
+            company_name = decision.get("c")
+            search_query = decision.get("q")
+        except (TypeError, ValueError, AttributeError, IndexError):
+            # Fallback (e.g. empty or truncated JSON): check if message mentions a company
+            company_name = match_company(request.message, available_companies)
+            if company_name:
+                needs_retrieval = True
+                search_query = request.message
+    
+    # Retrieval and web search are independent; run them concurrently
+    async def retrieve_chunks() -> List[Dict]:
+        if not (needs_retrieval and company_name and search_query):
+            return []
+        try:
+            return await vs.asearch(
+                company_name=company_name,
+                query=search_query,
+                top_k=5
+            )
+        except Exception as e:
+            logger.warning("Retrieval failed: %s", e)
+            return []
+    
+    async def search_web() -> List[Dict]:
+        if not request.enable_web_search:
+            return []
+        # Always perform web search when enabled to supplement RAG results
+        # This allows the LLM to use both internal knowledge and fresh web data
+        web_query = f"{company_name} {search_query}" if company_name else request.message
+        logger.info("🌐 Performing web search for: '%s'", web_query)
+        return await perform_web_search(web_query, max_results=3)
+    
+    chunks, web_results = await asyncio.gather(retrieve_chunks(), search_web())
+    used_web_search = len(web_results) > 0
+    
+    if request.enable_web_search:
+        if used_web_search:
+            logger.info("✓ Found %d web results", len(web_results))
+        else:
+            logger.info("✗ No web results found")
+    
+    # Build context for response
+    context = ""
+    if chunks:
+        context = format_chat_context(company_name, chunks)
+    
+    # Add web search results to context
+    if web_results:
+        web_context = "\n\n--- ADDITIONAL WEB SEARCH RESULTS ---\n\n"
+        web_context += "Use these web results to supplement the knowledge base information:\n\n"
+        for idx, result in enumerate(web_results, 1):
+            web_context += f"{idx}. {result['title']}\n"
+            web_context += f"   {result['snippet']}\n"
+            web_context += f"   Source: {result['url']}\n\n"
+        context += web_context
+    
+    # Generate response
+    system_prompt = get_chat_system_prompt()
+    
+    # Build conversation messages
+    messages = [{"role": "system", "content": system_prompt}]
+    
+    # Add conversation history
+    for msg in request.conversation_history[-10:]:  # Last 10 messages
+        messages.append({"role": msg.role, "content": msg.content})
+    
+    # Add context if retrieved
+    if context:
+        messages.append({
+            "role": "user",
+            "content": f"Context from knowledge base:\n\n{context}\n\nUser question: {request.message}"
+        })
+    else:
+        messages.append({"role": "user", "content": request.message})
+    
+    return {
+        'messages': messages,
+        'needs_retrieval': needs_retrieval,
+        'company_name': company_name,
+        'search_query': search_query,
+        'chunks': chunks,
+        'web_results': web_results,
+        'used_web_search': used_web_search
+    }
+
+
+def _chat_cache_namespace(request: ChatRequest, company_name: str) -> str:
+    """Cache namespace for a chat answer about company_name with the request's generation parameters"""
+    # Per company: "What is X's funding?" and "What is Y's funding?" embed within
+    # the match threshold and must not share an answer
+    return (
+        f"chat:{company_name.strip().lower()}:{request.model}:"
+        f"{request.temperature}:{request.enable_web_search}"
+    )
+
+
+def _check_chat_cache(
+    request: ChatRequest,
+    company_name: Optional[str],
+    key_embedding: Optional[List[float]]
+) -> Optional[Dict]:
+    """Cached first-turn answer about company_name, marked as a cache hit; None on a miss"""
+    if key_embedding is None or not company_name:
+        return None
+    cached = chat_cache.check(key_embedding, namespace=_chat_cache_namespace(request, company_name))
+    if not cached:
+        return None
+    logger.info("✓ Chat cache hit (distance %.4f)", cached['distance'])
+    response = dict(cached['response'])
+    response['metadata'] = {**response['metadata'], 'cache_hit': True}
+    return response
+
+
+def _chat_cache_hit_events(response: Dict) -> List[str]:
+    """SSE frames replaying a cached chat answer"""
+    return [
+        _sse_event({
+            'company_name': response['company_name'],
+            'used_retrieval': response['used_retrieval'],
+            'used_web_search': response['used_web_search'],
+            'chunks': response['chunks'],
+            'web_sources': response['web_sources']
+        }, event="sources"),
+        _sse_event({'content': response['message']}, event="delta"),
+        _sse_event({'metadata': response['metadata']}, event="done")
+    ]
+
+
+def _chat_metadata(request: ChatRequest, prepared: Dict, tokens_used: Optional[int]) -> Dict:
+    """Build chat response metadata"""
+    return {
+        "model": request.model,
+        "tokens_used": tokens_used or 0,
+        "search_query": prepared['search_query'],
+        "web_search_enabled": request.enable_web_search
+    }
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
@@ -547,151 +1649,177 @@ async def chat(request: ChatRequest):
     4. Generate response with context
     """
     try:
-        client = get_openai_client()
-        vs = get_vector_store()
+        # Check semantic cache. Only first-turn messages are cached; follow-ups
+        # depend on the conversation history. Entries are per company, so a
+        # free-form question is looked up once its company has been resolved.
+        key_embedding = None
+        if not request.conversation_history:
+            key_embedding = await embed_cache_key(request.message)
         
-        # Get available companies for retrieval decision
-        available_companies = vs.get_company_list()
-        
-        # Determine if retrieval is needed
-        needs_retrieval = False
-        company_name = request.company_name
-        search_query = None
-        chunks = []
-        
-        # If company is pre-selected, use it
-        if company_name:
-            needs_retrieval = True
-            search_query = request.message
-        else:
-            # Use GPT to decide if retrieval is needed
-            decision_prompt = get_retrieval_decision_prompt(
-                user_message=request.message,
-                conversation_history=[{"role": m.role, "content": m.content} for m in request.conversation_history],
-                available_companies=available_companies
-            )
-            
-            decision_response = client.chat.completions.create(
-                model="gpt-4o-mini",  # Use cheaper model for decision
-                messages=[
-                    {"role": "system", "content": "You are a retrieval decision assistant. Respond only with valid JSON."},
-                    {"role": "user", "content": decision_prompt}
-                ],
-                temperature=0.1,
-                max_tokens=200
-            )
-            
-            try:
-                import json
-                decision = json.loads(decision_response.choices[0].message.content)
-                needs_retrieval = decision.get("needs_retrieval", False)
-                company_name = decision.get("company_name")
-                search_query = decision.get("search_query")
-            except:
-                # Fallback: check if message mentions a company
-                message_lower = request.message.lower()
-                for comp in available_companies:
-                    if comp.replace("-", " ") in message_lower or comp in message_lower:
-                        needs_retrieval = True
-                        company_name = comp
-                        search_query = request.message
-                        break
-        
-        # Retrieve context if needed
-        if needs_retrieval and company_name and search_query:
-            try:
-                chunks = vs.search(
-                    company_name=company_name,
-                    query=search_query,
-                    top_k=5
-                )
-            except Exception as e:
-                print(f"Warning: Retrieval failed: {e}")
-                chunks = []
-        
-        # Web search fallback
-        web_results = []
-        used_web_search = False
-        
-        if request.enable_web_search:
-            # Always perform web search when enabled to supplement RAG results
-            # This allows the LLM to use both internal knowledge and fresh web data
-            web_query = f"{company_name} {search_query}" if company_name else request.message
-            print(f"🌐 Performing web search for: '{web_query}'")
-            web_results = await perform_web_search(web_query, max_results=3)
-            used_web_search = len(web_results) > 0
-            
-            if used_web_search:
-                print(f"✓ Found {len(web_results)} web results")
-            else:
-                print(f"✗ No web results found")
-        
-        # Build context for response
-        context = ""
-        if chunks:
-            context = format_chat_context(company_name, chunks)
-        
-        # Add web search results to context
-        if web_results:
-            web_context = "\n\n--- ADDITIONAL WEB SEARCH RESULTS ---\n\n"
-            web_context += "Use these web results to supplement the knowledge base information:\n\n"
-            for idx, result in enumerate(web_results, 1):
-                web_context += f"{idx}. {result['title']}\n"
-                web_context += f"   {result['snippet']}\n"
-                web_context += f"   Source: {result['url']}\n\n"
-            context += web_context
-        
-        # Generate response
-        system_prompt = get_chat_system_prompt()
+        cached = _check_chat_cache(request, request.company_name, key_embedding)
+        if cached:
+            return ChatResponse(**cached)
         
-        # Build conversation messages
-        messages = [{"role": "system", "content": system_prompt}]
+        client = get_openai_client()
+        prepared = await _prepare_chat(request, client)
         
-        # Add conversation history
-        for msg in request.conversation_history[-10:]:  # Last 10 messages
-            messages.append({"role": msg.role, "content": msg.content})
-        
-        # Add context if retrieved
-        if context:
-            messages.append({
-                "role": "user",
-                "content": f"Context from knowledge base:\n\n{context}\n\nUser question: {request.message}"
-            })
-        else:
-            messages.append({"role": "user", "content": request.message})
+        cache_company = request.company_name or prepared['company_name']
+        if not request.company_name:
+            cached = _check_chat_cache(request, cache_company, key_embedding)
+            if cached:
+                return ChatResponse(**cached)
         
         # Generate response
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=request.model,
-            messages=messages,
+            messages=prepared['messages'],
             temperature=request.temperature,
             max_tokens=2000
         )
         
         assistant_message = response.choices[0].message.content
         
-        return ChatResponse(
+        chat_response = ChatResponse(
             message=assistant_message,
-            used_retrieval=needs_retrieval and len(chunks) > 0,
-            used_web_search=used_web_search,
-            company_name=company_name,
-            chunks_retrieved=len(chunks),
-            chunks=chunks,  # Include actual chunks
-            web_sources=web_results,  # Include web search results
-            metadata={
-                "model": request.model,
-                "tokens_used": response.usage.total_tokens if response.usage else 0,
-                "search_query": search_query,
-                "web_search_enabled": request.enable_web_search
-            }
+            used_retrieval=prepared['needs_retrieval'] and len(prepared['chunks']) > 0,
+            used_web_search=prepared['used_web_search'],
+            company_name=prepared['company_name'],
+            chunks_retrieved=len(prepared['chunks']),
+            chunks=prepared['chunks'],  # Include actual chunks
+            web_sources=prepared['web_results'],  # Include web search results
+            metadata=_chat_metadata(
+                request, prepared, response.usage.total_tokens if response.usage else 0
+            )
         )
         
+        if key_embedding is not None and cache_company:
+            chat_cache.store(
+                prompt=request.message,
+                response=chat_response.model_dump(),
+                vector=key_embedding,
+                namespace=_chat_cache_namespace(request, cache_company)
+            )
+        
+        return chat_response
+        
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Chat failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Chat endpoint with agentic RAG as Server-Sent Events.
+    
+    Emits a `sources` event with the retrieved chunks and web sources before
+    generation starts, then a `delta` event per generated text fragment and a
+    final `done` event with the response metadata. Errors after streaming
+    starts are sent as an `error` event.
+    """
+    async def event_stream():
+        try:
+            # Check semantic cache (first-turn messages only, per resolved company)
+            key_embedding = None
+            if not request.conversation_history:
+                key_embedding = await embed_cache_key(request.message)
+            
+            cached = _check_chat_cache(request, request.company_name, key_embedding)
+            if cached:
+                for frame in _chat_cache_hit_events(cached):
+                    yield frame
+                return
+            
+            client = get_openai_client()
+            prepared = await _prepare_chat(request, client)
+            
+            cache_company = request.company_name or prepared['company_name']
+            if not request.company_name:
+                cached = _check_chat_cache(request, cache_company, key_embedding)
+                if cached:
+                    for frame in _chat_cache_hit_events(cached):
+                        yield frame
+                    return
+            
+            used_retrieval = prepared['needs_retrieval'] and len(prepared['chunks']) > 0
+            
+            # Send sources first so the client can render them immediately
+            yield _sse_event({
+                'company_name': prepared['company_name'],
+                'used_retrieval': used_retrieval,
+                'used_web_search': prepared['used_web_search'],
+                'chunks': prepared['chunks'],
+                'web_sources': prepared['web_results']
+            }, event="sources")
+            
+            stream = await client.chat.completions.create(
+                model=request.model,
+                messages=prepared['messages'],
+                temperature=request.temperature,
+                max_tokens=2000,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            
+            parts = []
+            total_tokens = None
+            
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    total_tokens = chunk.usage.total_tokens
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    parts.append(content)
+                    yield _sse_event({'content': content}, event="delta")
+            
+            metadata = _chat_metadata(request, prepared, total_tokens)
+            
+            if key_embedding is not None and cache_company:
+                chat_response = ChatResponse(
+                    message="".join(parts),
+                    used_retrieval=used_retrieval,
+                    used_web_search=prepared['used_web_search'],
+                    company_name=prepared['company_name'],
+                    chunks_retrieved=len(prepared['chunks']),
+                    chunks=prepared['chunks'],
+                    web_sources=prepared['web_results'],
+                    metadata=metadata
+                )
+                chat_cache.store(
+                    prompt=request.message,
+                    response=chat_response.model_dump(),
+                    vector=key_embedding,
+                    namespace=_chat_cache_namespace(request, cache_company)
+                )
+            
+            yield _sse_event({'metadata': metadata}, event="done")
+            
+        except Exception as e:
+            logger.exception("Chat stream failed")
+            yield _sse_event({'detail': str(e)}, event="error")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Multiple workers need the app as an import string. Batch polling
+    # (_dashboard_batches), the semantic caches and the request batchers are
+    # process-local, so WEB_CONCURRENCY > 1 needs a shared store for them;
+    # until then a batch submitted to one worker is unknown to the others
+    uvicorn.run(
+        "src.api.api:app",
+        host="0.0.0.0",
+        port=8000,
+        # "auto" picks uvloop/httptools when installed (uvloop is not on Windows)
+        loop="auto",
+        http="auto",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        log_level="info"
+    )
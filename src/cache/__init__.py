@@ -0,0 +1,10 @@
+"""
+Caching Module for InvestIQ
+
+Response caches used by the API to skip repeated vector searches and
+LLM calls.
+"""
+
+from .semantic_cache import SemanticCache
+
+__all__ = ['SemanticCache']
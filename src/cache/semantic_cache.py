@@ -0,0 +1,131 @@
+"""
+Semantic Cache Module for InvestIQ
+Returns a stored response when a new request embeds close enough to one
+that was already answered, so repeated or paraphrased requests skip the
+vector search and LLM calls entirely.
+"""
+
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    In-process, embedding-keyed response cache.
+
+    Features:
+    - Entries are grouped by namespace (endpoint + request parameters), so only
+      requests with identical parameters can match each other
+    - Lookups match on cosine distance against a configurable threshold
+    - Every entry carries a TTL; expired entries are dropped on lookup and store
+    - Each namespace holds at most max_entries_per_namespace entries, oldest evicted first
+    """
+
+    def __init__(
+        self,
+        distance_threshold: float = 0.05,
+        ttl_seconds: int = 24 * 3600,
+        max_entries_per_namespace: int = 512
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            distance_threshold: Maximum cosine distance for a lookup to count as a hit
+            ttl_seconds: Default lifetime of a stored entry
+            max_entries_per_namespace: Entries kept per namespace before the oldest are evicted
+        """
+        self.distance_threshold = distance_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_namespace = max_entries_per_namespace
+        self._entries: Dict[str, List[Dict]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def check(self, vector, namespace: str = "default") -> Optional[Dict]:
+        """
+        Look up the closest live entry for an embedding.
+
+        Args:
+            vector: Query embedding
+            namespace: Namespace the entry was stored under
+
+        Returns:
+            Dict with 'prompt', 'response', 'metadata' and 'distance', or None on a miss
+        """
+        query = self._normalize(vector)
+        now = time.time()
+
+        with self._lock:
+            entries = [e for e in self._entries.get(namespace, []) if e['expires_at'] > now]
+            self._entries[namespace] = entries
+            if not entries:
+                return None
+
+            matrix = np.stack([e['vector'] for e in entries])
+            distances = 1.0 - matrix @ query
+            best = int(np.argmin(distances))
+
+            if distances[best] > self.distance_threshold:
+                return None
+
+            entry = entries[best]
+            return {
+                'prompt': entry['prompt'],
+                'response': entry['response'],
+                'metadata': dict(entry['metadata']),
+                'distance': float(distances[best])
+            }
+
+    def store(
+        self,
+        prompt: str,
+        response: Any,
+        vector,
+        namespace: str = "default",
+        metadata: Optional[Dict] = None,
+        ttl_seconds: Optional[int] = None
+    ):
+        """
+        Store a response under its embedding.
+
+        Args:
+            prompt: Text the embedding was computed from (kept for debugging)
+            response: Value returned on a future hit
+            vector: Embedding of the prompt
+            namespace: Namespace to store the entry under
+            metadata: Optional metadata returned alongside the response
+            ttl_seconds: Lifetime override for this entry
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        now = time.time()
+        entry = {
+            'prompt': prompt,
+            'response': response,
+            'vector': self._normalize(vector),
+            'metadata': metadata or {},
+            'expires_at': now + ttl
+        }
+
+        with self._lock:
+            entries = [e for e in self._entries.get(namespace, []) if e['expires_at'] > now]
+            entries.append(entry)
+            # Entries are appended in insertion order, so the oldest are at the front
+            self._entries[namespace] = entries[-self.max_entries_per_namespace:]
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._entries.values())
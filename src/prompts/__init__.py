@@ -4,14 +4,24 @@ Implements structured prompt templates following best practices.
 """
 
 from .dashboard_prompts import (
+    DASHBOARD_SECTIONS,
     get_dashboard_system_prompt,
     get_dashboard_user_prompt,
+    get_section_system_prompt,
+    build_section_prompt,
+    get_batched_dashboard_prompt,
+    split_batched_dashboards,
     format_context_for_prompt
 )
 
 __all__ = [
+    'DASHBOARD_SECTIONS',
     'get_dashboard_system_prompt',
     'get_dashboard_user_prompt',
+    'get_section_system_prompt',
+    'build_section_prompt',
+    'get_batched_dashboard_prompt',
+    'split_batched_dashboards',
     'format_context_for_prompt'
 ]
 
@@ -3,20 +3,44 @@ Dashboard Generation Prompts
 Implements structured prompt engineering for investment analysis dashboard generation.
 """
 
-from typing import List, Dict
+import re
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
 
+from jinja2 import Environment, FileSystemLoader
 
-def get_dashboard_system_prompt() -> str:
-    """
-    Generate the system prompt for dashboard generation.
-    
-    Follows prompt engineering best practices:
-    - Clear role definition
-    - Explicit constraints and guidelines
-    - Structured output format specification
-    - Quality standards
-    """
-    return """You are an expert investment analyst specializing in private AI and Fintech startups. Your role is to generate comprehensive, investor-facing diligence dashboards that provide actionable insights for investment decision-making.
+
+# Context layout, compiled once at import (see templates/dashboard_context.md.j2)
+_TEMPLATE_ENV = Environment(
+    loader=FileSystemLoader(Path(__file__).resolve().parent / "templates"),
+    autoescape=False,
+    trim_blocks=True,
+    lstrip_blocks=True
+)
+_CONTEXT_TEMPLATE = _TEMPLATE_ENV.get_template("dashboard_context.md.j2")
+
+
+def _truncate_text(text: str, max_chars: int, marker: str = "... [truncated]") -> str:
+    """Cut text to at most max_chars, preferring a paragraph, then word boundary"""
+    cut = text[:max_chars]
+    for boundary in ("\n\n", " "):
+        pos = cut.rfind(boundary)
+        if pos > max_chars // 2:
+            cut = cut[:pos]
+            break
+    return cut.rstrip() + marker
+
+
+def _chunk_order(chunk: Dict) -> int:
+    """Sort key placing chunks in their original document order"""
+    return chunk.get('chunk_index', 0)
+
+
+# ========== DASHBOARD PROMPTS ==========
+
+_ANALYST_ROLE = """You are an expert investment analyst specializing in private AI and Fintech startups. Your role is to generate comprehensive, investor-facing diligence dashboards that provide actionable insights for investment decision-making.
 
 ## Your Expertise
 - Deep understanding of startup valuation, funding dynamics, and market analysis
@@ -24,74 +48,82 @@ def get_dashboard_system_prompt() -> str:
 - Strong analytical skills for identifying risks, opportunities, and market positioning
 - Knowledge of investor information needs and due diligence requirements
 
-## Task
+"""
+
+_DASHBOARD_TASK = """## Task
 Generate a structured investment analysis dashboard for a private AI/Fintech startup using ONLY the provided context data. The dashboard must be professional, accurate, and suitable for investor review.
 
 ## Output Format Requirements
 
 You MUST generate exactly 8 sections in the following order, using the exact section headers:
 
-### 1. ## Company Overview
-Provide a concise summary of:
-- Company name and core mission
-- Primary business focus and value proposition
-- Key differentiators and market positioning
-- Founding story or background (if available)
-
-### 2. ## Business Model and GTM
-Analyze and present:
-- Revenue model and monetization strategy
-- Target customer segments
-- Go-to-market approach and distribution channels
-- Pricing strategy (if disclosed)
-- Key partnerships or strategic relationships
-
-### 3. ## Funding & Investor Profile
-Document:
-- Funding history (rounds, amounts, dates if available)
-- Current investors and their profiles
-- Valuation information (if disclosed)
-- Use of funds or strategic direction indicated by funding
-
-### 4. ## Growth Momentum
-Assess:
-- Hiring trends and team expansion
-- Product development milestones
-- Market traction indicators
-- Customer growth signals
-- Geographic expansion or market entry
-
-### 5. ## Visibility & Market Sentiment
-Evaluate:
-- Media coverage and press mentions
-- Industry recognition and awards
-- Public perception and brand visibility
-- Thought leadership activities
-- Community engagement
-
-### 6. ## Risks and Challenges
-Identify:
-- Competitive landscape and market risks
-- Operational challenges
-- Regulatory or compliance considerations
-- Technology or product risks
-- Market timing or adoption risks
-
-### 7. ## Outlook
-Provide forward-looking analysis:
-- Strategic direction and future plans
-- Market opportunities
-- Growth potential
-- Competitive positioning
-- Key success factors
-
-### 8. ## Disclosure Gaps
-List specific information that is:
-- Not available in the provided context
-- Critical for investment decision-making
-- Would require additional research or direct inquiry
-
-## Critical Guidelines
+"""
+
+# Dashboard sections in required order, with the guidance given for each
+DASHBOARD_SECTIONS = (
+    ("Company Overview", (
+        "Provide a concise summary of:\n"
+        "- Company name and core mission\n"
+        "- Primary business focus and value proposition\n"
+        "- Key differentiators and market positioning\n"
+        "- Founding story or background (if available)"
+    )),
+    ("Business Model and GTM", (
+        "Analyze and present:\n"
+        "- Revenue model and monetization strategy\n"
+        "- Target customer segments\n"
+        "- Go-to-market approach and distribution channels\n"
+        "- Pricing strategy (if disclosed)\n"
+        "- Key partnerships or strategic relationships"
+    )),
+    ("Funding & Investor Profile", (
+        "Document:\n"
+        "- Funding history (rounds, amounts, dates if available)\n"
+        "- Current investors and their profiles\n"
+        "- Valuation information (if disclosed)\n"
+        "- Use of funds or strategic direction indicated by funding"
+    )),
+    ("Growth Momentum", (
+        "Assess:\n"
+        "- Hiring trends and team expansion\n"
+        "- Product development milestones\n"
+        "- Market traction indicators\n"
+        "- Customer growth signals\n"
+        "- Geographic expansion or market entry"
+    )),
+    ("Visibility & Market Sentiment", (
+        "Evaluate:\n"
+        "- Media coverage and press mentions\n"
+        "- Industry recognition and awards\n"
+        "- Public perception and brand visibility\n"
+        "- Thought leadership activities\n"
+        "- Community engagement"
+    )),
+    ("Risks and Challenges", (
+        "Identify:\n"
+        "- Competitive landscape and market risks\n"
+        "- Operational challenges\n"
+        "- Regulatory or compliance considerations\n"
+        "- Technology or product risks\n"
+        "- Market timing or adoption risks"
+    )),
+    ("Outlook", (
+        "Provide forward-looking analysis:\n"
+        "- Strategic direction and future plans\n"
+        "- Market opportunities\n"
+        "- Growth potential\n"
+        "- Competitive positioning\n"
+        "- Key success factors"
+    )),
+    ("Disclosure Gaps", (
+        "List specific information that is:\n"
+        "- Not available in the provided context\n"
+        "- Critical for investment decision-making\n"
+        "- Would require additional research or direct inquiry"
+    )),
+)
+
+_ANALYSIS_GUIDELINES = """## Critical Guidelines
 
 1. **Data Fidelity**: Use ONLY information from the provided context. Do not infer, assume, or add information not explicitly stated.
 
@@ -120,7 +152,51 @@ List specific information that is:
 Remember: Your goal is to provide investors with a clear, accurate, and comprehensive view of the company that enables informed decision-making."""
 
 
-def format_context_for_prompt(company_name: str, chunks: List[Dict]) -> str:
+def _build_dashboard_system_prompt() -> str:
+    sections = "\n\n".join(
+        f"### {number}. ## {name}\n{guidance}"
+        for number, (name, guidance) in enumerate(DASHBOARD_SECTIONS, 1)
+    )
+    return f"{_ANALYST_ROLE}{_DASHBOARD_TASK}{sections}\n\n{_ANALYSIS_GUIDELINES}"
+
+
+def _build_section_system_prompt(section_name: str, guidance: str) -> str:
+    return f"""{_ANALYST_ROLE}## Task
+Write ONLY the "{section_name}" section of an investment analysis dashboard for a private AI/Fintech startup using ONLY the provided context data. Other sections are written separately; do not include them.
+
+## Section Requirements
+
+### ## {section_name}
+{guidance}
+
+{_ANALYSIS_GUIDELINES}"""
+
+
+# Built once so every call sends a byte-identical prefix (OpenAI prompt caching)
+_DASHBOARD_SYSTEM_PROMPT = _build_dashboard_system_prompt()
+_SECTION_SYSTEM_PROMPTS = {
+    name: _build_section_system_prompt(name, guidance) for name, guidance in DASHBOARD_SECTIONS
+}
+
+
+def get_dashboard_system_prompt() -> str:
+    """
+    Generate the system prompt for dashboard generation.
+    
+    Follows prompt engineering best practices:
+    - Clear role definition
+    - Explicit constraints and guidelines
+    - Structured output format specification
+    - Quality standards
+    """
+    return _DASHBOARD_SYSTEM_PROMPT
+
+
+def format_context_for_prompt(
+    company_name: str,
+    chunks: List[Dict],
+    max_chunk_chars: Optional[int] = None
+) -> str:
     """
     Format retrieved chunks into a well-structured context for the LLM.
     
@@ -133,6 +209,8 @@ def format_context_for_prompt(company_name: str, chunks: List[Dict]) -> str:
     Args:
         company_name: Name of the company being analyzed
         chunks: List of chunk dictionaries with 'text', 'source_type', 'source_url', etc.
+        max_chunk_chars: Optional per-chunk character budget; longer chunks are
+            cut at a word boundary and marked "... [truncated]"
     
     Returns:
         Formatted context string ready for inclusion in user prompt
@@ -141,62 +219,66 @@ def format_context_for_prompt(company_name: str, chunks: List[Dict]) -> str:
         return f"# Company Data: {company_name}\n\n**Status**: No data available in the knowledge base.\n\nAll sections should indicate 'Not disclosed.'"
     
     # Group chunks by source type for better organization
-    by_source = {}
+    by_source = defaultdict(list)
     for chunk in chunks:
-        source = chunk.get('source_type', 'unknown')
-        if source not in by_source:
-            by_source[source] = []
-        by_source[source].append(chunk)
-    
-    # Build formatted context
-    context_parts = [
-        f"# Company Data: {company_name}",
-        f"",
-        f"**Total Context Chunks**: {len(chunks)}",
-        f"**Source Types**: {', '.join(sorted(by_source.keys()))}",
-        f"",
-        f"---",
-        f"",
-        f"## Context Information",
-        f"",
-        f"The following information has been retrieved from the company's public sources. Use this information to generate the investment analysis dashboard.",
-        f"",
-    ]
+        by_source[chunk.get('source_type', 'unknown')].append(chunk)
+    source_types = sorted(by_source)
     
-    # Add chunks grouped by source type
-    for source_type in sorted(by_source.keys()):
-        source_chunks = sorted(by_source[source_type], key=lambda x: x.get('chunk_index', 0))
-        
-        context_parts.append(f"### Source: {source_type.upper()}")
-        context_parts.append(f"")
+    # Prepare chunks grouped by source type, in document order
+    sources = []
+    for source_type in source_types:
+        source_chunks = by_source[source_type]
+        source_chunks.sort(key=_chunk_order)
         
+        prepared = []
         for idx, chunk in enumerate(source_chunks, 1):
             chunk_text = chunk.get('text', '').strip()
             if not chunk_text:
                 continue
-                
-            chunk_index = chunk.get('chunk_index', idx - 1)
-            source_url = chunk.get('source_url', 'N/A')
+            if max_chunk_chars and len(chunk_text) > max_chunk_chars:
+                chunk_text = _truncate_text(chunk_text, max_chunk_chars)
             
-            context_parts.append(f"**Chunk {chunk_index + 1}** (from {source_type}):")
-            context_parts.append(f"Source URL: {source_url}")
-            context_parts.append(f"")
-            context_parts.append(chunk_text)
-            context_parts.append(f"")
+            prepared.append({
+                'number': chunk.get('chunk_index', idx - 1) + 1,
+                'source_url': chunk.get('source_url', 'N/A'),
+                'text': chunk_text
+            })
         
-        context_parts.append("---")
-        context_parts.append("")
-    
-    context_parts.append("## Instructions")
-    context_parts.append("")
-    context_parts.append("Using the context above, generate a comprehensive investment analysis dashboard following the specified format.")
-    context_parts.append("Remember to:")
-    context_parts.append("- Use only information from the context provided")
-    context_parts.append("- State 'Not disclosed.' for any missing information")
-    context_parts.append("- Provide specific details and examples when available")
-    context_parts.append("- Maintain professional, analytical tone")
+        sources.append((source_type, prepared))
     
-    return "\n".join(context_parts)
+    return _CONTEXT_TEMPLATE.render(
+        company_name=company_name,
+        total_chunks=len(chunks),
+        source_types=source_types,
+        sources=sources
+    )
+
+
+# Static instructions lead the user prompt and the company-specific context
+# follows, so the shared prefix is reusable by OpenAI prompt caching
+_DASHBOARD_USER_PREFIX = """Generate a comprehensive investment analysis dashboard for the target company below.
+
+## Your Task
+
+Analyze the provided context data and create an 8-section investment diligence dashboard that provides investors with a complete view of the company's investment profile.
+
+## Output Requirements
+
+1. Generate all 8 required sections in the exact order specified
+2. Use the exact section headers: ## Company Overview, ## Business Model and GTM, etc.
+3. Base all content strictly on the provided context
+4. For any missing information, explicitly state "Not disclosed."
+5. Provide specific details, numbers, and examples when available
+6. Maintain professional, analytical tone throughout
+7. Ensure each section contains substantive content (2-5 paragraphs or equivalent)
+
+## Analysis Approach
+
+1. **Synthesize**: Combine information from multiple sources to build a complete picture
+2. **Prioritize**: Highlight the most important and actionable insights
+3. **Balance**: Present both strengths and areas of concern
+4. **Ground**: Ensure all claims are supported by the provided context
+5. **Complete**: Address all aspects of each section, noting gaps where information is missing"""
 
 
 def get_dashboard_user_prompt(company_name: str, context: str) -> str:
@@ -216,42 +298,128 @@ def get_dashboard_user_prompt(company_name: str, context: str) -> str:
     Returns:
         Complete user prompt ready for LLM
     """
-    return f"""Generate a comprehensive investment analysis dashboard for **{company_name}**.
+    return f"""{_DASHBOARD_USER_PREFIX}
 
-## Your Task
+## Target Company
 
-Analyze the provided context data and create an 8-section investment diligence dashboard that provides investors with a complete view of the company's investment profile.
+{company_name}
 
 ## Context Data
 
 {context}
 
+Begin generating the {company_name} dashboard now."""
+
+
+def get_section_system_prompt(section_name: str) -> str:
+    """
+    Generate the system prompt for a single dashboard section.
+    
+    Used when the 8 sections are generated as independent, parallel calls.
+    Shares the analyst role, section guidance, and guidelines with the
+    full-dashboard prompt so both paths produce the same section content.
+    
+    Args:
+        section_name: One of the names in DASHBOARD_SECTIONS
+    
+    Returns:
+        System prompt restricted to the requested section
+    """
+    return _SECTION_SYSTEM_PROMPTS[section_name]
+
+
+def build_section_prompt(section_name: str, company_name: str, context: str) -> str:
+    """
+    Generate the user prompt for a single dashboard section.
+    
+    Args:
+        section_name: One of the names in DASHBOARD_SECTIONS
+        company_name: Name of the company to analyze
+        context: Formatted context string from format_context_for_prompt()
+    
+    Returns:
+        User prompt asking for just this section
+    """
+    return f"""Write the **{section_name}** section of the investment analysis dashboard for the target company below.
+
 ## Output Requirements
 
-1. Generate all 8 required sections in the exact order specified
-2. Use the exact section headers: ## Company Overview, ## Business Model and GTM, etc.
-3. Base all content strictly on the provided context
-4. For any missing information, explicitly state "Not disclosed."
-5. Provide specific details, numbers, and examples when available
-6. Maintain professional, analytical tone throughout
-7. Ensure each section contains substantive content (2-5 paragraphs or equivalent)
+1. Begin with the exact section header: ## {section_name}
+2. Base all content strictly on the provided context
+3. For any missing information, explicitly state "Not disclosed."
+4. Provide specific details, numbers, and examples when available
+5. Do not write any other section of the dashboard
 
-## Analysis Approach
+## Target Company
 
-1. **Synthesize**: Combine information from multiple sources to build a complete picture
-2. **Prioritize**: Highlight the most important and actionable insights
-3. **Balance**: Present both strengths and areas of concern
-4. **Ground**: Ensure all claims are supported by the provided context
-5. **Complete**: Address all aspects of each section, noting gaps where information is missing
+{company_name}
+
+## Context Data
+
+{context}
 
-Begin generating the dashboard now."""
+Begin the section now."""
+
+
+_BATCH_DELIMITER = "=== Dashboard [{index}] ==="
+_BATCH_DELIMITER_RE = re.compile(r"^=== Dashboard \[(\d+)\] ===[ \t]*$", re.MULTILINE)
+
+
+def get_batched_dashboard_prompt(companies: List[Tuple[str, str]]) -> str:
+    """
+    Generate one user prompt asking for dashboards for several companies.
+    
+    Batch prompting for bulk runs: the system prompt and instructions are
+    shared, and each dashboard is introduced by a numbered delimiter line so
+    split_batched_dashboards() can separate the response.
+    
+    Args:
+        companies: (company_name, context) pairs, context from format_context_for_prompt()
+    
+    Returns:
+        User prompt covering every company
+    """
+    blocks = "\n\n".join(
+        f"## Company [{index}]: {company_name}\n\n{context}"
+        for index, (company_name, context) in enumerate(companies, 1)
+    )
+    first, last = _BATCH_DELIMITER.format(index=1), _BATCH_DELIMITER.format(index=len(companies))
+    return f"""{_DASHBOARD_USER_PREFIX}
+
+## Batch Instructions
+
+Generate a separate, complete 8-section dashboard for EACH of the {len(companies)} companies below, in order. Start each dashboard with its delimiter on its own line ({first} ... {last}). Use only that company's context for its dashboard.
+
+{blocks}
+
+Begin generating the dashboards now, starting with {first}."""
+
+
+def split_batched_dashboards(text: str, count: int) -> List[Optional[str]]:
+    """
+    Split a batched response into per-company dashboards.
+    
+    Args:
+        text: Model output for get_batched_dashboard_prompt()
+        count: Number of companies in the prompt
+    
+    Returns:
+        One dashboard per company in prompt order; None where the delimiter is missing or empty
+    """
+    dashboards: List[Optional[str]] = [None] * count
+    matches = list(_BATCH_DELIMITER_RE.finditer(text))
+    for match, following in zip(matches, matches[1:] + [None]):
+        index = int(match.group(1)) - 1
+        end = following.start() if following else len(text)
+        body = text[match.end():end].strip()
+        if 0 <= index < count and body:
+            dashboards[index] = body
+    return dashboards
 
 
 # ========== CHAT INTERFACE PROMPTS ==========
 
-def get_chat_system_prompt() -> str:
-    """System prompt for the chat interface."""
-    return """You are an expert investment analyst assistant specializing in private AI and Fintech startups. You help users understand companies in the InvestIQ database by answering questions and providing insights.
+_CHAT_SYSTEM_PROMPT = """You are an expert investment analyst assistant specializing in private AI and Fintech startups. You help users understand companies in the InvestIQ database by answering questions and providing insights.
 
 ## Your Capabilities
 
@@ -275,30 +443,33 @@ def get_chat_system_prompt() -> str:
 The system has data on 50+ AI and Fintech startups. When users mention a company name, the system will retrieve relevant information automatically."""
 
 
+def get_chat_system_prompt() -> str:
+    """System prompt for the chat interface."""
+    return _CHAT_SYSTEM_PROMPT
+
+
 def format_chat_context(company_name: str, chunks: List[Dict]) -> str:
     """Format retrieved chunks for chat context."""
     if not chunks:
         return f"**No data available** for {company_name} in the knowledge base."
     
+    # One string per chunk block rather than one per line
     context_parts = [
-        f"## Retrieved Information for {company_name}",
-        f"**{len(chunks)} relevant chunks found:**",
-        f"",
+        f"## Retrieved Information for {company_name}\n"
+        f"**{len(chunks)} relevant chunks found:**\n"
     ]
     
     for idx, chunk in enumerate(chunks[:10], 1):
-        source_type = chunk.get('source_type', 'unknown')
-        source_url = chunk.get('source_url', 'N/A')
         text = chunk.get('text', '').strip()
         
         if text:
-            context_parts.append(f"### Chunk {idx} ({source_type})")
-            context_parts.append(f"Source: {source_url}")
-            context_parts.append("")
             if len(text) > 500:
-                text = text[:500] + "..."
-            context_parts.append(text)
-            context_parts.append("")
+                text = _truncate_text(text, 500, marker="...")
+            context_parts.append(
+                f"### Chunk {idx} ({chunk.get('source_type', 'unknown')})\n"
+                f"Source: {chunk.get('source_url', 'N/A')}\n\n"
+                f"{text}\n"
+            )
     
     if len(chunks) > 10:
         context_parts.append(f"*... and {len(chunks) - 10} more chunks*")
@@ -306,43 +477,39 @@ def format_chat_context(company_name: str, chunks: List[Dict]) -> str:
     return "\n".join(context_parts)
 
 
+_RETRIEVAL_DECISION_PREFIX = """Decide if the question below needs company-specific data from the knowledge base.
+
+Reply with one line of JSON: {"r": bool, "c": str|null, "q": str|null}
+r (needs retrieval) = true only for specific company details (funding, business model, products, team, etc.); then give c (company name) lowercase-hyphenated and q (search query) of 3-10 words."""
+
+
+@lru_cache(maxsize=8)
+def _format_company_list(companies: Tuple[str, ...]) -> str:
+    """Companies line of the decision prompt; the list only changes on ingestion."""
+    more = f" (+{len(companies) - 20} more)" if len(companies) > 20 else ""
+    return f"Companies: {', '.join(companies[:20])}{more}"
+
+
 def get_retrieval_decision_prompt(user_message: str, conversation_history: List[Dict], available_companies: List[str]) -> str:
     """Prompt for LLM to decide if retrieval is needed."""
-    companies_str = ", ".join(available_companies[:20])
-    
-    return f"""Analyze this question to determine if it needs company-specific data from the knowledge base.
-
-Available Companies: {companies_str}{f" ... and {len(available_companies) - 20} more" if len(available_companies) > 20 else ""}
+    return f"""{_RETRIEVAL_DECISION_PREFIX}
 
-User Question: {user_message}
+{_format_company_list(tuple(available_companies))}
 
-Conversation History:
-{_format_conversation_history(conversation_history[-5:]) if conversation_history else "No previous messages"}
+History:
+{_format_conversation_history(conversation_history[-3:]) or "None"}
 
-Respond in JSON format:
-{{
-    "needs_retrieval": true/false,
-    "company_name": "company-name" or null,
-    "search_query": "query string" or null,
-    "reasoning": "brief explanation"
-}}
+Question: {user_message}"""
 
-Guidelines:
-- Set needs_retrieval=true if asking about specific company details (funding, business model, products, team, etc.)
-- Set needs_retrieval=false for general knowledge questions
-- If needs_retrieval=true, extract company name (lowercase with hyphens) and create a search query (3-10 words)
 
-Respond ONLY with valid JSON."""
+_ROLE_LABELS = {'user': 'USER', 'assistant': 'ASSISTANT', 'system': 'SYSTEM'}
 
 
 def _format_conversation_history(history: List[Dict]) -> str:
-    """Format conversation history for prompts."""
-    if not history:
-        return ""
-    formatted = []
-    for msg in history:
-        role = msg.get('role', 'user')
-        content = msg.get('content', '')
-        formatted.append(f"{role.upper()}: {content}")
-    return "\n".join(formatted)
+    """Format conversation history for prompts, skipping empty turns."""
+    return "\n".join(
+        f"{_ROLE_LABELS.get(msg.get('role'), 'USER')}: {msg['content']}"
+        for msg in history
+        if (msg.get('content') or '').strip()
+    )
 
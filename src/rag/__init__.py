@@ -7,7 +7,25 @@ This module provides vector storage and retrieval capabilities using:
 - OpenAI for embeddings
 """
 
-from .rag_pipeline import VectorStore, load_company_data_from_disk
+import importlib
 
-__all__ = ['VectorStore', 'load_company_data_from_disk']
+# Exports resolve on first access, so scripts in this package (e.g.
+# ingest_companies --help) start without importing chromadb / langchain
+_EXPORTS = {
+    'VectorStore': '.rag_pipeline',
+    'load_company_data_from_disk': '.rag_pipeline',
+    'maximal_marginal_relevance': '.rag_pipeline',
+    'DynamicBatcher': '.batching',
+    'EmbeddingCache': '.embedding_cache',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
 
@@ -0,0 +1,95 @@
+"""
+Dynamic Batching for InvestIQ
+Collects calls that arrive within a short window and runs them as one batch,
+so concurrent requests share a single embedding / ChromaDB round-trip.
+"""
+
+import asyncio
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class DynamicBatcher:
+    """
+    Groups concurrent submissions into batches for a blocking batch function.
+
+    Features:
+    - A batch is dispatched when it reaches max_batch_size, or max_delay seconds
+      after its first item arrived, whichever comes first
+    - The batch function runs in a worker thread, off the event loop
+    - Results map back to callers by position; an Exception returned for one
+      item is raised only for that caller, an exception raised by the batch
+      function is raised for every caller in the batch
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 16,
+        max_delay: float = 0.05
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            batch_fn: Blocking function mapping a list of items to a list of
+                results of the same length and order
+            max_batch_size: Dispatch as soon as this many items are pending
+            max_delay: Longest time (seconds) an item waits for a batch to fill
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Add an item to the next batch and wait for its result.
+
+        Args:
+            item: Input passed to batch_fn as part of a list
+
+        Returns:
+            The result batch_fn produced for this item
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_delay, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        items = [item for item, _ in batch]
+
+        try:
+            results = await asyncio.to_thread(self.batch_fn, items)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,106 @@
+"""
+Persistent Embedding Cache for InvestIQ
+Stores document embeddings in SQLite keyed on a hash of the text, so
+re-ingesting unchanged sources reuses vectors instead of calling OpenAI again.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed cache of document embeddings.
+
+    Features:
+    - Keyed on (blake2b-128 of the text, model, dimensions), so switching the
+      embedding model or size never returns a stale vector
+    - Vectors stored as float32 bytes, the precision ChromaDB keeps anyway
+    - WAL journal with synchronous=NORMAL for fast bulk writes
+    - Safe to share across threads
+    """
+
+    # Stay well under SQLite's bound-parameter limit per lookup
+    _LOOKUP_BATCH = 500
+
+    def __init__(self, path: str, model: str, dimensions: int):
+        """
+        Open (or create) the cache.
+
+        Args:
+            path: SQLite database file; parent directories are created
+            model: Embedding model name the vectors belong to
+            dimensions: Embedding size the vectors belong to
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.model = model
+        self.dimensions = dimensions
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS emb ("
+            "h BLOB NOT NULL, model TEXT NOT NULL, dim INTEGER NOT NULL, vec BLOB NOT NULL, "
+            "PRIMARY KEY (h, model, dim))"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _hash(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            texts: Documents to look up
+
+        Returns:
+            One embedding per text, or None where the text is not cached
+        """
+        hashes = [self._hash(text) for text in texts]
+        found = {}
+
+        with self._lock:
+            for start in range(0, len(hashes), self._LOOKUP_BATCH):
+                batch = hashes[start:start + self._LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT h, vec FROM emb WHERE model = ? AND dim = ? AND h IN ({placeholders})",
+                    (self.model, self.dimensions, *batch)
+                )
+                found.update(rows)
+
+        return [
+            np.frombuffer(found[h], dtype=np.float32).tolist() if h in found else None
+            for h in hashes
+        ]
+
+    def put_many(self, texts: List[str], embeddings: List[List[float]]):
+        """
+        Store embeddings for texts, replacing any existing entries.
+
+        Args:
+            texts: Documents that were embedded
+            embeddings: One embedding per text, in the same order
+        """
+        rows = [
+            (self._hash(text), self.model, self.dimensions,
+             np.asarray(embedding, dtype=np.float32).tobytes())
+            for text, embedding in zip(texts, embeddings)
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO emb VALUES (?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -4,70 +4,192 @@ Ingestion Script - Load data, chunk with LangChain, and store in ChromaDB
 
 import os
 import sys
+import argparse
+import atexit
+import hashlib
+import json
 from pathlib import Path
+import tempfile
 import time
-from typing import List, Optional
+import traceback
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from datetime import datetime
-from dotenv import load_dotenv
 
 # Add project root to Python path for imports
 project_root = Path(__file__).resolve().parent.parent.parent
-sys.path.insert(0, str(project_root))
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
-# Load environment variables
-load_dotenv()
+DEFAULT_DATA_PATH = str(project_root / "data" / "raw")
 
-# Import from the rag package
-from src.rag.rag_pipeline import VectorStore, load_company_data_from_disk
+# Per-company snapshot fingerprints from the last successful ingestion
+INGESTION_STATE_PATH = project_root / "data" / "rag" / "ingestion_state.json"
 
-# Global log file handle
+# Re-ingesting unchanged chunks reuses these vectors (EMBED_CACHE_PATH="" disables)
+DEFAULT_EMBED_CACHE_PATH = str(Path.home() / ".cache" / "investiq" / "embed_cache.sqlite")
+
+# chromadb / langchain / openai are imported inside the functions that use
+# them, so `--help` and argument errors return without loading those SDKs
+if TYPE_CHECKING:
+    from src.rag.rag_pipeline import VectorStore
+
+# Global log file handles: human-readable log and JSONL events next to it
 log_file: Optional[object] = None
+events_file: Optional[object] = None
+_log_lock = threading.Lock()
 
+# Timestamp prefix reused for every line logged within the same second
+_log_second = -1
+_log_stamp = ""
 
-def log_message(message: str, to_console: bool = True):
-    """Write message to log file and optionally to console."""
-    global log_file
-    if log_file:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_file.write(f"[{timestamp}] {message}\n")
-        log_file.flush()
-    if to_console:
-        print(message)
+# Failures collected across worker threads, reported once at the end of a run
+_failures: List[Dict[str, str]] = []
+_failures_lock = threading.Lock()
+
+
+def log_message(message: str, to_console: bool = True, fields: Optional[Dict] = None):
+    """
+    Write message to log file and optionally to console (safe across threads).
+    
+    Args:
+        message: Human-readable line
+        to_console: Also print the line
+        fields: Optional structured event ({"event": ..., "company": ..., ...})
+            written as one JSON line to the events log for jq/DuckDB analysis
+    """
+    global log_file, _log_second, _log_stamp
+    with _log_lock:
+        if fields is not None and events_file:
+            events_file.write(json.dumps({"ts": round(time.time(), 3), **fields}, ensure_ascii=False) + "\n")
+        if log_file:
+            second = int(time.time())
+            if second != _log_second:
+                _log_second = second
+                _log_stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+            log_file.write(f"[{_log_stamp}] {message}\n")
+        if to_console:
+            print(message)
+
+
+def log_exception(message: str):
+    """Log message to the console and the current traceback, formatted once, to the log file only."""
+    log_message(message)
+    log_message(f"Traceback:\n{traceback.format_exc()}", to_console=False)
+
+
+def record_failure(company_name: str, stage: str, error: Exception):
+    """
+    Log a failure and keep it for the end-of-run summary.
+    
+    The traceback goes to the log file only, so failing workers do not
+    contend on the console during an outage.
+    """
+    log_exception(f"❌ Failed to {stage} {company_name}: {str(error)}")
+    log_message(f"{company_name} failed at {stage}", to_console=False, fields={
+        "event": "company_failed", "company": company_name, "stage": stage, "error": str(error)
+    })
+    with _failures_lock:
+        _failures.append({'company': company_name, 'stage': stage, 'error': str(error)})
+
+
+def log_failure_summary():
+    """Print collected failures as one table and reset the list."""
+    with _failures_lock:
+        failures = list(_failures)
+        _failures.clear()
+    if not failures:
+        return
+    
+    log_message(f"\n⚠️  Failures ({len(failures)}):")
+    width = max(len(f['company']) for f in failures)
+    for failure in failures:
+        log_message(f"  {failure['company']:<{width}}  {failure['stage']:<7}  {failure['error'][:120]}")
 
 
 def setup_log_file(project_root: Path) -> Path:
-    """Create log file with timestamp and return path."""
+    """Create log file (and its .jsonl events log) with timestamp and return the log path."""
     logs_dir = project_root / "data" / "logs"
     logs_dir.mkdir(parents=True, exist_ok=True)
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     log_path = logs_dir / f"rag_ingestion_{timestamp}.txt"
     
-    global log_file
-    log_file = open(log_path, 'w', encoding='utf-8')
+    global log_file, events_file
+    # Buffered (no flush per line); closing at exit drains it even on errors
+    log_file = open(log_path, 'w', encoding='utf-8', buffering=1 << 16)
+    atexit.register(log_file.close)
+    events_file = open(log_path.with_suffix(".jsonl"), 'w', encoding='utf-8', buffering=1 << 16)
+    atexit.register(events_file.close)
     
     return log_path
 
 
 
 def get_all_companies(base_path: str) -> List[str]:
-    """Get list of all company directories."""
-    base = Path(base_path)
-    companies = []
+    """Get list of all company directories (those with an initial/ snapshot)."""
+    # DirEntry.is_dir() uses the file type from readdir, avoiding a stat per entry
+    with os.scandir(base_path) as entries:
+        return sorted(
+            entry.name for entry in entries
+            if entry.is_dir() and os.path.exists(os.path.join(entry.path, "initial"))
+        )
+
+
+def company_fingerprint(company_name: str, base_path: str, target: str = "") -> Optional[str]:
+    """
+    Fingerprint a company's snapshot from file names, sizes and mtimes (no reads).
     
-    for item in base.iterdir():
-        if item.is_dir():
-            initial_path = item / "initial"
-            if initial_path.exists():
-                companies.append(item.name)
+    Args:
+        company_name: Company directory name
+        base_path: Base data directory
+        target: Where and how the snapshot is indexed (ChromaDB tenant/database/
+            collection, chunking and embedding model), so changing any of them
+            re-ingests instead of skipping
     
-    return sorted(companies)
+    Returns:
+        Hex digest, or None if the company has no initial/ directory
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{target}\n".encode())
+    try:
+        with os.scandir(os.path.join(base_path, company_name, "initial")) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                if entry.is_file():
+                    stat = entry.stat()
+                    digest.update(f"{entry.name}\0{stat.st_mtime_ns}\0{stat.st_size}\n".encode())
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def load_ingestion_state(path: Path) -> Dict[str, str]:
+    """Load {company: fingerprint} from the last runs; empty if missing or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_ingestion_state(path: Path, state: Dict[str, str]):
+    """Save {company: fingerprint} atomically, so an interrupted run never leaves truncated JSON."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
 
 def ingest_single_company(
     company_name: str,
     base_path: str,
-    vector_store: VectorStore,
+    vector_store: "VectorStore",
     force_refresh: bool = False
 ) -> bool:
     """Ingest a single company's data using LangChain."""
@@ -78,6 +200,7 @@ def ingest_single_company(
     try:
         # Load from disk
         log_message("Loading scraped data...")
+        from src.rag.rag_pipeline import load_company_data_from_disk
         scraped_data = load_company_data_from_disk(company_name, base_path)
         
         if not scraped_data:
@@ -100,6 +223,8 @@ def ingest_single_company(
         log_message(f"\n📊 Ingestion Stats:")
         log_message(f"  ✓ Sources processed: {stats['sources_processed']}")
         log_message(f"  ✓ Chunks created: {stats['chunks_created']}")
+        if stats.get('chunks_deduped'):
+            log_message(f"  ✓ Duplicate chunks embedded once: {stats['chunks_deduped']}")
         log_message(f"  ✓ Chunks stored: {stats['chunks_stored']}")
         
         if stats['errors']:
@@ -110,19 +235,197 @@ def ingest_single_company(
         return stats['chunks_stored'] > 0
         
     except Exception as e:
-        log_message(f"❌ Failed to ingest {company_name}: {str(e)}")
-        import traceback
-        error_trace = traceback.format_exc()
-        log_message(f"Traceback:\n{error_trace}", to_console=False)
-        traceback.print_exc()
+        record_failure(company_name, "ingest", e)
         return False
 
 
-def main():
-    """Main ingestion process with LangChain."""
-    # Get project root for default data path
-    project_root = Path(__file__).resolve().parent.parent.parent
-    default_data_path = str(project_root / "data" / "raw")
+def _prepare_company(company_name: str, base_path: str, vector_store: "VectorStore") -> Optional[Dict]:
+    """Load and chunk one company; returns None if it has nothing to ingest."""
+    start = time.perf_counter()
+    try:
+        from src.rag.rag_pipeline import load_company_data_from_disk
+        scraped_data = load_company_data_from_disk(company_name, base_path)
+        if not scraped_data:
+            log_message(f"❌ No data found for {company_name}")
+            return None
+        
+        for source in scraped_data:
+            log_message(f"  - {company_name} {source['source_type']}: {len(source['text'])} chars", to_console=False, fields={
+                "event": "source_loaded", "company": company_name,
+                "source_type": source['source_type'], "chars": len(source['text'])
+            })
+        
+        prepared = vector_store.prepare_company_chunks(company_name, scraped_data)
+        if not prepared['texts']:
+            log_message(f"❌ No chunks created for {company_name}")
+            return None
+        
+        deduped = prepared['stats'].get('chunks_deduped', 0)
+        log_message(
+            f"✓ {company_name}: {len(scraped_data)} sources, {len(prepared['texts'])} chunks"
+            + (f" ({deduped} duplicates embedded once)" if deduped else ""),
+            fields={
+                "event": "company_prepared", "company": company_name, "sources": len(scraped_data),
+                "chunks": len(prepared['texts']), "deduped": deduped,
+                "seconds": round(time.perf_counter() - start, 3)
+            }
+        )
+        return prepared
+    except Exception as e:
+        record_failure(company_name, "prepare", e)
+        return None
+
+
+def _store_company(
+    company_name: str,
+    prepared: Dict,
+    embeddings: List[List[float]],
+    vector_store: "VectorStore",
+    force_refresh: bool
+) -> bool:
+    """Store one company's precomputed embeddings; returns True if any chunks were stored."""
+    start = time.perf_counter()
+    try:
+        stats = vector_store.store_precomputed(company_name, prepared, embeddings, force_refresh)
+    except Exception as e:
+        record_failure(company_name, "store", e)
+        return False
+    
+    log_message(f"{company_name} stored", to_console=False, fields={
+        "event": "company_done", "company": company_name, "chunks_stored": stats['chunks_stored'],
+        "errors": len(stats['errors']), "seconds": round(time.perf_counter() - start, 3)
+    })
+    
+    if stats['errors']:
+        log_message(f"  ⚠️  {company_name} errors: {len(stats['errors'])}")
+        for error in stats['errors'][:3]:
+            log_message(f"    - {error}")
+    
+    if stats['chunks_stored'] > 0:
+        log_message(f"✓ Successfully ingested: {company_name} ({stats['chunks_stored']} chunks)")
+        return True
+    
+    log_message(f"✗ Failed to ingest: {company_name}")
+    return False
+
+
+def _embed_group(group: List[Tuple[str, Dict]], vector_store: "VectorStore") -> Optional[List[List[float]]]:
+    """Embed one group of prepared companies together; returns None on failure."""
+    from src.rag.rag_pipeline import EmbeddingServiceError
+    
+    texts = [text for _, prepared in group for text in prepared['texts']]
+    log_message(f"\n🧮 Embedding {len(texts)} chunks across {len(group)} companies...")
+    start = time.perf_counter()
+    try:
+        embeddings = vector_store.embed_documents_batched(texts)
+    except EmbeddingServiceError as e:
+        log_exception(f"❌ {str(e)} (check OPENAI_API_KEY and connectivity)")
+        return None
+    except Exception as e:
+        log_exception(f"❌ Embedding failed: {str(e)}")
+        return None
+    log_message(f"✓ Generated {len(embeddings)} embeddings", fields={
+        "event": "embedding_done", "chunks": len(texts), "companies": len(group),
+        "chars": sum(len(text) for text in texts), "seconds": round(time.perf_counter() - start, 3)
+    })
+    return embeddings
+
+
+def ingest_companies_batched(
+    companies: List[str],
+    base_path: str,
+    vector_store: "VectorStore",
+    force_refresh: bool = False,
+    max_workers: int = 8,
+    embed_group_size: int = 4096
+) -> Tuple[List[str], List[str]]:
+    """
+    Ingest many companies through an overlapping load -> embed -> store pipeline.
+    
+    Companies are loaded and chunked concurrently. As soon as prepared
+    companies add up to embed_group_size chunks, their texts are embedded
+    together (in large concurrent batches) while loading continues; each
+    company's vectors are stored as soon as its group's embeddings arrive.
+    
+    Args:
+        companies: Company directory names to ingest
+        base_path: Root directory of scraped company data
+        vector_store: Target VectorStore
+        force_refresh: If True, replace each company's existing chunks
+        max_workers: Companies loaded / stored at the same time
+        embed_group_size: Chunks gathered before an embedding group is started
+    
+    Returns:
+        Tuple of (successful companies, failed companies)
+    """
+    failed = []
+    succeeded = []
+    embed_jobs = []
+    store_jobs = []
+    
+    log_message(f"\n📦 Loading and chunking {len(companies)} companies...")
+    with ThreadPoolExecutor(max_workers=max_workers) as prepare_pool, \
+            ThreadPoolExecutor(max_workers=2) as embed_pool, \
+            ThreadPoolExecutor(max_workers=max_workers) as store_pool:
+        # Stage 1 -> 2: prepared companies are grouped and embedded while later ones still load
+        group, group_chunks = [], 0
+        results = prepare_pool.map(
+            lambda company_name: _prepare_company(company_name, base_path, vector_store),
+            companies
+        )
+        for company_name, prepared in zip(companies, results):
+            if prepared is None:
+                failed.append(company_name)
+                continue
+            group.append((company_name, prepared))
+            group_chunks += len(prepared['texts'])
+            if group_chunks >= embed_group_size:
+                embed_jobs.append((group, embed_pool.submit(_embed_group, group, vector_store)))
+                group, group_chunks = [], 0
+        if group:
+            embed_jobs.append((group, embed_pool.submit(_embed_group, group, vector_store)))
+        
+        # Stage 2 -> 3: scatter each group's embeddings back and store while later groups embed
+        for group, future in embed_jobs:
+            embeddings = future.result()
+            if embeddings is None:
+                failed.extend(company_name for company_name, _ in group)
+                continue
+            offset = 0
+            for company_name, prepared in group:
+                count = len(prepared['texts'])
+                store_jobs.append((company_name, store_pool.submit(
+                    _store_company, company_name, prepared, embeddings[offset:offset + count],
+                    vector_store, force_refresh
+                )))
+                offset += count
+        
+        for company_name, future in store_jobs:
+            (succeeded if future.result() else failed).append(company_name)
+    
+    return succeeded, failed
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Main ingestion process with LangChain.
+    
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(description="InvestIQ: Chunk, embed and store company data")
+    parser.add_argument("--yes", action="store_true",
+                        help="Skip confirmation prompts (also skipped when stdin is not a terminal)")
+    parser.add_argument("--force-refresh", action="store_true", help="Delete existing chunks before storing")
+    parser.add_argument("--concurrency", "--workers", type=int, default=None,
+                        help="Companies loaded / stored at the same time (default: $INGEST_CONCURRENCY or 8)")
+    parser.add_argument("--companies", default=None,
+                        help="Comma-separated company directories to ingest (skips discovery)")
+    args = parser.parse_args(argv)
+    
+    from dotenv import load_dotenv
+    from src.rag.rag_pipeline import VectorStore
+    load_dotenv()
     
     # Setup log file
     log_path = setup_log_file(project_root)
@@ -136,7 +439,8 @@ def main():
     CHROMA_TENANT = os.getenv('CHROMA_TENANT')
     CHROMA_DB = os.getenv('CHROMA_DB')
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-    DATA_PATH = os.getenv('DATA_PATH', default_data_path)
+    DATA_PATH = os.getenv('DATA_PATH', DEFAULT_DATA_PATH)
+    EMBED_CACHE_PATH = os.getenv('EMBED_CACHE_PATH', DEFAULT_EMBED_CACHE_PATH)
     
     # Debug: Show what was loaded (without showing full keys)
     log_message("\n🔍 Environment Variables:")
@@ -145,6 +449,7 @@ def main():
     log_message(f"  CHROMA_DB: {'✓ Set' if CHROMA_DB else '✗ Missing'}")
     log_message(f"  OPENAI_API_KEY: {'✓ Set' if OPENAI_API_KEY else '✗ Missing'}")
     log_message(f"  DATA_PATH: {DATA_PATH}")
+    log_message(f"  EMBED_CACHE_PATH: {EMBED_CACHE_PATH or 'disabled'}")
     
     if not all([CHROMA_API_KEY, CHROMA_TENANT, CHROMA_DB, OPENAI_API_KEY]):
         log_message("\n❌ Missing required credentials in .env")
@@ -166,40 +471,11 @@ def main():
     
     log_message(f"✓ Data path exists: {DATA_PATH}")
     
-    # Validate API connections before processing
-    log_message("\n🔍 Validating API connections...")
-    try:
-        # Test ChromaDB connection
-        import chromadb
-        test_client = chromadb.CloudClient(
-            api_key=CHROMA_API_KEY,
-            tenant=CHROMA_TENANT,
-            database=CHROMA_DB
-        )
-        log_message("  ✓ ChromaDB connection successful")
-    except Exception as e:
-        log_message(f"  ✗ ChromaDB connection failed: {str(e)}")
-        if log_file:
-            log_file.close()
-        sys.exit(1)
-    
-    try:
-        # Test OpenAI API with a minimal embedding
-        from langchain_openai import OpenAIEmbeddings
-        test_embeddings = OpenAIEmbeddings(
-            openai_api_key=OPENAI_API_KEY,
-            model="text-embedding-3-small",
-            dimensions=384
-        )
-        test_embeddings.embed_query("test")
-        log_message("  ✓ OpenAI API connection successful")
-    except Exception as e:
-        log_message(f"  ✗ OpenAI API connection failed: {str(e)}")
-        if log_file:
-            log_file.close()
-        sys.exit(1)
+    CHUNK_SIZE = 1000                    # ~750 tokens
+    CHUNK_OVERLAP = 200                  # Overlap for context
     
-    # Initialize ChromaDB with LangChain
+    # Initialize ChromaDB with LangChain (opening the collection validates
+    # ChromaDB; OpenAI is validated by the first real embeddings request)
     try:
         log_message("\n🔌 Initializing LangChain + ChromaDB + OpenAI...")
         vector_store = VectorStore(
@@ -207,22 +483,26 @@ def main():
             tenant=CHROMA_TENANT,
             database=CHROMA_DB,
             openai_api_key=OPENAI_API_KEY,
-            chunk_size=1000,                 # ~750 tokens
-            chunk_overlap=200                # Overlap for context
+            chunk_size=CHUNK_SIZE,
+            chunk_overlap=CHUNK_OVERLAP,
+            add_batch_size=250,              # Records per ChromaDB add() request
+            embedding_cache_path=EMBED_CACHE_PATH or None
         )
     except Exception as e:
-        log_message(f"❌ Initialization failed: {str(e)}")
-        import traceback
-        error_trace = traceback.format_exc()
-        log_message(f"Traceback:\n{error_trace}", to_console=False)
-        traceback.print_exc()
+        log_exception(f"❌ Initialization failed: {str(e)}")
         if log_file:
             log_file.close()
         sys.exit(1)
     
     # Get companies
-    log_message("\n🔍 Discovering companies...")
-    companies = get_all_companies(DATA_PATH)
+    if args.companies:
+        requested = [name.strip() for name in args.companies.split(',') if name.strip()]
+        companies = [name for name in requested if os.path.isdir(os.path.join(DATA_PATH, name, "initial"))]
+        for name in sorted(set(requested) - set(companies)):
+            log_message(f"⚠️  Skipping {name}: no {name}/initial/ under {DATA_PATH}")
+    else:
+        log_message("\n🔍 Discovering companies...")
+        companies = get_all_companies(DATA_PATH)
     
     if not companies:
         log_message("❌ No companies found")
@@ -239,52 +519,66 @@ def main():
     # Confirm
     log_message(f"\n⚠️  This will chunk and embed data for {len(companies)} companies using OpenAI.")
     log_message(f"⚠️  Note: OpenAI embeddings API will be called (costs ~$0.00013 per 1K tokens)")
-    response = input("Continue? (yes/no): ").strip().lower()
-    log_message(f"User response: {response}")
-    
-    if response not in ['yes', 'y']:
-        log_message("Cancelled by user.")
-        if log_file:
-            log_file.close()
-        sys.exit(0)
-    
-    # Ask about refresh
-    refresh_response = input("Force refresh (delete existing)? (yes/no): ").strip().lower()
-    force_refresh = refresh_response in ['yes', 'y']
+    force_refresh = args.force_refresh
+    if not args.yes and sys.stdin.isatty():
+        # One prompt covers both the confirmation and the refresh choice
+        response = input("Continue? (yes / refresh = delete existing first / no): ").strip().lower()
+        log_message(f"User response: {response}")
+        
+        if response not in ['yes', 'y', 'refresh', 'r']:
+            log_message("Cancelled by user.")
+            if log_file:
+                log_file.close()
+            sys.exit(0)
+        force_refresh = force_refresh or response in ['refresh', 'r']
     log_message(f"Force refresh: {force_refresh}")
     
+    # Skip companies whose snapshot is unchanged since their last successful
+    # ingestion into the same target with the same chunking and embedding model
+    # (a force refresh re-ingests everything)
+    state = load_ingestion_state(INGESTION_STATE_PATH)
+    target = (
+        f"{CHROMA_TENANT}/{CHROMA_DB}/{vector_store.collection_name}"
+        f"|chunks={CHUNK_SIZE}/{CHUNK_OVERLAP}"
+        f"|{vector_store.embedding_model}/{vector_store.embedding_dimensions}"
+    )
+    fingerprints = {company: company_fingerprint(company, DATA_PATH, target) for company in companies}
+    if not force_refresh:
+        unchanged = {c for c in companies if fingerprints[c] and state.get(c) == fingerprints[c]}
+        if unchanged:
+            log_message(f"⏭️  Skipping {len(unchanged)} unchanged companies (use --force-refresh to re-ingest)")
+            companies = [c for c in companies if c not in unchanged]
+        if not companies:
+            log_message("✓ Nothing to ingest")
+            if log_file:
+                log_file.close()
+            sys.exit(0)
+    
     # Process all companies
     log_message(f"\n{'='*70}")
     log_message("Starting ingestion with LangChain...")
     log_message(f"{'='*70}")
     
-    success = 0
-    fail = 0
     start_time = time.time()
-    successful_companies = []
     
-    for idx, company in enumerate(companies, 1):
-        log_message(f"\n[{idx}/{len(companies)}] {company}")
-        
+    try:
+        successful_companies, failed_companies = ingest_companies_batched(
+            companies, DATA_PATH, vector_store, force_refresh,
+            max_workers=args.concurrency or int(os.getenv('INGEST_CONCURRENCY', '8'))
+        )
+    except KeyboardInterrupt:
+        log_message("\n\n⚠️  Interrupted by user")
+        successful_companies, failed_companies = [], []
+    
+    success = len(successful_companies)
+    fail = len(failed_companies)
+    
+    if successful_companies:
+        state.update({c: fingerprints[c] for c in successful_companies if fingerprints[c]})
         try:
-            if ingest_single_company(company, DATA_PATH, vector_store, force_refresh):
-                success += 1
-                successful_companies.append(company)
-                log_message(f"✓ Successfully ingested: {company}")
-            else:
-                fail += 1
-                log_message(f"✗ Failed to ingest: {company}")
-        except KeyboardInterrupt:
-            log_message("\n\n⚠️  Interrupted by user")
-            break
-        except Exception as e:
-            log_message(f"❌ Error processing {company}: {str(e)}")
-            import traceback
-            error_trace = traceback.format_exc()
-            log_message(f"Traceback:\n{error_trace}", to_console=False)
-            fail += 1
-        
-        time.sleep(0.5)
+            save_ingestion_state(INGESTION_STATE_PATH, state)
+        except OSError as e:
+            log_message(f"  Could not save ingestion state: {e}")
     
     # Summary
     elapsed = time.time() - start_time
@@ -294,7 +588,10 @@ def main():
     log_message(f"  Success: {success}")
     log_message(f"  Failed: {fail}")
     log_message(f"  Total: {len(companies)}")
-    log_message(f"  Time: {elapsed:.2f}s ({elapsed/60:.2f} min)")
+    log_message(f"  Time: {elapsed:.2f}s ({elapsed/60:.2f} min)", fields={
+        "event": "run_done", "succeeded": success, "failed": fail, "seconds": round(elapsed, 3)
+    })
+    log_failure_summary()
     
     # Show registry info
     try:
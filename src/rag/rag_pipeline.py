@@ -5,18 +5,41 @@ Uses LangChain for text splitting and OpenAI for embeddings
 
 import os
 import json
+import asyncio
+import math
+import heapq
 import hashlib
-from typing import List, Dict, Optional
+import tempfile
+import threading
+import time
+import traceback
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import repeat
+from operator import itemgetter
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 from datetime import datetime, timezone
 
 import chromadb
+import httpx
+import numpy as np
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings
 from langchain_core.documents import Document
 
+from .embedding_cache import EmbeddingCache
+
 # ========== COMPANY REGISTRY MANAGEMENT ==========
 
+# Serializes registry read-modify-write cycles when companies ingest concurrently
+_registry_lock = threading.Lock()
+
+# Parsed registry per file, reused while the file's (mtime_ns, size) is unchanged;
+# other processes' writes change the signature, so the cache never goes stale
+_registry_cache: Dict[Path, Tuple[Tuple[int, int], Dict[str, Dict]]] = {}
+
+
 def get_registry_path(project_root: Optional[Path] = None) -> Path:
     """Get path to company registry file."""
     if project_root is None:
@@ -38,24 +61,43 @@ def load_company_registry(project_root: Optional[Path] = None) -> Dict[str, Dict
     """
     registry_path = get_registry_path(project_root)
     
-    if not registry_path.exists():
+    try:
+        stat = registry_path.stat()
+    except FileNotFoundError:
         return {}
     
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _registry_cache.get(registry_path)
+    if cached is not None and cached[0] == signature:
+        return dict(cached[1])
+    
     try:
         with open(registry_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            registry = json.load(f)
     except Exception as e:
         print(f"Warning: Could not load company registry: {e}")
         return {}
+    
+    _registry_cache[registry_path] = (signature, registry)
+    return dict(registry)
 
 
 def save_company_registry(registry: Dict[str, Dict], project_root: Optional[Path] = None):
-    """Save company registry to file."""
+    """Save company registry to file (atomically: readers never see a partial file)."""
     registry_path = get_registry_path(project_root)
     
     try:
-        with open(registry_path, 'w', encoding='utf-8') as f:
-            json.dump(registry, f, indent=2, ensure_ascii=False)
+        fd, tmp_path = tempfile.mkstemp(dir=registry_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(registry, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, registry_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        
+        stat = registry_path.stat()
+        _registry_cache[registry_path] = ((stat.st_mtime_ns, stat.st_size), dict(registry))
     except Exception as e:
         print(f"Error saving company registry: {e}")
 
@@ -80,25 +122,27 @@ def register_company(
     if chunks_count <= 0:
         return
     
-    registry = load_company_registry(project_root)
-    
-    registry[company_name] = {
-        'ingested_at': datetime.now(timezone.utc).isoformat(),
-        'chunks_count': chunks_count,
-        'sources_count': sources_count,
-        'last_updated': datetime.now(timezone.utc).isoformat()
-    }
-    
-    save_company_registry(registry, project_root)
+    with _registry_lock:
+        registry = load_company_registry(project_root)
+        
+        registry[company_name] = {
+            'ingested_at': datetime.now(timezone.utc).isoformat(),
+            'chunks_count': chunks_count,
+            'sources_count': sources_count,
+            'last_updated': datetime.now(timezone.utc).isoformat()
+        }
+        
+        save_company_registry(registry, project_root)
 
 
 def unregister_company(company_name: str, project_root: Optional[Path] = None):
     """Remove a company from the registry (e.g., when force_refresh deletes data)."""
-    registry = load_company_registry(project_root)
-    
-    if company_name in registry:
-        del registry[company_name]
-        save_company_registry(registry, project_root)
+    with _registry_lock:
+        registry = load_company_registry(project_root)
+        
+        if company_name in registry:
+            del registry[company_name]
+            save_company_registry(registry, project_root)
 
 
 def cleanup_registry(project_root: Optional[Path] = None) -> int:
@@ -106,21 +150,22 @@ def cleanup_registry(project_root: Optional[Path] = None) -> int:
     Remove companies with 0 chunks from the registry.
     Returns number of companies removed.
     """
-    registry = load_company_registry(project_root)
-    
-    removed = 0
-    to_remove = []
-    
-    for company_name, data in registry.items():
-        if data.get('chunks_count', 0) == 0:
-            to_remove.append(company_name)
-    
-    for company_name in to_remove:
-        del registry[company_name]
-        removed += 1
-    
-    if removed > 0:
-        save_company_registry(registry, project_root)
+    with _registry_lock:
+        registry = load_company_registry(project_root)
+        
+        removed = 0
+        to_remove = []
+        
+        for company_name, data in registry.items():
+            if data.get('chunks_count', 0) == 0:
+                to_remove.append(company_name)
+        
+        for company_name in to_remove:
+            del registry[company_name]
+            removed += 1
+        
+        if removed > 0:
+            save_company_registry(registry, project_root)
     
     return removed
 
@@ -137,7 +182,10 @@ def load_company_data_from_disk(company_name: str, base_path: str) -> List[Dict]
     """
     company_path = Path(base_path) / company_name / "initial"
     
-    if not company_path.exists():
+    # One directory listing replaces an exists() stat per candidate file
+    try:
+        file_names = set(os.listdir(company_path))
+    except FileNotFoundError:
         raise ValueError(f"Company path does not exist: {company_path}")
     
     data = []
@@ -148,27 +196,28 @@ def load_company_data_from_disk(company_name: str, base_path: str) -> List[Dict]
     
     for source_type in source_types:
         # Try different file extensions
-        possible_files = [
-            company_path / source_type,
-            company_path / f"{source_type}.txt",
-            company_path / f"{source_type}.html"
-        ]
-        
-        text_file = None
-        for pf in possible_files:
-            if pf.exists():
-                text_file = pf
-                break
+        text_name = next(
+            (name for name in (source_type, f"{source_type}.txt", f"{source_type}.html")
+             if name in file_names),
+            None
+        )
         
-        if text_file is None:
+        if text_name is None:
             continue
         
+        text_file = company_path / text_name
         meta_file = company_path / f"{source_type}.meta"
         
         try:
-            # Read text content
-            with open(text_file, 'r', encoding='utf-8', errors='ignore') as f:
-                text = f.read()
+            # Read text content in one read and one decode; a file under 50 bytes
+            # cannot hold 50 characters, so it is skipped before decoding
+            raw = text_file.read_bytes()
+            if len(raw) < 50:
+                continue
+            text = raw.decode('utf-8', errors='ignore')
+            if '\r' in text:
+                # Same newline translation text-mode open() applied
+                text = text.replace('\r\n', '\n').replace('\r', '\n')
             
             # Skip empty or very short files
             if not text or len(text.strip()) < 50:
@@ -176,7 +225,7 @@ def load_company_data_from_disk(company_name: str, base_path: str) -> List[Dict]
             
             # Load metadata if available
             metadata = {}
-            if meta_file.exists():
+            if meta_file.name in file_names:
                 try:
                     with open(meta_file, 'r', encoding='utf-8') as f:
                         metadata = json.load(f)
@@ -201,6 +250,63 @@ def load_company_data_from_disk(company_name: str, base_path: str) -> List[Dict]
     return data
 
 
+# ========== RESULT DIVERSIFICATION ==========
+
+def maximal_marginal_relevance(
+    chunks: List[Dict],
+    top_k: int,
+    lambda_mult: float = 0.5
+) -> List[Dict]:
+    """
+    Select chunks that are relevant to the query but not redundant with each other.
+    
+    Relevance comes from each chunk's 'distance' (ChromaDB's default squared L2
+    between unit-length embeddings, so cosine similarity = 1 - distance / 2);
+    redundancy is the highest cosine similarity to an already selected chunk,
+    computed from the chunks' 'embedding' vectors.
+    
+    Args:
+        chunks: Search results carrying 'distance' and 'embedding'
+        top_k: Number of chunks to select
+        lambda_mult: Trade-off between relevance (1.0) and diversity (0.0)
+    
+    Returns:
+        Up to top_k chunks in selection order. Falls back to the top_k closest
+        chunks when any chunk lacks an embedding or distance.
+    """
+    def distance(chunk: Dict) -> float:
+        value = chunk.get('distance')
+        return math.inf if value is None else value
+    
+    if len(chunks) <= top_k or any(
+        c.get('embedding') is None or c.get('distance') is None for c in chunks
+    ):
+        return heapq.nsmallest(top_k, chunks, key=distance)
+    
+    vectors = np.asarray([c['embedding'] for c in chunks], dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms == 0, 1.0, norms)
+    
+    relevance = 1.0 - np.asarray([c['distance'] for c in chunks], dtype=np.float32) / 2.0
+    similarity = vectors @ vectors.T
+    
+    selected = [int(np.argmax(relevance))]
+    max_similarity = similarity[selected[0]].copy()
+    
+    while len(selected) < top_k:
+        scores = lambda_mult * relevance - (1.0 - lambda_mult) * max_similarity
+        scores[selected] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        max_similarity = np.maximum(max_similarity, similarity[best])
+    
+    return [chunks[idx] for idx in selected]
+
+
+class EmbeddingServiceError(ConnectionError):
+    """Raised when an OpenAI embeddings request fails (after the client's retries)."""
+
+
 class VectorStore:
     """
     ChromaDB Vector Store with LangChain Integration.
@@ -211,6 +317,11 @@ class VectorStore:
     - Stores in ChromaDB Cloud for persistence
     """
     
+    # Chunks fetched per collection.get() when loading a company's local index
+    _LOCAL_INDEX_PAGE = 1000
+    # int8 rows widened to float32 at a time during a local search (~6 MB at 384 dims)
+    _LOCAL_SEARCH_BLOCK = 4096
+    
     def __init__(
         self,
         api_key: str,
@@ -219,7 +330,12 @@ class VectorStore:
         openai_api_key: str,
         collection_name: str = 'companies',
         chunk_size: int = 1000,
-        chunk_overlap: int = 200
+        chunk_overlap: int = 200,
+        query_cache_size: int = 4096,
+        embedding_cache_path: Optional[str] = None,
+        add_batch_size: int = 250,
+        add_workers: int = 4,
+        local_index_ttl: Optional[float] = None
     ):
         """
         Initialize ChromaDB with LangChain components.
@@ -232,16 +348,34 @@ class VectorStore:
             collection_name: Name for the collection
             chunk_size: Size of text chunks (characters, ~750 tokens)
             chunk_overlap: Overlap between chunks (characters)
+            query_cache_size: Max query embeddings kept in the in-process LRU cache
+            embedding_cache_path: Optional SQLite file for persistent document
+                embeddings; unchanged chunks are not re-embedded on re-ingestion
+            add_batch_size: Records per ChromaDB add() request
+            add_workers: ChromaDB add() requests in flight at once
+            local_index_ttl: Seconds to keep a company's chunks in memory and
+                search them locally instead of querying ChromaDB; None disables.
+                Only companies in the registry are indexed, and an index is
+                rebuilt early when the company's registered chunk count changes
         """
         try:
             # Initialize ChromaDB
             self.client = chromadb.CloudClient(
                 api_key=api_key,
                 tenant=tenant,
-                database=database
+                database=database,
+                # Chroma's default pool keeps only 20 idle connections for 40s; concurrent
+                # add() batches across companies exceed that, and every dropped
+                # connection costs a fresh TLS handshake on the next request
+                settings=chromadb.Settings(
+                    chroma_http_keepalive_secs=60.0,
+                    chroma_http_max_keepalive_connections=64
+                )
             )
             self.collection_name = collection_name
             self.collection = self._get_or_create_collection()
+            self.add_batch_size = add_batch_size
+            self.add_workers = add_workers
             
             # Initialize LangChain Text Splitter
             # RecursiveCharacterTextSplitter tries to split on:
@@ -259,11 +393,45 @@ class VectorStore:
             
             # Initialize OpenAI Embeddings
             # Uses text-embedding-3-small by default (1536 dimensions)
+            self.embedding_model = "text-embedding-3-small"
+            self.embedding_dimensions = 384
             self.embeddings = OpenAIEmbeddings(
                 openai_api_key=openai_api_key,
-                model="text-embedding-3-small",  # Fast, cheap, good quality
+                model=self.embedding_model,  # Fast, cheap, good quality
                 chunk_size=1000,  # Batch size for API calls
-                dimensions=384
+                dimensions=self.embedding_dimensions,
+                max_retries=6,  # Exponential backoff on 429s instead of fixed sleeps
+                # One HTTP/2 connection pool shared by every thread embedding
+                # through this store (concurrent batches multiplex over it)
+                http_client=httpx.Client(
+                    http2=True,
+                    limits=httpx.Limits(
+                        max_connections=64,
+                        max_keepalive_connections=32,
+                        keepalive_expiry=60.0
+                    ),
+                    timeout=httpx.Timeout(60.0, connect=5.0)
+                )
+            )
+            
+            # Exact-match LRU cache for query embeddings, keyed on (normalized query, model)
+            self.query_cache_size = query_cache_size
+            self._query_embedding_cache: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+            self._query_cache_lock = threading.Lock()
+            
+            # Per-company in-memory chunks for exact local search
+            # (company -> (loaded_at, registered chunk count, index))
+            self.local_index_ttl = local_index_ttl
+            self._local_indexes: Dict[str, Tuple[float, int, Dict]] = {}
+            self._local_index_lock = threading.Lock()
+            # Loads in flight, so concurrent cold searches share a single bulk load;
+            # entries are removed when their load finishes
+            self._local_index_loads: Dict[str, Future] = {}
+            
+            # Content-hash cache for document embeddings (ingestion only)
+            self.embedding_cache = (
+                EmbeddingCache(embedding_cache_path, self.embedding_model, self.embedding_dimensions)
+                if embedding_cache_path else None
             )
             
             print(f"✓ Connected to ChromaDB collection: {collection_name}")
@@ -348,146 +516,322 @@ class VectorStore:
         Returns:
             Dict with ingestion statistics
         """
+        prepared = self.prepare_company_chunks(company_name, scraped_data)
+        stats = prepared['stats']
+        
+        if not prepared['texts']:
+            if force_refresh:
+                self._delete_company_data(company_name)
+            return stats
+        
+        try:
+            print(f"  Generating embeddings for {len(prepared['texts'])} chunks...")
+            embeddings = self.embed_documents_batched(prepared['texts'])
+            print(f"  ✓ Generated {len(embeddings)} embeddings")
+        except Exception as e:
+            stats['errors'].append(f"ChromaDB/Embedding error: {str(e)}")
+            print(f"❌ Error details: {str(e)}")
+            return stats
+        
+        return self.store_precomputed(company_name, prepared, embeddings, force_refresh)
+    
+    def prepare_company_chunks(self, company_name: str, scraped_data: List[Dict]) -> Dict:
+        """
+        Chunk a company's scraped sources and build their ChromaDB records (no embedding).
+        
+        Args:
+            company_name: Name of the company
+            scraped_data: List of dicts with 'source_url', 'text', 'crawled_at', 'source_type'
+        
+        Returns:
+            Dict with parallel 'texts', 'metadatas' and 'ids' lists, plus the
+            ingestion 'stats' so far
+        """
         stats = {
             'company': company_name,
             'sources_processed': 0,
             'chunks_created': 0,
             'chunks_stored': 0,
+            'chunks_deduped': 0,
             'errors': []
         }
         
+        all_chunks_text = []
+        all_metadatas = []
+        all_ids = []
+        # One fallback timestamp for sources without 'crawled_at', so they share a chunk-ID epoch
+        ingested_at = datetime.now(timezone.utc).isoformat()
+        
+        for source_data in scraped_data:
+            try:
+                source_url = source_data.get('source_url', 'unknown')
+                source_type = source_data.get('source_type', 'unknown')
+                text = source_data.get('text', '')
+                crawled_at = source_data.get('crawled_at', ingested_at)
+                
+                if not text or not text.strip():
+                    continue
+                
+                # Chunk using LangChain. split_text gives the same chunks as
+                # chunk_text_langchain without building a Document (and deep-copying
+                # its metadata) per chunk; the ChromaDB metadata is built below anyway
+                chunks = self.text_splitter.split_text(text)
+                stats['chunks_created'] += len(chunks)
+                
+                # Prepare chunks for ChromaDB
+                # Use crawled_at timestamp for consistent chunk IDs within same ingestion
+                for chunk_idx, chunk in enumerate(chunks):
+                    chunk_id = self.generate_chunk_id(company_name, source_type, chunk_idx, crawled_at)
+                    
+                    all_chunks_text.append(chunk)
+                    all_metadatas.append({
+                        'company_name': str(company_name),
+                        'source_url': str(source_url),
+                        'source_type': str(source_type),
+                        'chunk_index': int(chunk_idx),
+                        'total_chunks': int(len(chunks)),
+                        'crawled_at': str(crawled_at),
+                        'chunk_size': int(len(chunk))
+                    })
+                    all_ids.append(chunk_id)
+                
+                stats['sources_processed'] += 1
+                
+            except Exception as e:
+                stats['errors'].append(f"Error processing {source_type}: {str(e)}")
+        
+        # Boilerplate repeated across sources is stored under every chunk id
+        # but embedded only once (see embed_documents_batched)
+        stats['chunks_deduped'] = len(all_chunks_text) - len(set(all_chunks_text))
+        
+        return {
+            'texts': all_chunks_text,
+            'metadatas': all_metadatas,
+            'ids': all_ids,
+            'stats': stats
+        }
+    
+    def embed_documents_batched(
+        self,
+        texts: List[str],
+        batch_size: int = 1024,
+        max_workers: int = 8
+    ) -> List[List[float]]:
+        """
+        Embed many documents with several OpenAI requests in flight at once.
+        
+        Identical texts are embedded once and the vector is reused for every
+        occurrence. With an embedding cache, texts already embedded by this
+        model are served from it and only the misses are sent to OpenAI.
+        
+        Args:
+            texts: Documents to embed
+            batch_size: Inputs per embeddings request (OpenAI allows up to 2048)
+            max_workers: Concurrent embeddings requests
+        
+        Returns:
+            One embedding per text, in the same order
+        """
+        if self.embedding_cache is None:
+            unique = list(dict.fromkeys(texts))
+            if len(unique) == len(texts):
+                return self._embed_uncached(texts, batch_size, max_workers)
+            by_text = dict(zip(unique, self._embed_uncached(unique, batch_size, max_workers)))
+            return [by_text[text] for text in texts]
+        
+        embeddings = self.embedding_cache.get_many(texts)
+        misses = list(dict.fromkeys(text for text, emb in zip(texts, embeddings) if emb is None))
+        if misses:
+            fresh = self._embed_uncached(misses, batch_size, max_workers)
+            self.embedding_cache.put_many(misses, fresh)
+            by_text = dict(zip(misses, fresh))
+            embeddings = [by_text[text] if emb is None else emb for text, emb in zip(texts, embeddings)]
+        
+        print(f"✓ Embedding cache: {len(texts) - len(misses)}/{len(texts)} hits")
+        return embeddings
+    
+    def _embed_uncached(self, texts: List[str], batch_size: int, max_workers: int) -> List[List[float]]:
+        # No separate connectivity probe: a failing first request is the check
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        try:
+            if len(batches) <= 1:
+                return self.embeddings.embed_documents(texts) if texts else []
+            
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+                results = executor.map(self.embeddings.embed_documents, batches)
+                return [embedding for batch in results for embedding in batch]
+        except Exception as e:
+            raise EmbeddingServiceError(f"OpenAI embeddings request failed: {e}") from e
+    
+    def store_precomputed(
+        self,
+        company_name: str,
+        prepared: Dict,
+        embeddings: List[List[float]],
+        force_refresh: bool = False
+    ) -> Dict:
+        """
+        Store chunks from prepare_company_chunks() with already computed embeddings.
+        
+        Args:
+            company_name: Name of the company
+            prepared: Output of prepare_company_chunks()
+            embeddings: One embedding per prepared text, in the same order
+            force_refresh: If True, delete existing data first
+        
+        Returns:
+            Dict with ingestion statistics
+        """
+        stats = prepared['stats']
+        all_chunks_text = prepared['texts']
+        all_metadatas = prepared['metadatas']
+        all_ids = prepared['ids']
+        
         try:
             # Delete existing data if force refresh
             if force_refresh:
                 self._delete_company_data(company_name)
             
-            all_chunks_text = []
-            all_metadatas = []
-            all_ids = []
+            if not all_chunks_text:
+                return stats
             
-            for source_data in scraped_data:
-                try:
-                    source_url = source_data.get('source_url', 'unknown')
-                    source_type = source_data.get('source_type', 'unknown')
-                    text = source_data.get('text', '')
-                    crawled_at = source_data.get('crawled_at', datetime.now(timezone.utc).isoformat())
-                    
-                    if not text or not text.strip():
-                        continue
-                    
-                    # Chunk using LangChain
-                    base_metadata = {
-                        'company_name': company_name,
-                        'source_url': source_url,
-                        'source_type': source_type,
-                        'crawled_at': crawled_at
-                    }
-                    
-                    chunks = self.chunk_text_langchain(text, base_metadata)
-                    stats['chunks_created'] += len(chunks)
-                    
-                    # Prepare chunks for ChromaDB
-                    # Use crawled_at timestamp for consistent chunk IDs within same ingestion
-                    for chunk_idx, chunk in enumerate(chunks):
-                        chunk_id = self.generate_chunk_id(company_name, source_type, chunk_idx, crawled_at)
-                        
-                        all_chunks_text.append(chunk.page_content)
-                        all_metadatas.append({
-                            'company_name': str(company_name),
-                            'source_url': str(source_url),
-                            'source_type': str(source_type),
-                            'chunk_index': int(chunk_idx),
-                            'total_chunks': int(len(chunks)),
-                            'crawled_at': str(crawled_at),
-                            'chunk_size': int(len(chunk.page_content))
-                        })
-                        all_ids.append(chunk_id)
-                    
-                    stats['sources_processed'] += 1
-                    
-                except Exception as e:
-                    stats['errors'].append(f"Error processing {source_type}: {str(e)}")
+            print(f"  Storing in ChromaDB...")
             
-            # Generate embeddings and store in ChromaDB
-            if all_chunks_text:
-                try:
-                    print(f"  Generating embeddings for {len(all_chunks_text)} chunks...")
-                    
-                    # Use LangChain's OpenAI embeddings
-                    embeddings_list = self.embeddings.embed_documents(all_chunks_text)
-                    
-                    print(f"  ✓ Generated {len(embeddings_list)} embeddings")
-                    print(f"  Storing in ChromaDB...")
-                    
-                    # Batch insert to ChromaDB
-                    batch_size = 5000
-                    for i in range(0, len(all_chunks_text), batch_size):
-                        batch_texts = all_chunks_text[i:i + batch_size]
-                        batch_metadatas = all_metadatas[i:i + batch_size]
-                        batch_ids = all_ids[i:i + batch_size]
-                        batch_embeddings = embeddings_list[i:i + batch_size]
-                        
-                        self.collection.add(
-                            documents=batch_texts,
-                            metadatas=batch_metadatas,
-                            ids=batch_ids,
-                            embeddings=batch_embeddings
-                        )
-                    
-                    stats['chunks_stored'] = len(all_chunks_text)
-                    print(f"✓ Ingested {stats['chunks_stored']} chunks for {company_name}")
-                    
-                    # Register successful ingestion in company registry
-                    if stats['chunks_stored'] > 0:
-                        try:
-                            # Get project root (3 levels up from this file)
-                            project_root = Path(__file__).resolve().parent.parent.parent
-                            register_company(
-                                company_name=company_name,
-                                chunks_count=stats['chunks_stored'],
-                                sources_count=stats['sources_processed'],
-                                project_root=project_root
-                            )
-                        except Exception as e:
-                            print(f"Warning: Could not register company in registry: {e}")
-                    
-                except Exception as e:
-                    stats['errors'].append(f"ChromaDB/Embedding error: {str(e)}")
-                    print(f"❌ Error details: {str(e)}")
+            # Batch insert to ChromaDB, several add() requests in flight at once
+            batch_size = self.add_batch_size
+            
+            def add_batch(i: int):
+                self.collection.add(
+                    documents=all_chunks_text[i:i + batch_size],
+                    metadatas=all_metadatas[i:i + batch_size],
+                    ids=all_ids[i:i + batch_size],
+                    embeddings=embeddings[i:i + batch_size]
+                )
+            
+            starts = range(0, len(all_chunks_text), batch_size)
+            if len(starts) == 1:
+                add_batch(0)
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.add_workers, len(starts))) as executor:
+                    # list() re-raises the first failed batch
+                    list(executor.map(add_batch, starts))
+            
+            stats['chunks_stored'] = len(all_chunks_text)
+            self._invalidate_local_index(company_name)
+            print(f"✓ Ingested {stats['chunks_stored']} chunks for {company_name}")
+            
+            # Register successful ingestion in company registry
+            try:
+                # Get project root (3 levels up from this file)
+                project_root = Path(__file__).resolve().parent.parent.parent
+                register_company(
+                    company_name=company_name,
+                    chunks_count=stats['chunks_stored'],
+                    sources_count=stats['sources_processed'],
+                    project_root=project_root
+                )
+            except Exception as e:
+                print(f"Warning: Could not register company in registry: {e}")
             
         except Exception as e:
-            stats['errors'].append(f"Fatal error: {str(e)}")
+            stats['errors'].append(f"ChromaDB/Embedding error: {str(e)}")
+            print(f"❌ Error details: {str(e)}")
         
         return stats
     
     def _delete_company_data(self, company_name: str):
         """Delete all chunks for a company."""
         try:
-            results = self.collection.get(where={"company_name": company_name})
-            if results['ids']:
-                self.collection.delete(ids=results['ids'])
-                print(f"✓ Deleted {len(results['ids'])} existing chunks for {company_name}")
-                
-                # Also remove from registry when force refreshing
-                try:
-                    project_root = Path(__file__).resolve().parent.parent.parent
-                    unregister_company(company_name, project_root)
-                except Exception as e:
-                    print(f"Warning: Could not unregister company: {e}")
+            # Filtered server-side in one request, no chunk IDs sent back and forth
+            self.collection.delete(where={"company_name": company_name})
+            self._invalidate_local_index(company_name)
+            print(f"✓ Deleted existing chunks for {company_name}")
+            
+            # Also remove from registry when force refreshing
+            try:
+                project_root = Path(__file__).resolve().parent.parent.parent
+                unregister_company(company_name, project_root)
+            except Exception as e:
+                print(f"Warning: Could not unregister company: {e}")
         except Exception as e:
             print(f"Warning: Could not delete existing data: {str(e)}")
     
+    def _query_cache_key(self, query: str) -> Tuple[str, str]:
+        """Cache key for a query embedding (surrounding whitespace only; case is kept,
+        since it matters for entity names and tickers)."""
+        return (query.strip(), self.embedding_model)
+    
+    def _get_cached_query_embedding(self, key: Tuple[str, str]) -> Optional[List[float]]:
+        with self._query_cache_lock:
+            embedding = self._query_embedding_cache.get(key)
+            if embedding is not None:
+                self._query_embedding_cache.move_to_end(key)
+            return embedding
+    
+    def _cache_query_embedding(self, key: Tuple[str, str], embedding: List[float]):
+        with self._query_cache_lock:
+            self._query_embedding_cache[key] = embedding
+            self._query_embedding_cache.move_to_end(key)
+            while len(self._query_embedding_cache) > self.query_cache_size:
+                self._query_embedding_cache.popitem(last=False)
+    
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a single query string, using the in-process LRU cache.
+        
+        Args:
+            query: Query string to embed
+        
+        Returns:
+            Query embedding
+        """
+        key = self._query_cache_key(query)
+        embedding = self._get_cached_query_embedding(key)
+        if embedding is None:
+            # Embed the caller's text; only the cache key is normalized
+            embedding = self.embeddings.embed_query(query)
+            self._cache_query_embedding(key, embedding)
+        return embedding
+    
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        Embed several query strings, sending all cache misses in a single OpenAI request.
+        
+        Args:
+            queries: Query strings to embed
+        
+        Returns:
+            One embedding per query, in the same order
+        """
+        keys = [self._query_cache_key(query) for query in queries]
+        embeddings = {key: self._get_cached_query_embedding(key) for key in keys}
+        
+        # Embed the caller's text (first occurrence per key); only the cache key is normalized
+        missing = {}
+        for key, query in zip(keys, queries):
+            if embeddings[key] is None:
+                missing.setdefault(key, query)
+        if missing:
+            new_embeddings = self.embeddings.embed_documents(list(missing.values()))
+            for key, embedding in zip(missing, new_embeddings):
+                self._cache_query_embedding(key, embedding)
+                embeddings[key] = embedding
+        
+        return [embeddings[key] for key in keys]
+    
     def search(
     self,
     company_name: str,
     query: str,
     top_k: int = 5,
-    filter_by_source_type: Optional[str] = None
+    filter_by_source_type: Optional[str] = None,
+    query_embedding: Optional[List[float]] = None
 ) -> List[Dict]:
         """Search for relevant chunks using semantic similarity."""
         try:
-            # Generate embedding for query using OpenAI
-            query_embedding = self.embeddings.embed_query(query)
+            # Generate embedding for query using OpenAI (unless precomputed)
+            if query_embedding is None:
+                query_embedding = self.embed_query(query)
             
             # Build filter - FIXED for ChromaDB's syntax
             where_filter = {"company_name": company_name}
@@ -495,47 +839,313 @@ class VectorStore:
             # ChromaDB doesn't support multiple conditions in where easily
             # So we'll filter by company first, then filter results by source_type
             
-            # Search ChromaDB
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=top_k * 2 if filter_by_source_type else top_k,  # Get more if filtering
-                where=where_filter  # Only filter by company_name
-            )
+            n_results = top_k * 2 if filter_by_source_type else top_k  # Get more if filtering
             
-            if not results['documents'][0]:
-                return []
+            local_index = self._get_local_index_or_none(company_name)
+            if local_index is not None:
+                results = self._query_local_index(local_index, [query_embedding], n_results)
+            else:
+                # Search ChromaDB
+                results = self.collection.query(
+                    query_embeddings=[query_embedding],
+                    n_results=n_results,
+                    where=where_filter  # Only filter by company_name
+                )
             
-            # Format and filter results
-            formatted_results = []
-            for idx, doc in enumerate(results['documents'][0]):
-                metadata = results['metadatas'][0][idx]
-                
-                # Apply source_type filter manually if needed
-                if filter_by_source_type and metadata.get('source_type') != filter_by_source_type:
-                    continue
-                
-                formatted_results.append({
-                    'text': doc,
-                    'source_url': metadata.get('source_url', 'unknown'),
-                    'source_type': metadata.get('source_type', 'unknown'),
-                    'chunk_index': metadata.get('chunk_index', 0),
-                    'crawled_at': metadata.get('crawled_at', ''),
-                    'distance': results['distances'][0][idx] if 'distances' in results else None,
-                    'metadata': metadata
-                })
-                
-                # Stop when we have enough results
-                if len(formatted_results) >= top_k:
-                    break
-            
-            return formatted_results
+            return self._format_query_results(results, 0, top_k, filter_by_source_type)
             
         except Exception as e:
             print(f"Search error: {str(e)}")
-            import traceback
             traceback.print_exc()
             return []
     
+    def multi_search(
+        self,
+        company_name: str,
+        queries: List[str],
+        top_k_per_query: int = 2,
+        filter_by_source_type: Optional[str] = None,
+        query_embeddings: Optional[List[List[float]]] = None,
+        include_embeddings: bool = False
+    ) -> List[List[Dict]]:
+        """
+        Search for several queries with one embedding request and one ChromaDB query.
+        
+        Args:
+            company_name: Company to search within
+            queries: Query strings
+            top_k_per_query: Results to return per query
+            filter_by_source_type: Optional source_type filter
+            query_embeddings: Precomputed embeddings for the queries (skips embedding)
+            include_embeddings: Attach each chunk's stored vector as 'embedding'
+        
+        Returns:
+            One result list per query, in the same order as queries
+        
+        Raises:
+            Exception: Embedding or ChromaDB errors are propagated to the caller
+        """
+        if not queries:
+            return []
+        
+        if query_embeddings is None:
+            query_embeddings = self.embed_queries(queries)
+        
+        n_results = top_k_per_query * 2 if filter_by_source_type else top_k_per_query
+        
+        local_index = self._get_local_index_or_none(company_name)
+        if local_index is not None:
+            results = self._query_local_index(local_index, query_embeddings, n_results, include_embeddings)
+        else:
+            include = ["documents", "metadatas", "distances"]
+            if include_embeddings:
+                include.append("embeddings")
+            
+            results = self.collection.query(
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                where={"company_name": company_name},
+                include=include
+            )
+        
+        return [
+            self._format_query_results(results, query_idx, top_k_per_query, filter_by_source_type)
+            for query_idx in range(len(queries))
+        ]
+    
+    def _get_local_index_or_none(self, company_name: str) -> Optional[Dict]:
+        """Get the company's local index, or None to query ChromaDB instead (also when loading fails)."""
+        try:
+            return self._get_local_index(company_name)
+        except Exception as e:
+            print(f"⚠️ Local index load failed for {company_name}, querying ChromaDB instead: {e}")
+            return None
+    
+    def _get_local_index(self, company_name: str) -> Optional[Dict]:
+        """
+        Get a company's chunks and embeddings for local search, loading them from
+        ChromaDB when missing, older than local_index_ttl, or when the company's
+        registered chunk count has changed since the load (re-ingested).
+        
+        Returns:
+            The local index, or None when local search is disabled or the company
+            is not in the registry
+        """
+        if self.local_index_ttl is None:
+            return None
+        
+        # Unknown names never trigger a bulk load; the registry is also what the
+        # API's company list is built from
+        project_root = Path(__file__).resolve().parent.parent.parent
+        chunks_count = load_company_registry(project_root).get(company_name, {}).get('chunks_count', 0)
+        if not chunks_count:
+            return None
+        
+        with self._local_index_lock:
+            cached = self._local_indexes.get(company_name)
+            if (cached is not None and cached[1] == chunks_count
+                    and time.monotonic() - cached[0] < self.local_index_ttl):
+                return cached[2]
+            
+            loading = self._local_index_loads.get(company_name)
+            owner = loading is None
+            if owner:
+                loading = self._local_index_loads[company_name] = Future()
+        
+        if not owner:
+            # Another search is already loading this company
+            return loading.result()
+        
+        try:
+            index = self._load_local_index(company_name)
+        except BaseException as e:
+            with self._local_index_lock:
+                self._local_index_loads.pop(company_name, None)
+            loading.set_exception(e)
+            raise
+        
+        now = time.monotonic()
+        with self._local_index_lock:
+            # Drop expired companies instead of holding them until their next search
+            expired = [
+                name for name, (loaded_at, _, _) in self._local_indexes.items()
+                if now - loaded_at >= self.local_index_ttl
+            ]
+            for name in expired:
+                del self._local_indexes[name]
+            self._local_indexes[company_name] = (now, chunks_count, index)
+            self._local_index_loads.pop(company_name, None)
+        loading.set_result(index)
+        return index
+    
+    def _load_local_index(self, company_name: str) -> Dict:
+        """Page a company's chunks out of ChromaDB into an int8-quantized local index."""
+        documents, metadatas, codes, scales, sq_norms = [], [], [], [], []
+        offset = 0
+        
+        while True:
+            page = self.collection.get(
+                where={"company_name": company_name},
+                include=["documents", "metadatas", "embeddings"],
+                limit=self._LOCAL_INDEX_PAGE,
+                offset=offset
+            )
+            count = len(page['ids'])
+            if count:
+                documents.extend(page['documents'])
+                metadatas.extend(page['metadatas'])
+                # Quantized page by page, so at most one page is ever held as float32
+                page_codes, page_scales, page_sq_norms = self._quantize_int8(
+                    np.asarray(page['embeddings'], dtype=np.float32)
+                )
+                codes.append(page_codes)
+                scales.append(page_scales)
+                sq_norms.append(page_sq_norms)
+            if count < self._LOCAL_INDEX_PAGE:
+                break
+            offset += count
+        
+        dims = self.embedding_dimensions
+        return {
+            'documents': documents,
+            'metadatas': metadatas,
+            'codes': np.concatenate(codes) if codes else np.empty((0, dims), dtype=np.int8),
+            'scales': np.concatenate(scales) if scales else np.empty(0, dtype=np.float32),
+            'sq_norms': np.concatenate(sq_norms) if sq_norms else np.empty(0, dtype=np.float32)
+        }
+    
+    @staticmethod
+    def _quantize_int8(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Quantize float32 vectors to int8 codes with one scale per vector.
+        
+        A quarter of float32's memory, at most scale/2 (~1e-3 for unit vectors)
+        error per component.
+        
+        Returns:
+            (codes, scales, squared norms of the dequantized vectors)
+        """
+        scales = np.abs(embeddings).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.round(embeddings / scales[:, None]).astype(np.int8)
+        # ||scale * code||^2 from integer sums; no dequantized copy is allocated
+        code_sq_sums = np.einsum('ij,ij->i', codes, codes, dtype=np.int32)
+        return codes, scales, (scales * scales * code_sq_sums).astype(np.float32)
+    
+    def _invalidate_local_index(self, company_name: str):
+        """Drop a company's local index after its chunks change."""
+        with self._local_index_lock:
+            self._local_indexes.pop(company_name, None)
+    
+    @classmethod
+    def _query_local_index(
+        cls,
+        index: Dict,
+        query_embeddings: List[List[float]],
+        n_results: int,
+        include_embeddings: bool = False
+    ) -> Dict:
+        """Exhaustive nearest-neighbour search over a local index, shaped like collection.query() results."""
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        codes = index['codes']
+        # Queries stay float32; each dot product is rescaled by its vector's scale.
+        # Codes are widened block by block, so a search never holds a float32 copy
+        # of the whole index
+        dots = np.empty((len(queries), len(codes)), dtype=np.float32)
+        for start in range(0, len(codes), cls._LOCAL_SEARCH_BLOCK):
+            block = slice(start, start + cls._LOCAL_SEARCH_BLOCK)
+            dots[:, block] = queries @ codes[block].T.astype(np.float32)
+        dots *= index['scales'][None, :]
+        # Squared L2, the distance ChromaDB reports for this collection
+        distances = (
+            index['sq_norms'][None, :]
+            - 2.0 * dots
+            + np.einsum('ij,ij->i', queries, queries)[:, None]
+        )
+        n = min(n_results, len(index['documents']))
+        
+        results = {'documents': [], 'metadatas': [], 'distances': []}
+        if include_embeddings:
+            results['embeddings'] = []
+        
+        for row in distances:
+            top = np.argpartition(row, n - 1)[:n] if n else np.empty(0, dtype=np.intp)
+            top = top[np.argsort(row[top])]
+            results['documents'].append([index['documents'][i] for i in top])
+            results['metadatas'].append([index['metadatas'][i] for i in top])
+            results['distances'].append(row[top].tolist())
+            if include_embeddings:
+                results['embeddings'].append(
+                    index['codes'][top].astype(np.float32) * index['scales'][top, None]
+                )
+        
+        return results
+    
+    def _format_query_results(
+        self,
+        results: Dict,
+        query_idx: int,
+        top_k: int,
+        filter_by_source_type: Optional[str] = None
+    ) -> List[Dict]:
+        """Format the ChromaDB results for one query into chunk dicts."""
+        documents = results['documents'][query_idx]
+        if not documents:
+            return []
+        
+        metadatas = results['metadatas'][query_idx]
+        distances = results['distances'][query_idx] if 'distances' in results else None
+        embeddings = results.get('embeddings')
+        embeddings = embeddings[query_idx] if embeddings is not None else None
+        
+        # Format and filter results
+        formatted_results = []
+        for doc, metadata, distance, embedding in zip(
+            documents,
+            metadatas,
+            distances if distances is not None else repeat(None),
+            embeddings if embeddings is not None else repeat(None)
+        ):
+            # Apply source_type filter manually if needed
+            if filter_by_source_type and metadata.get('source_type') != filter_by_source_type:
+                continue
+            
+            formatted_results.append({
+                'text': doc,
+                'source_url': metadata.get('source_url', 'unknown'),
+                'source_type': metadata.get('source_type', 'unknown'),
+                'chunk_index': metadata.get('chunk_index', 0),
+                'crawled_at': metadata.get('crawled_at', ''),
+                'distance': distance,
+                'metadata': metadata
+            })
+            if embeddings is not None:
+                formatted_results[-1]['embedding'] = embedding
+            
+            # Stop when we have enough results
+            if len(formatted_results) >= top_k:
+                break
+        
+        return formatted_results
+    
+    async def asearch(
+        self,
+        company_name: str,
+        query: str,
+        top_k: int = 5,
+        filter_by_source_type: Optional[str] = None,
+        query_embedding: Optional[List[float]] = None
+    ) -> List[Dict]:
+        """Async variant of search() that runs the blocking Chroma call in a worker thread."""
+        return await asyncio.to_thread(
+            self.search,
+            company_name=company_name,
+            query=query,
+            top_k=top_k,
+            filter_by_source_type=filter_by_source_type,
+            query_embedding=query_embedding
+        )
+    
     def get_all_context(self, company_name: str, max_chunks: int = 20) -> List[Dict]:
         """Get all available context for a company."""
         try:
@@ -547,18 +1157,19 @@ class VectorStore:
             if not results['documents']:
                 return []
             
-            formatted_results = []
-            for idx, doc in enumerate(results['documents']):
-                formatted_results.append({
+            formatted_results = [
+                {
                     'text': doc,
-                    'source_url': results['metadatas'][idx].get('source_url', 'unknown'),
-                    'source_type': results['metadatas'][idx].get('source_type', 'unknown'),
-                    'chunk_index': results['metadatas'][idx].get('chunk_index', 0),
-                    'crawled_at': results['metadatas'][idx].get('crawled_at', ''),
-                    'metadata': results['metadatas'][idx]
-                })
-            
-            formatted_results.sort(key=lambda x: (x['source_type'], x['chunk_index']))
+                    'source_url': metadata.get('source_url', 'unknown'),
+                    'source_type': metadata.get('source_type', 'unknown'),
+                    'chunk_index': metadata.get('chunk_index', 0),
+                    'crawled_at': metadata.get('crawled_at', ''),
+                    'metadata': metadata
+                }
+                for doc, metadata in zip(results['documents'], results['metadatas'])
+            ]
+            
+            formatted_results.sort(key=itemgetter('source_type', 'chunk_index'))
             return formatted_results
             
         except Exception as e:
@@ -570,59 +1181,59 @@ class VectorStore:
         Get list of all companies from the registry file (source of truth).
         Only returns companies with chunks_count > 0 (actually have data).
         Falls back to ChromaDB if registry doesn't exist.
+        
+        Raises:
+            Exception: ChromaDB errors from the fallback are propagated, so an
+                outage is not mistaken for an empty store
         """
-        try:
-            # Try to load from registry file first (source of truth)
-            project_root = Path(__file__).resolve().parent.parent.parent
-            registry = load_company_registry(project_root)
-            
-            if registry:
-                # Filter out companies with 0 chunks
-                companies = [
-                    name for name, data in registry.items()
-                    if data.get('chunks_count', 0) > 0
-                ]
-                companies = sorted(companies)
-                print(f"✓ Loaded {len(companies)} companies from registry (with data)")
-                return companies
-            
-            # Fallback to ChromaDB if registry is empty (for backward compatibility)
-            print("Registry empty, falling back to ChromaDB...")
-            results = self.collection.get()
-            if not results.get('metadatas'):
-                return []
-            
-            companies = set()
-            for metadata in results['metadatas']:
-                if 'company_name' in metadata:
-                    companies.add(metadata['company_name'])
-            
-            companies_list = sorted(list(companies))
-            print(f"✓ Loaded {len(companies_list)} companies from ChromaDB (fallback)")
-            return companies_list
-            
-        except Exception as e:
-            print(f"Error getting company list: {str(e)}")
+        # Try to load from registry file first (source of truth)
+        project_root = Path(__file__).resolve().parent.parent.parent
+        registry = load_company_registry(project_root)
+        
+        if registry:
+            # Filter out companies with 0 chunks
+            companies = [
+                name for name, data in registry.items()
+                if data.get('chunks_count', 0) > 0
+            ]
+            companies = sorted(companies)
+            print(f"✓ Loaded {len(companies)} companies from registry (with data)")
+            return companies
+        
+        # Fallback to ChromaDB if registry is empty (for backward compatibility)
+        print("Registry empty, falling back to ChromaDB...")
+        results = self.collection.get(include=["metadatas"])
+        if not results.get('metadatas'):
             return []
+        
+        companies_list = sorted({m['company_name'] for m in results['metadatas'] if 'company_name' in m})
+        print(f"✓ Loaded {len(companies_list)} companies from ChromaDB (fallback)")
+        return companies_list
+    
+    def count_chunks(self) -> int:
+        """
+        Count the chunks in the collection (one round-trip to ChromaDB).
+        
+        Raises:
+            Exception: ChromaDB errors are propagated to the caller
+        """
+        return self.collection.count()
     
     def get_stats(self) -> Dict:
         """Get statistics about the vector store."""
         try:
-            results = self.collection.get()
-            
-            companies = set()
-            source_types = set()
+            # Metadatas only: chunk text is never needed to compute the stats
+            results = self.collection.get(include=["metadatas"])
+            metadatas = results['metadatas']
             
-            for metadata in results['metadatas']:
-                if 'company_name' in metadata:
-                    companies.add(metadata['company_name'])
-                if 'source_type' in metadata:
-                    source_types.add(metadata['source_type'])
+            chunks_per_company = Counter(m['company_name'] for m in metadatas if 'company_name' in m)
+            source_types = {m['source_type'] for m in metadatas if 'source_type' in m}
             
             return {
-                'total_chunks': len(results['documents']),
-                'total_companies': len(companies),
-                'companies': sorted(list(companies)),
+                'total_chunks': len(results['ids']),
+                'total_companies': len(chunks_per_company),
+                'companies': sorted(chunks_per_company),
+                'chunks_per_company': dict(chunks_per_company),
                 'source_types': sorted(list(source_types)),
                 'embedding_model': 'text-embedding-3-small',
                 'chunking_method': 'LangChain RecursiveCharacterTextSplitter'
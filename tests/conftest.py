@@ -4,7 +4,7 @@ Shared test fixtures and configuration
 
 import os
 import pytest
-from unittest.mock import Mock, MagicMock, patch
+from unittest.mock import Mock, MagicMock, AsyncMock, patch
 from pathlib import Path
 
 # Project root
@@ -39,6 +39,11 @@ def mock_vector_store():
             'chunk_size': 100
         }
     ]
+    mock_vs.embed_queries.side_effect = lambda queries: [[0.1] * 384 for _ in queries]
+    mock_vs.asearch = AsyncMock(side_effect=lambda **kwargs: mock_vs.search(**kwargs))
+    mock_vs.multi_search.side_effect = lambda company_name, queries, *args, **kwargs: [
+        list(mock_vs.search.return_value) for _ in queries
+    ]
     mock_vs.get_company_list.return_value = ['test-company', 'another-company']
     mock_vs.get_stats.return_value = {
         'total_chunks': 100,
@@ -62,7 +67,7 @@ def mock_openai_client():
     mock_response.usage = Mock()
     mock_response.usage.total_tokens = 100
     
-    mock_client.chat.completions.create.return_value = mock_response
+    mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
     return mock_client
 
 
@@ -1,8 +1,10 @@
 """Tests for src/api/api.py FastAPI application."""
 
+import asyncio
+import httpx
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 import sys
 from pathlib import Path
 
@@ -11,6 +13,28 @@ project_root = Path(__file__).resolve().parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 
+@pytest.fixture(autouse=True)
+def clear_response_caches():
+    """Keep cached responses from leaking between tests."""
+    from src.api.api import (
+        dashboard_cache, search_cache, chat_cache, dashboard_content_cache,
+        _companies_cache, _dashboard_batches, _cached_batches
+    )
+    dashboard_cache.clear()
+    search_cache.clear()
+    chat_cache.clear()
+    dashboard_content_cache.clear()
+    _companies_cache.update({"data": None, "ts": 0.0, "vector_db_connected": None})
+    yield
+    dashboard_cache.clear()
+    search_cache.clear()
+    chat_cache.clear()
+    dashboard_content_cache.clear()
+    _companies_cache.update({"data": None, "ts": 0.0, "vector_db_connected": None})
+    _dashboard_batches.clear()
+    _cached_batches.clear()
+
+
 class TestCleanEnvValue:
     """Tests for clean_env_value function."""
     
@@ -44,15 +68,9 @@ class TestGetVectorStore:
     """Tests for get_vector_store function."""
     
     @patch('src.api.api.VectorStore')
-    @patch.dict('os.environ', {
-        'CHROMA_API_KEY': 'test_key',
-        'CHROMA_TENANT': 'test_tenant',
-        'CHROMA_DB': 'test_db',
-        'OPENAI_API_KEY': 'test_openai_key'
-    })
-    def test_get_vector_store_creates_new(self, mock_vector_store_class, mock_env_vars):
+    def test_get_vector_store_creates_new(self, mock_vector_store_class):
         """Test get_vector_store creates new instance when None."""
-        from src.api.api import vector_store, get_vector_store
+        from src.api.api import vector_store, get_vector_store, Settings
         
         # Reset global
         import src.api.api
@@ -61,7 +79,14 @@ class TestGetVectorStore:
         mock_instance = Mock()
         mock_vector_store_class.return_value = mock_instance
         
-        result = get_vector_store()
+        test_settings = Settings(
+            chroma_api_key='test_key',
+            chroma_tenant='test_tenant',
+            chroma_db='test_db',
+            openai_api_key='test_openai_key'
+        )
+        with patch('src.api.api.settings', test_settings):
+            result = get_vector_store()
         
         assert result == mock_instance
         mock_vector_store_class.assert_called_once()
@@ -69,22 +94,22 @@ class TestGetVectorStore:
     @patch.dict('os.environ', {}, clear=True)
     def test_get_vector_store_missing_credentials(self):
         """Test get_vector_store raises error when credentials missing."""
-        from src.api.api import get_vector_store
+        from src.api.api import get_vector_store, Settings
         import src.api.api
         src.api.api.vector_store = None
         
-        with pytest.raises(RuntimeError, match="Missing credentials"):
-            get_vector_store()
+        with patch('src.api.api.settings', Settings(_env_file=None)):
+            with pytest.raises(RuntimeError, match="Missing credentials"):
+                get_vector_store()
 
 
 class TestGetOpenAIClient:
     """Tests for get_openai_client function."""
     
-    @patch('src.api.api.OpenAI')
-    @patch.dict('os.environ', {'OPENAI_API_KEY': 'test_key'})
+    @patch('src.api.api.AsyncOpenAI')
     def test_get_openai_client_creates_new(self, mock_openai_class):
         """Test get_openai_client creates new instance when None."""
-        from src.api.api import openai_client, get_openai_client
+        from src.api.api import openai_client, get_openai_client, Settings
         
         # Reset global
         import src.api.api
@@ -93,20 +118,69 @@ class TestGetOpenAIClient:
         mock_instance = Mock()
         mock_openai_class.return_value = mock_instance
         
-        result = get_openai_client()
+        with patch('src.api.api.settings', Settings(openai_api_key='test_key')):
+            result = get_openai_client()
         
         assert result == mock_instance
-        mock_openai_class.assert_called_once_with(api_key='test_key')
+        mock_openai_class.assert_called_once()
+        _, kwargs = mock_openai_class.call_args
+        assert kwargs['api_key'] == 'test_key'
+        assert isinstance(kwargs['http_client'], httpx.AsyncClient)
     
     @patch.dict('os.environ', {}, clear=True)
     def test_get_openai_client_missing_key(self):
         """Test get_openai_client raises error when API key missing."""
-        from src.api.api import get_openai_client
+        from src.api.api import get_openai_client, Settings
         import src.api.api
         src.api.api.openai_client = None
         
-        with pytest.raises(RuntimeError, match="Missing OPENAI_API_KEY"):
-            get_openai_client()
+        with patch('src.api.api.settings', Settings(_env_file=None)):
+            with pytest.raises(RuntimeError, match="Missing OPENAI_API_KEY"):
+                get_openai_client()
+
+
+class TestSettings:
+    """Tests for the Settings object."""
+    
+    @patch.dict('os.environ', {
+        'CHROMA_API_KEY': "'test_key'",
+        'CHROMA_TENANT': ' test_tenant ',
+        'OPENAI_API_KEY': '"test_openai_key"',
+        'THREAD_POOL_SIZE': '16'
+    }, clear=True)
+    def test_settings_from_env(self):
+        """Test Settings reads the environment and strips quotes/whitespace."""
+        from src.api.api import Settings
+        
+        settings = Settings(_env_file=None)
+        
+        assert settings.chroma_api_key == "test_key"
+        assert settings.chroma_tenant == "test_tenant"
+        assert settings.chroma_db is None
+        assert settings.openai_api_key == "test_openai_key"
+        assert settings.thread_pool_size == 16
+
+
+class TestMatchCompany:
+    """Tests for match_company function."""
+    
+    def test_match_company_variants(self):
+        """Test hyphenated and spaced company names both match."""
+        from src.api.api import match_company
+        
+        companies = ["abridge", "scale-ai"]
+        
+        assert match_company("Tell me about Scale AI funding", companies) == "scale-ai"
+        assert match_company("what does scale-ai do?", companies) == "scale-ai"
+        assert match_company("Abridge revenue", companies) == "abridge"
+        assert match_company("general market question", companies) is None
+        assert match_company("anything", []) is None
+    
+    def test_match_company_prefers_longer_name(self):
+        """Test a longer company name wins over a name that is its prefix."""
+        from src.api.api import match_company
+        
+        assert match_company("news on acme ai", ["acme", "acme-ai"]) == "acme-ai"
 
 
 class TestRetrieveContextForDashboard:
@@ -117,25 +191,128 @@ class TestRetrieveContextForDashboard:
         from src.api.api import retrieve_context_for_dashboard
         
         with patch('src.api.api.get_vector_store', return_value=mock_vector_store):
-            results = retrieve_context_for_dashboard('test-company', top_k=15)
+            results = asyncio.run(retrieve_context_for_dashboard('test-company', top_k=15))
             
             assert isinstance(results, list)
-            # Should call search multiple times for different queries
-            assert mock_vector_store.search.call_count > 0
+            # All queries go out in a single multi-query search
+            mock_vector_store.multi_search.assert_called_once()
+            queries = mock_vector_store.multi_search.call_args.args[1]
+            assert len(queries) == 8
+            # Stored vectors are requested for MMR but not returned to callers
+            assert mock_vector_store.multi_search.call_args.kwargs['include_embeddings'] is True
+            assert all('embedding' not in r for r in results)
+            # Duplicate chunks across queries are merged
+            assert len(results) == 1
+    
+    def test_retrieve_context_for_dashboard_keeps_closest_duplicate(self):
+        """Test duplicates across queries keep the lowest-distance copy."""
+        from src.api.api import retrieve_context_for_dashboard
+        
+        def chunk(distance):
+            return {'text': 'dup', 'source_type': 'homepage', 'chunk_index': 0, 'distance': distance}
+        
+        mock_vs = Mock()
+        mock_vs.multi_search.side_effect = lambda company_name, queries, *args, **kwargs: (
+            [[chunk(0.4)], [chunk(0.1)]] + [[] for _ in queries[2:]]
+        )
+        
+        with patch('src.api.api.get_vector_store', return_value=mock_vs):
+            results = asyncio.run(retrieve_context_for_dashboard('test-company', top_k=15))
+            
+            assert len(results) == 1
+            assert results[0]['distance'] == 0.1
     
     def test_retrieve_context_for_dashboard_no_results(self):
         """Test retrieve_context_for_dashboard with no results."""
         from src.api.api import retrieve_context_for_dashboard
         
         mock_vs = Mock()
-        mock_vs.search.return_value = []
+        mock_vs.multi_search.side_effect = lambda company_name, queries, *args, **kwargs: [[] for _ in queries]
         
         with patch('src.api.api.get_vector_store', return_value=mock_vs):
-            results = retrieve_context_for_dashboard('test-company', top_k=15)
+            results = asyncio.run(retrieve_context_for_dashboard('test-company', top_k=15))
+            
+            assert results == []
+    
+    def test_retrieve_context_for_dashboard_batch_error_falls_back(self, mock_vector_store):
+        """Test a failing batched search falls back to concurrent per-query searches."""
+        from src.api.api import retrieve_context_for_dashboard
+        
+        mock_vector_store.multi_search.side_effect = RuntimeError("boom")
+        
+        with patch('src.api.api.get_vector_store', return_value=mock_vector_store):
+            results = asyncio.run(retrieve_context_for_dashboard('test-company', top_k=15))
+            
+            assert len(results) == 1
+            assert mock_vector_store.asearch.await_count == 8
+    
+    def test_retrieve_context_for_dashboard_search_error(self, mock_vector_store):
+        """Test a failing vector search yields no context instead of raising."""
+        from src.api.api import retrieve_context_for_dashboard
+        
+        mock_vector_store.multi_search.side_effect = RuntimeError("boom")
+        mock_vector_store.asearch = AsyncMock(side_effect=RuntimeError("boom"))
+        
+        with patch('src.api.api.get_vector_store', return_value=mock_vector_store):
+            results = asyncio.run(retrieve_context_for_dashboard('test-company', top_k=15))
             
             assert results == []
 
 
+class TestPerformWebSearch:
+    """Tests for perform_web_search function."""
+    
+    def test_perform_web_search_uses_shared_client(self):
+        """Test web search parses results through the shared HTTP client."""
+        from src.api.api import perform_web_search
+        
+        html = """
+        <div class="result">
+            <a class="result__title">Acme raises Series B</a>
+            <a class="result__snippet">Acme raised $50M.</a>
+            <a class="result__url" href="//duckduckgo.com/l/?uddg=https%3A%2F%2Facme.com%2Fnews">acme.com</a>
+        </div>
+        """
+        mock_client = Mock()
+        mock_client.get = AsyncMock(return_value=Mock(status_code=200, text=html))
+        
+        with patch('src.api.api.get_http_client', return_value=mock_client):
+            results = asyncio.run(perform_web_search("acme funding", max_results=3))
+        
+        assert results == [{
+            'title': 'Acme raises Series B',
+            'snippet': 'Acme raised $50M.',
+            'url': 'https://acme.com/news',
+            'source': 'web_search'
+        }]
+        mock_client.get.assert_awaited_once()
+    
+    def test_perform_web_search_brave_provider(self):
+        """Test the Brave JSON API is used when configured."""
+        from src.api.api import perform_web_search, Settings
+        
+        payload = {'web': {'results': [
+            {'title': 'Acme raises Series B', 'description': 'Acme raised $50M.', 'url': 'https://acme.com/news'}
+        ]}}
+        mock_client = Mock()
+        mock_client.get = AsyncMock(return_value=Mock(status_code=200, json=Mock(return_value=payload)))
+        brave_settings = Settings(search_provider="brave", brave_api_key="test-key")
+        
+        with patch('src.api.api.get_http_client', return_value=mock_client), \
+             patch('src.api.api.settings', brave_settings):
+            results = asyncio.run(perform_web_search("acme funding", max_results=3))
+        
+        assert results == [{
+            'title': 'Acme raises Series B',
+            'snippet': 'Acme raised $50M.',
+            'url': 'https://acme.com/news',
+            'source': 'web_search'
+        }]
+        args, kwargs = mock_client.get.call_args
+        assert args[0].startswith('https://api.search.brave.com/')
+        assert kwargs['headers']['X-Subscription-Token'] == 'test-key'
+
+
 class TestAPIRoutes:
     """Tests for FastAPI routes."""
     
@@ -145,7 +322,26 @@ class TestAPIRoutes:
         with patch('src.api.api.get_vector_store', return_value=mock_vector_store):
             with patch('src.api.api.get_openai_client', return_value=mock_openai_client):
                 from src.api.api import app
-                return TestClient(app)
+                yield TestClient(app)
+    
+    def test_lifespan_initializes_clients(self, mock_vector_store, mock_openai_client):
+        """Test startup eagerly creates shared clients and warms the OpenAI pool."""
+        from src.api.api import app
+        
+        mock_openai_client.models.list = AsyncMock(return_value=[])
+        mock_openai_client.close = AsyncMock()
+        
+        with patch('src.api.api.get_vector_store', return_value=mock_vector_store):
+            with patch('src.api.api.get_openai_client', return_value=mock_openai_client):
+                with TestClient(app) as client:
+                    assert app.state.vector_store is mock_vector_store
+                    assert app.state.openai_client is mock_openai_client
+                    mock_openai_client.models.list.assert_awaited_once()
+                    mock_vector_store.embed_queries.assert_called_once()
+                    assert client.get("/health").status_code == 200
+                
+                assert app.state.company_list_task.cancelled()
+                mock_openai_client.close.assert_awaited_once()
     
     def test_root_endpoint(self, client):
         """Test root endpoint returns API info."""
@@ -171,6 +367,63 @@ class TestAPIRoutes:
         data = response.json()
         assert isinstance(data, list)
     
+    def test_health_and_companies_report_db_outage(self, client, mock_vector_store):
+        """Test a vector DB failure surfaces as 503 instead of an empty success."""
+        mock_vector_store.get_company_list.side_effect = RuntimeError("chroma down")
+        
+        health = client.get("/health")
+        assert health.status_code == 503
+        assert health.json() == {"status": "degraded", "vector_db_connected": False}
+        
+        companies = client.get("/companies")
+        assert companies.status_code == 503
+        assert companies.json()["detail"] == "Vector database unavailable"
+    
+    def test_health_and_companies_report_real_store_outage(self, tmp_path):
+        """Test a ChromaDB failure inside VectorStore itself surfaces as 503."""
+        from src.api.api import app
+        from src.rag.rag_pipeline import VectorStore
+        
+        mock_collection = Mock()
+        mock_collection.get.side_effect = RuntimeError("chroma down")
+        mock_collection.count.side_effect = RuntimeError("chroma down")
+        
+        with patch('src.rag.rag_pipeline.chromadb.CloudClient') as mock_chromadb, \
+             patch('src.rag.rag_pipeline.OpenAIEmbeddings'):
+            mock_chromadb.return_value.get_or_create_collection.return_value = mock_collection
+            vs = VectorStore(
+                api_key="test_key",
+                tenant="test_tenant",
+                database="test_db",
+                openai_api_key="test_openai_key"
+            )
+        
+        client = TestClient(app)
+        with patch('src.api.api.get_vector_store', return_value=vs), \
+             patch('src.rag.rag_pipeline.get_registry_path',
+                   return_value=tmp_path / "companies_registry.json"):
+            # Empty registry: the company list falls back to the failing collection
+            assert client.get("/health").status_code == 503
+            assert client.get("/companies").status_code == 503
+            
+            # Registry present: the list succeeds, but the refresh records the failed probe
+            registry_file = tmp_path / "companies_registry.json"
+            registry_file.write_text('{"acme": {"chunks_count": 3}}')
+            assert client.get("/companies").json() == ["acme"]
+            assert client.get("/health").status_code == 503
+    
+    def test_companies_endpoint_uses_snapshot(self, client, mock_vector_store):
+        """Test companies and health share one cached company list and DB status."""
+        first = client.get("/companies")
+        assert client.get("/health").status_code == 200
+        assert client.get("/health").status_code == 200
+        second = client.get("/companies")
+        
+        assert first.json() == ['another-company', 'test-company']
+        assert second.json() == first.json()
+        mock_vector_store.get_company_list.assert_called_once()
+        mock_vector_store.count_chunks.assert_called_once()
+    
     def test_rag_search_get(self, client):
         """Test RAG search GET endpoint."""
         response = client.get(
@@ -215,7 +468,7 @@ class TestAPIRoutes:
         mock_response.usage.total_tokens = 100
         
         with patch('src.api.api.get_openai_client') as mock_client:
-            mock_client.return_value.chat.completions.create.return_value = mock_response
+            mock_client.return_value.chat.completions.create = AsyncMock(return_value=mock_response)
             
             response = client.get("/dashboard/rag/test-company-1")
             assert response.status_code == 200
@@ -234,7 +487,7 @@ class TestAPIRoutes:
         mock_response.usage.total_tokens = 100
         
         with patch('src.api.api.get_openai_client') as mock_client:
-            mock_client.return_value.chat.completions.create.return_value = mock_response
+            mock_client.return_value.chat.completions.create = AsyncMock(return_value=mock_response)
             
             response = client.post(
                 "/dashboard/rag",
@@ -250,6 +503,325 @@ class TestAPIRoutes:
             assert data["company_name"] == "test-company-1"
             assert "dashboard" in data
     
+    def test_dashboard_rag_cache_hit(self, client):
+        """Test a repeated dashboard request is served from the semantic cache."""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message = Mock()
+        mock_response.choices[0].message.content = "## Company Overview\nTest content"
+        mock_response.usage = Mock()
+        mock_response.usage.total_tokens = 100
+        
+        with patch('src.api.api.get_openai_client') as mock_client:
+            mock_client.return_value.chat.completions.create = AsyncMock(return_value=mock_response)
+            
+            first = client.get("/dashboard/rag/test-company-1")
+            second = client.get("/dashboard/rag/test-company-1")
+            
+            assert first.json()["metadata"]["status"] == "success"
+            assert second.json()["metadata"]["status"] == "cache_hit"
+            assert second.json()["dashboard"] == first.json()["dashboard"]
+            mock_client.return_value.chat.completions.create.assert_called_once()
+    
+    def test_dashboard_rag_cache_is_per_company(self, client):
+        """Test companies whose names embed alike never share a cached dashboard."""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message = Mock()
+        mock_response.choices[0].message.content = "## Company Overview\nTest content"
+        mock_response.usage = Mock()
+        mock_response.usage.total_tokens = 100
+        
+        with patch('src.api.api.get_openai_client') as mock_client, \
+             patch('src.api.api.embed_cache_key', AsyncMock(return_value=[1.0, 0.0])):
+            mock_client.return_value.chat.completions.create = AsyncMock(return_value=mock_response)
+            
+            first = client.get("/dashboard/rag/test-company-1")
+            other = client.get("/dashboard/rag/test-company-2")
+            
+            assert first.json()["metadata"]["status"] == "success"
+            assert other.json()["metadata"]["status"] == "success"
+            assert mock_client.return_value.chat.completions.create.await_count == 2
+    
+    def test_dashboard_rag_content_cache_hit(self, client):
+        """Test unchanged retrieved content reuses the report when the semantic cache misses."""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message = Mock()
+        mock_response.choices[0].message.content = "## Company Overview\nTest content"
+        mock_response.usage = Mock()
+        mock_response.usage.total_tokens = 100
+        
+        with patch('src.api.api.get_openai_client') as mock_client, \
+             patch('src.api.api.embed_cache_key', AsyncMock(return_value=None)):
+            mock_client.return_value.chat.completions.create = AsyncMock(return_value=mock_response)
+            
+            first = client.get("/dashboard/rag/test-company-1")
+            second = client.get("/dashboard/rag/test-company-1")
+            other_params = client.get("/dashboard/rag/test-company-1?temperature=0.5")
+            
+            assert second.json()["metadata"]["status"] == "cache_hit"
+            assert second.json()["dashboard"] == first.json()["dashboard"]
+            assert other_params.json()["metadata"]["status"] == "success"
+            assert mock_client.return_value.chat.completions.create.await_count == 2
+    
+    def test_dashboard_rag_parallel_sections(self, client):
+        """Test parallel section generation issues one call per section in order."""
+        from src.prompts.dashboard_prompts import DASHBOARD_SECTIONS
+        
+        async def section_response(**kwargs):
+            # Answer with the body only; headers are added back by the API
+            section = kwargs['messages'][1]['content'].split("**")[1]
+            response = Mock()
+            response.choices = [Mock()]
+            response.choices[0].message.content = f"{section} details. Not disclosed."
+            response.usage.total_tokens = 10
+            return response
+        
+        with patch('src.api.api.get_openai_client') as mock_client:
+            mock_client.return_value.chat.completions.create = AsyncMock(side_effect=section_response)
+            
+            response = client.post(
+                "/dashboard/rag",
+                json={"company_name": "test-company-1", "parallel_sections": True,
+                      "section_model": "gpt-4o-mini"}
+            )
+            
+            assert response.status_code == 200
+            data = response.json()
+            metadata = data["metadata"]
+            assert metadata["sections_present"] == len(DASHBOARD_SECTIONS)
+            assert metadata["not_disclosed_count"] == len(DASHBOARD_SECTIONS)
+            assert metadata["tokens_used"]["total"] == 10 * len(DASHBOARD_SECTIONS)
+            assert metadata["generation"] == "parallel_sections"
+            
+            headers = [line for line in data["dashboard"].splitlines() if line.startswith("## ")]
+            assert headers == [f"## {name}" for name, _ in DASHBOARD_SECTIONS]
+            
+            calls = mock_client.return_value.chat.completions.create.call_args_list
+            assert len(calls) == len(DASHBOARD_SECTIONS)
+            assert all(c.kwargs["model"] == "gpt-4o-mini" for c in calls)
+    
+    def test_dashboard_rag_stream_ignores_parallel_sections(self, client):
+        """Test a streamed dashboard is cached as single-call even if parallel sections were requested."""
+        from src.api.api import dashboard_cache
+        
+        async def stream_chunks():
+            chunk = Mock()
+            chunk.choices = [Mock()]
+            chunk.choices[0].delta.content = "## Company Overview\nStreamed"
+            chunk.usage = None
+            yield chunk
+        
+        with patch('src.api.api.get_openai_client') as mock_client, \
+             patch('src.api.api.embed_cache_key', AsyncMock(return_value=[1.0, 0.0])):
+            mock_client.return_value.chat.completions.create = AsyncMock(return_value=stream_chunks())
+            
+            client.post(
+                "/dashboard/rag/stream",
+                json={"company_name": "test-company-1", "parallel_sections": True}
+            )
+        
+        namespaces = list(dashboard_cache._entries)
+        assert len(namespaces) == 1
+        assert ":sections:" not in namespaces[0]
+        entry = dashboard_cache._entries[namespaces[0]][0]
+        assert entry['metadata']['generation'] == 'single_call'
+    
+    def test_dashboard_rag_stream(self, client):
+        """Test streaming dashboard endpoint emits deltas then metadata."""
+        import json
+
+        def make_chunk(content, usage=None):
+            chunk = Mock()
+            chunk.choices = [Mock()] if content is not None else []
+            if content is not None:
+                chunk.choices[0].delta.content = content
+            chunk.usage = usage
+            return chunk
+
+        usage = Mock()
+        usage.total_tokens = 120
+        stream = [
+            make_chunk("## Company Overview\n"),
+            make_chunk("Not disclosed"),
+            make_chunk(None, usage=usage)
+        ]
+
+        async def stream_chunks():
+            for chunk in stream:
+                yield chunk
+
+        with patch('src.api.api.get_openai_client') as mock_client:
+            mock_client.return_value.chat.completions.create = AsyncMock(return_value=stream_chunks())
+
+            response = client.post(
+                "/dashboard/rag/stream",
+                json={"company_name": "test-company-1"}
+            )
+
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+
+            events = [
+                (frame.split("\n")[0][len("event: "):], json.loads(frame.split("\n")[1][len("data: "):]))
+                for frame in response.text.strip().split("\n\n")
+            ]
+            deltas = [data["content"] for name, data in events if name == "delta"]
+            assert "".join(deltas) == "## Company Overview\nNot disclosed"
+
+            name, done = events[-1]
+            assert name == "done"
+            assert done["metadata"]["sections_present"] == 1
+            assert done["metadata"]["not_disclosed_count"] == 1
+            assert done["metadata"]["tokens_used"]["total"] == 120
+
+            _, kwargs = mock_client.return_value.chat.completions.create.call_args
+            assert kwargs["stream"] is True
+
+    def test_dashboard_rag_batch(self, client):
+        """Test batch submission and caching of completed batch results."""
+        import json
+        
+        output_line = json.dumps({
+            "custom_id": '["test-company-1"]',
+            "response": {
+                "status_code": 200,
+                "body": {
+                    "choices": [{"message": {"content": "## Company Overview\nBatch content"}}],
+                    "usage": {"total_tokens": 90}
+                }
+            },
+            "error": None
+        })
+        
+        with patch('src.api.api.get_openai_client') as mock_client:
+            openai = mock_client.return_value
+            openai.files.create = AsyncMock(return_value=Mock(id="file-in"))
+            openai.batches.create = AsyncMock(return_value=Mock(id="batch_1", status="validating"))
+            
+            submitted = client.post(
+                "/dashboard/rag/batch",
+                json={"company_names": ["test-company-1"]}
+            )
+            
+            assert submitted.status_code == 200
+            assert submitted.json()["batch_id"] == "batch_1"
+            assert submitted.json()["companies_submitted"] == ["test-company-1"]
+            
+            _, kwargs = openai.files.create.call_args
+            assert kwargs["purpose"] == "batch"
+            line = json.loads(kwargs["file"][1].decode("utf-8"))
+            assert json.loads(line["custom_id"]) == ["test-company-1"]
+            assert line["url"] == "/v1/chat/completions"
+            
+            openai.batches.retrieve = AsyncMock(return_value=Mock(
+                id="batch_1",
+                status="completed",
+                output_file_id="file-out",
+                request_counts=Mock(total=1, completed=1, failed=0),
+                metadata=openai.batches.create.call_args[1]["metadata"]
+            ))
+            openai.files.content = AsyncMock(return_value=Mock(text=output_line))
+            
+            status = client.get("/dashboard/rag/batch/batch_1")
+            assert status.json()["dashboards_cached"] == 1
+            
+            cached = client.get("/dashboard/rag/test-company-1")
+            assert cached.json()["metadata"]["status"] == "cache_hit"
+            assert cached.json()["dashboard"] == "## Company Overview\nBatch content"
+            openai.chat.completions.create.assert_not_called()
+    
+    def test_dashboard_rag_batch_prompting(self, client):
+        """Test grouped companies share one batch request and are split on completion.
+        
+        The first name contains "|" to check the custom_id round-trips any name."""
+        import json
+        
+        content = (
+            "=== Dashboard [1] ===\n## Company Overview\nFirst\n\n"
+            "=== Dashboard [2] ===\n## Company Overview\nSecond"
+        )
+        output_line = json.dumps({
+            "custom_id": json.dumps(["test|company-1", "test-company-2"]),
+            "response": {
+                "status_code": 200,
+                "body": {
+                    "choices": [{"message": {"content": content}}],
+                    "usage": {"total_tokens": 200}
+                }
+            },
+            "error": None
+        })
+        
+        with patch('src.api.api.get_openai_client') as mock_client:
+            openai = mock_client.return_value
+            openai.files.create = AsyncMock(return_value=Mock(id="file-in"))
+            openai.batches.create = AsyncMock(return_value=Mock(id="batch_2", status="validating"))
+            
+            client.post(
+                "/dashboard/rag/batch",
+                json={"company_names": ["test|company-1", "test-company-2"], "companies_per_request": 2}
+            )
+            
+            _, kwargs = openai.files.create.call_args
+            lines = kwargs["file"][1].decode("utf-8").splitlines()
+            assert len(lines) == 1
+            body = json.loads(lines[0])["body"]
+            assert "=== Dashboard [2] ===" in body["messages"][1]["content"]
+            assert body["max_tokens"] == 8000
+            
+            openai.batches.retrieve = AsyncMock(return_value=Mock(
+                id="batch_2",
+                status="completed",
+                output_file_id="file-out",
+                request_counts=Mock(total=1, completed=1, failed=0),
+                metadata=openai.batches.create.call_args[1]["metadata"]
+            ))
+            openai.files.content = AsyncMock(return_value=Mock(text=output_line))
+            
+            status = client.get("/dashboard/rag/batch/batch_2")
+            assert json.loads(json.loads(lines[0])["custom_id"]) == ["test|company-1", "test-company-2"]
+            assert status.json()["dashboards_completed"] == ["test|company-1", "test-company-2"]
+            
+            from src.api.api import dashboard_cache
+            stored = {
+                entry['prompt']: entry
+                for entries in dashboard_cache._entries.values() for entry in entries
+            }
+            assert stored["test-company-2"]['response'] == "## Company Overview\nSecond"
+            assert stored["test-company-2"]['metadata']['tokens_used']['total'] == 100
+    
+    def test_rag_search_cache_hit(self, client, mock_vector_store):
+        """Test a repeated search skips the vector store."""
+        params = {"company_name": "test-company-1", "query": "funding", "top_k": 5}
+        
+        first = client.get("/rag/search", params=params)
+        second = client.get("/rag/search", params=params)
+        
+        assert first.status_code == 200
+        assert second.json()["results"] == first.json()["results"]
+        mock_vector_store.multi_search.assert_called_once()
+    
+    def test_rag_search_concurrent_requests_batched(self, mock_vector_store):
+        """Test concurrent searches for one company share a single ChromaDB query."""
+        from src.api.api import search_post, SearchRequest
+        
+        async def run_searches():
+            return await asyncio.gather(
+                search_post(SearchRequest(company_name="test-company", query="funding", top_k=5)),
+                search_post(SearchRequest(company_name="test-company", query="founders", top_k=3))
+            )
+        
+        with patch('src.api.api.get_vector_store', return_value=mock_vector_store):
+            responses = asyncio.run(run_searches())
+        
+        assert [r.query for r in responses] == ["funding", "founders"]
+        mock_vector_store.multi_search.assert_called_once()
+        args, kwargs = mock_vector_store.multi_search.call_args
+        assert args[1] == ["funding", "founders"]
+        assert len(kwargs["query_embeddings"]) == 2
+    
     def test_stats_endpoint(self, client):
         """Test stats endpoint."""
         response = client.get("/stats")
@@ -267,7 +839,7 @@ class TestAPIRoutes:
         mock_response.usage.total_tokens = 50
         
         with patch('src.api.api.get_openai_client') as mock_client:
-            mock_client.return_value.chat.completions.create.return_value = mock_response
+            mock_client.return_value.chat.completions.create = AsyncMock(return_value=mock_response)
             
             response = client.post(
                 "/chat",
@@ -281,6 +853,171 @@ class TestAPIRoutes:
             data = response.json()
             assert "message" in data
             assert "used_retrieval" in data
+    
+    def test_chat_cache_hit(self, client):
+        """Test a repeated first-turn question is answered from the chat cache."""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message = Mock()
+        mock_response.choices[0].message.content = "Test chat response"
+        mock_response.usage = Mock()
+        mock_response.usage.total_tokens = 50
+        
+        payload = {"message": "What is this company about?", "company_name": "test-company-1"}
+        
+        with patch('src.api.api.get_openai_client') as mock_client:
+            mock_client.return_value.chat.completions.create = AsyncMock(return_value=mock_response)
+            
+            first = client.post("/chat", json=payload)
+            second = client.post("/chat", json=payload)
+            
+            assert second.json()["message"] == first.json()["message"]
+            assert second.json()["metadata"]["cache_hit"] is True
+            mock_client.return_value.chat.completions.create.assert_awaited_once()
+            
+            # Follow-up turns depend on history and are never served from cache
+            follow_up = {**payload, "conversation_history": [
+                {"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello"}
+            ]}
+            client.post("/chat", json=follow_up)
+            assert mock_client.return_value.chat.completions.create.await_count == 2
+
+
+    def test_chat_cache_is_per_resolved_company(self, client):
+        """Test free-form questions about different companies never share a cached answer."""
+        def decision(company):
+            response = Mock()
+            response.choices = [Mock()]
+            response.choices[0].message.content = f'{{"r": true, "c": "{company}", "q": "funding"}}'
+            return response
+        
+        def answer(text):
+            response = Mock()
+            response.choices = [Mock()]
+            response.choices[0].message.content = text
+            response.usage.total_tokens = 10
+            return response
+        
+        with patch('src.api.api.get_openai_client') as mock_client, \
+             patch('src.api.api.embed_cache_key', AsyncMock(return_value=[1.0, 0.0])):
+            mock_client.return_value.chat.completions.create = AsyncMock(side_effect=[
+                decision("test-company"), answer("Test Company raised $10M"),
+                decision("another-company"), answer("Another Company raised $5M"),
+                decision("test-company")
+            ])
+            
+            first = client.post("/chat", json={"message": "What is Test Company's funding?"})
+            other = client.post("/chat", json={"message": "What is Another Company's funding?"})
+            repeat = client.post("/chat", json={"message": "What is Test Company's funding?"})
+            
+            assert other.json()["message"] == "Another Company raised $5M"
+            assert other.json()["metadata"].get("cache_hit") is not True
+            assert repeat.json()["message"] == first.json()["message"]
+            assert repeat.json()["metadata"]["cache_hit"] is True
+    
+    def test_chat_runs_retrieval_and_web_search(self, client, mock_vector_store):
+        """Test a routed chat turn retrieves and web-searches, with JSON-mode decision."""
+        decision = Mock()
+        decision.choices = [Mock()]
+        decision.choices[0].message.content = (
+            '{"r": true, "c": "test-company", "q": "funding"}\n'
+        )
+        answer = Mock()
+        answer.choices = [Mock()]
+        answer.choices[0].message.content = "Answer"
+        answer.usage.total_tokens = 10
+        web_results = [{'title': 't', 'snippet': 's', 'url': 'u', 'source': 'web_search'}]
+        
+        with patch('src.api.api.get_openai_client') as mock_client, \
+             patch('src.api.api.perform_web_search', AsyncMock(return_value=web_results)) as mock_web:
+            mock_client.return_value.chat.completions.create = AsyncMock(side_effect=[decision, answer])
+            
+            response = client.post(
+                "/chat",
+                json={"message": "How much has Test Company raised?", "enable_web_search": True}
+            )
+            
+            data = response.json()
+            assert data["used_retrieval"] is True
+            assert data["used_web_search"] is True
+            mock_vector_store.asearch.assert_awaited_once_with(
+                company_name="test-company", query="funding", top_k=5
+            )
+            mock_web.assert_awaited_once_with("test-company funding", max_results=3)
+            
+            first_call = mock_client.return_value.chat.completions.create.call_args_list[0]
+            assert first_call.kwargs["response_format"] == {"type": "json_object"}
+    
+    def test_chat_decision_multiline_json(self, client, mock_vector_store):
+        """Test a pretty-printed JSON decision is parsed rather than falling back."""
+        decision = Mock()
+        decision.choices = [Mock()]
+        decision.choices[0].message.content = (
+            '{\n  "r": true,\n  "c": "test-company",\n  "q": "funding"\n}'
+        )
+        answer = Mock()
+        answer.choices = [Mock()]
+        answer.choices[0].message.content = "Answer"
+        answer.usage.total_tokens = 10
+        
+        with patch('src.api.api.get_openai_client') as mock_client:
+            mock_client.return_value.chat.completions.create = AsyncMock(side_effect=[decision, answer])
+            
+            response = client.post("/chat", json={"message": "How much has Test Company raised?"})
+            
+            assert response.json()["used_retrieval"] is True
+            mock_vector_store.asearch.assert_awaited_once_with(
+                company_name="test-company", query="funding", top_k=5
+            )
+    
+    def test_chat_stream(self, client):
+        """Test streaming chat emits sources before deltas, then metadata."""
+        import json
+        
+        def make_chunk(content, usage=None):
+            chunk = Mock()
+            chunk.choices = [Mock()] if content is not None else []
+            if content is not None:
+                chunk.choices[0].delta.content = content
+            chunk.usage = usage
+            return chunk
+        
+        usage = Mock()
+        usage.total_tokens = 42
+        
+        async def stream_chunks():
+            for chunk in [make_chunk("Hello "), make_chunk("there"), make_chunk(None, usage=usage)]:
+                yield chunk
+        
+        with patch('src.api.api.get_openai_client') as mock_client:
+            mock_client.return_value.chat.completions.create = AsyncMock(return_value=stream_chunks())
+            
+            response = client.post(
+                "/chat/stream",
+                json={"message": "What is this company about?", "company_name": "test-company-1"}
+            )
+            
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            
+            events = [
+                (frame.split("\n")[0][len("event: "):], json.loads(frame.split("\n")[1][len("data: "):]))
+                for frame in response.text.strip().split("\n\n")
+            ]
+            name, sources = events[0]
+            assert name == "sources"
+            assert sources["company_name"] == "test-company-1"
+            assert "chunks" in sources and "web_sources" in sources
+            
+            deltas = [data["content"] for name, data in events if name == "delta"]
+            assert "".join(deltas) == "Hello there"
+            
+            name, done = events[-1]
+            assert name == "done"
+            assert done["metadata"]["tokens_used"] == 42
+            
+            _, kwargs = mock_client.return_value.chat.completions.create.call_args
+            assert kwargs["stream"] is True
 
 
 class TestPydanticModels:
@@ -0,0 +1,92 @@
+"""Tests for src/cache/semantic_cache.py."""
+
+import pytest
+from unittest.mock import patch
+from pathlib import Path
+import sys
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+
+class TestSemanticCache:
+    """Tests for SemanticCache class."""
+    
+    def test_check_empty(self):
+        """Test check returns None on an empty cache."""
+        from src.cache import SemanticCache
+        
+        cache = SemanticCache()
+        assert cache.check([1.0, 0.0]) is None
+    
+    def test_store_and_hit(self):
+        """Test a near-identical embedding returns the stored response."""
+        from src.cache import SemanticCache
+        
+        cache = SemanticCache(distance_threshold=0.05)
+        cache.store("abridge", "dashboard markdown", [1.0, 0.0], metadata={"model": "gpt-4o"})
+        
+        hit = cache.check([0.99, 0.01])
+        assert hit is not None
+        assert hit['response'] == "dashboard markdown"
+        assert hit['metadata'] == {"model": "gpt-4o"}
+        assert hit['distance'] < 0.05
+    
+    def test_miss_beyond_threshold(self):
+        """Test an unrelated embedding misses."""
+        from src.cache import SemanticCache
+        
+        cache = SemanticCache(distance_threshold=0.05)
+        cache.store("abridge", "dashboard markdown", [1.0, 0.0])
+        
+        assert cache.check([0.0, 1.0]) is None
+    
+    def test_namespaces_are_isolated(self):
+        """Test entries only match lookups in the same namespace."""
+        from src.cache import SemanticCache
+        
+        cache = SemanticCache()
+        cache.store("abridge", "gpt-4o dashboard", [1.0, 0.0], namespace="dashboard:gpt-4o")
+        
+        assert cache.check([1.0, 0.0], namespace="dashboard:gpt-4o-mini") is None
+        assert cache.check([1.0, 0.0], namespace="dashboard:gpt-4o")['response'] == "gpt-4o dashboard"
+    
+    def test_expired_entries_are_dropped(self):
+        """Test entries past their TTL are not returned."""
+        from src.cache import SemanticCache
+        
+        cache = SemanticCache(ttl_seconds=60)
+        with patch('src.cache.semantic_cache.time.time', return_value=1000.0):
+            cache.store("abridge", "dashboard markdown", [1.0, 0.0])
+        
+        with patch('src.cache.semantic_cache.time.time', return_value=1061.0):
+            assert cache.check([1.0, 0.0]) is None
+        assert len(cache) == 0
+    
+    def test_namespace_size_is_bounded(self):
+        """Test storing past the per-namespace limit evicts the oldest entries."""
+        from src.cache import SemanticCache
+        
+        cache = SemanticCache(max_entries_per_namespace=2)
+        cache.store("a", "first", [1.0, 0.0])
+        cache.store("b", "second", [0.0, 1.0])
+        cache.store("c", "third", [-1.0, 0.0])
+        cache.store("d", "other", [1.0, 0.0], namespace="other")
+        
+        assert len(cache) == 3
+        assert cache.check([1.0, 0.0]) is None
+        assert cache.check([0.0, 1.0])['response'] == "second"
+        assert cache.check([1.0, 0.0], namespace="other")['response'] == "other"
+    
+    def test_clear(self):
+        """Test clear removes all entries."""
+        from src.cache import SemanticCache
+        
+        cache = SemanticCache()
+        cache.store("a", "x", [1.0, 0.0])
+        cache.store("b", "y", [0.0, 1.0], namespace="other")
+        assert len(cache) == 2
+        
+        cache.clear()
+        assert len(cache) == 0
@@ -0,0 +1,81 @@
+"""Tests for src/rag/batching.py."""
+
+import asyncio
+import pytest
+from pathlib import Path
+import sys
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+
+class TestDynamicBatcher:
+    """Tests for DynamicBatcher class."""
+
+    def test_concurrent_submissions_share_batch(self):
+        """Test items submitted together are passed to batch_fn in one call."""
+        from src.rag.batching import DynamicBatcher
+
+        calls = []
+
+        def batch_fn(items):
+            calls.append(list(items))
+            return [item * 2 for item in items]
+
+        async def run():
+            batcher = DynamicBatcher(batch_fn, max_batch_size=16, max_delay=0.01)
+            return await asyncio.gather(*[batcher.submit(i) for i in range(3)])
+
+        assert asyncio.run(run()) == [0, 2, 4]
+        assert calls == [[0, 1, 2]]
+
+    def test_full_batch_dispatches_immediately(self):
+        """Test reaching max_batch_size splits submissions into batches."""
+        from src.rag.batching import DynamicBatcher
+
+        calls = []
+
+        def batch_fn(items):
+            calls.append(list(items))
+            return items
+
+        async def run():
+            batcher = DynamicBatcher(batch_fn, max_batch_size=2, max_delay=10)
+            return await asyncio.wait_for(
+                asyncio.gather(*[batcher.submit(i) for i in range(4)]), timeout=5
+            )
+
+        assert asyncio.run(run()) == [0, 1, 2, 3]
+        assert calls == [[0, 1], [2, 3]]
+
+    def test_per_item_exception(self):
+        """Test an Exception result is raised only for its own caller."""
+        from src.rag.batching import DynamicBatcher
+
+        def batch_fn(items):
+            return [ValueError("bad item") if item < 0 else item for item in items]
+
+        async def run():
+            batcher = DynamicBatcher(batch_fn, max_delay=0.01)
+            return await asyncio.gather(
+                batcher.submit(1), batcher.submit(-1), return_exceptions=True
+            )
+
+        ok, failed = asyncio.run(run())
+        assert ok == 1
+        assert isinstance(failed, ValueError)
+
+    def test_batch_exception_propagates(self):
+        """Test a failing batch_fn raises for every caller."""
+        from src.rag.batching import DynamicBatcher
+
+        def batch_fn(items):
+            raise RuntimeError("backend down")
+
+        async def run():
+            batcher = DynamicBatcher(batch_fn, max_delay=0.01)
+            await batcher.submit("query")
+
+        with pytest.raises(RuntimeError, match="backend down"):
+            asyncio.run(run())
@@ -0,0 +1,57 @@
+"""Tests for src/rag/embedding_cache.py."""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+
+class TestEmbeddingCache:
+    """Tests for EmbeddingCache class."""
+
+    def test_round_trip_and_misses(self, tmp_path):
+        """Test stored vectors come back and unknown texts are None."""
+        from src.rag.embedding_cache import EmbeddingCache
+
+        cache = EmbeddingCache(str(tmp_path / "cache" / "emb.sqlite"), "model-a", 2)
+        cache.put_many(["alpha", "beta"], [[0.5, 1.0], [2.0, -1.5]])
+
+        assert cache.get_many(["beta", "gamma", "alpha"]) == [[2.0, -1.5], None, [0.5, 1.0]]
+        cache.close()
+
+    def test_persists_across_instances(self, tmp_path):
+        """Test a reopened cache still serves earlier entries."""
+        from src.rag.embedding_cache import EmbeddingCache
+
+        path = str(tmp_path / "emb.sqlite")
+        first = EmbeddingCache(path, "model-a", 2)
+        first.put_many(["alpha"], [[0.25, 0.75]])
+        first.close()
+
+        second = EmbeddingCache(path, "model-a", 2)
+        assert second.get_many(["alpha"]) == [[0.25, 0.75]]
+        second.close()
+
+    def test_keyed_on_model_and_dimensions(self, tmp_path):
+        """Test vectors from another model or size are not returned."""
+        from src.rag.embedding_cache import EmbeddingCache
+
+        path = str(tmp_path / "emb.sqlite")
+        EmbeddingCache(path, "model-a", 2).put_many(["alpha"], [[1.0, 2.0]])
+
+        assert EmbeddingCache(path, "model-b", 2).get_many(["alpha"]) == [None]
+        assert EmbeddingCache(path, "model-a", 3).get_many(["alpha"]) == [None]
+
+    def test_lookup_larger_than_batch(self, tmp_path):
+        """Test lookups spanning several SQL batches keep their order."""
+        from src.rag.embedding_cache import EmbeddingCache
+
+        cache = EmbeddingCache(str(tmp_path / "emb.sqlite"), "model-a", 1)
+        texts = [f"text-{i}" for i in range(1200)]
+        cache.put_many(texts, [[float(i)] for i in range(1200)])
+
+        assert cache.get_many(texts) == [[float(i)] for i in range(1200)]
+        cache.close()
@@ -27,7 +27,8 @@ class TestLogMessage:
         assert "Test message" in captured.out
     
     def test_log_message_file(self, tmp_path):
-        """Test log_message writes to file."""
+        """Test log_message writes to file with a timestamp prefix."""
+        import re
         from src.rag.ingest_companies import log_message
         
         log_file_path = tmp_path / "test.log"
@@ -42,10 +43,36 @@ class TestLogMessage:
             
             content = log_file_path.read_text()
             assert "Test message" in content
+            assert re.match(r"\[\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\] Test message\n", content)
         finally:
             if not log_file.closed:
                 log_file.close()
     
+    def test_log_message_structured_event(self, tmp_path):
+        """Test fields are written as one JSON line to the events log."""
+        import json
+        from src.rag.ingest_companies import log_message
+        import src.rag.ingest_companies
+        
+        events_path = tmp_path / "events.jsonl"
+        original = src.rag.ingest_companies.log_file, src.rag.ingest_companies.events_file
+        src.rag.ingest_companies.log_file = None
+        src.rag.ingest_companies.events_file = open(events_path, 'w', encoding='utf-8')
+        try:
+            log_message("plain line", to_console=False)
+            log_message("stored", to_console=False, fields={"event": "company_done", "company": "acme", "chunks_stored": 3})
+            src.rag.ingest_companies.events_file.close()
+        finally:
+            src.rag.ingest_companies.log_file, src.rag.ingest_companies.events_file = original
+        
+        lines = events_path.read_text().splitlines()
+        assert len(lines) == 1
+        event = json.loads(lines[0])
+        assert event["event"] == "company_done"
+        assert event["company"] == "acme"
+        assert event["chunks_stored"] == 3
+        assert "ts" in event
+    
     def test_log_message_no_console(self, capsys):
         """Test log_message doesn't write to console when to_console=False."""
         from src.rag.ingest_companies import log_message
@@ -75,6 +102,7 @@ class TestSetupLogFile:
                 log_path = setup_log_file(tmp_path)
                 assert log_path.exists()
                 assert "rag_ingestion_" in log_path.name
+                assert log_path.with_suffix(".jsonl").exists()
     
     def test_setup_log_file_returns_path(self, tmp_path):
         """Test setup_log_file returns path."""
@@ -128,10 +156,51 @@ class TestGetAllCompanies:
         assert companies == sorted(companies)
 
 
+class TestIngestionState:
+    """Tests for load_ingestion_state / save_ingestion_state."""
+    
+    def test_save_and_load_round_trip(self, tmp_path):
+        """Test saved state loads back and no temp file is left behind."""
+        from src.rag.ingest_companies import load_ingestion_state, save_ingestion_state
+        
+        state_path = tmp_path / "rag" / "ingestion_state.json"
+        save_ingestion_state(state_path, {"alpha": "abc", "beta": "def"})
+        
+        assert load_ingestion_state(state_path) == {"alpha": "abc", "beta": "def"}
+        assert list(state_path.parent.glob("*.tmp")) == []
+    
+    def test_failed_save_keeps_previous_state(self, tmp_path):
+        """Test a save interrupted mid-write leaves the previous file intact."""
+        from src.rag.ingest_companies import load_ingestion_state, save_ingestion_state
+        
+        state_path = tmp_path / "ingestion_state.json"
+        save_ingestion_state(state_path, {"alpha": "abc"})
+        
+        with patch('src.rag.ingest_companies.json.dump', side_effect=KeyboardInterrupt):
+            with pytest.raises(KeyboardInterrupt):
+                save_ingestion_state(state_path, {"alpha": "new", "beta": "def"})
+        
+        assert load_ingestion_state(state_path) == {"alpha": "abc"}
+        assert list(tmp_path.glob("*.tmp")) == []
+    
+    def test_fingerprint_includes_target(self, tmp_path):
+        """Test the same snapshot fingerprints differently per index target."""
+        from src.rag.ingest_companies import company_fingerprint
+        
+        (tmp_path / "alpha" / "initial").mkdir(parents=True)
+        (tmp_path / "alpha" / "initial" / "about.txt").write_text("About " * 20)
+        
+        same = company_fingerprint("alpha", str(tmp_path), "t/db/companies|chunks=1000/200")
+        assert same == company_fingerprint("alpha", str(tmp_path), "t/db/companies|chunks=1000/200")
+        assert same != company_fingerprint("alpha", str(tmp_path), "t/other_db/companies|chunks=1000/200")
+        assert same != company_fingerprint("alpha", str(tmp_path), "t/db/companies|chunks=500/100")
+        assert company_fingerprint("missing", str(tmp_path)) is None
+
+
 class TestIngestSingleCompany:
     """Tests for ingest_single_company function."""
     
-    @patch('src.rag.ingest_companies.load_company_data_from_disk')
+    @patch('src.rag.rag_pipeline.load_company_data_from_disk')
     @patch('src.rag.ingest_companies.log_message')
     def test_ingest_single_company_success(self, mock_log, mock_load_data, mock_vector_store, sample_scraped_data):
         """Test ingest_single_company successfully ingests."""
@@ -155,7 +224,7 @@ class TestIngestSingleCompany:
         assert result is True
         mock_vector_store.ingest_company_data.assert_called_once()
     
-    @patch('src.rag.ingest_companies.load_company_data_from_disk')
+    @patch('src.rag.rag_pipeline.load_company_data_from_disk')
     @patch('src.rag.ingest_companies.log_message')
     def test_ingest_single_company_no_data(self, mock_log, mock_load_data, mock_vector_store):
         """Test ingest_single_company when no data found."""
@@ -173,7 +242,7 @@ class TestIngestSingleCompany:
         assert result is False
         mock_vector_store.ingest_company_data.assert_not_called()
     
-    @patch('src.rag.ingest_companies.load_company_data_from_disk')
+    @patch('src.rag.rag_pipeline.load_company_data_from_disk')
     @patch('src.rag.ingest_companies.log_message')
     def test_ingest_single_company_with_errors(self, mock_log, mock_load_data, mock_vector_store, sample_scraped_data):
         """Test ingest_single_company handles errors."""
@@ -196,7 +265,7 @@ class TestIngestSingleCompany:
         
         assert result is False
     
-    @patch('src.rag.ingest_companies.load_company_data_from_disk')
+    @patch('src.rag.rag_pipeline.load_company_data_from_disk')
     @patch('src.rag.ingest_companies.log_message')
     def test_ingest_single_company_exception(self, mock_log, mock_load_data, mock_vector_store):
         """Test ingest_single_company handles exceptions."""
@@ -212,16 +281,131 @@ class TestIngestSingleCompany:
         )
         
         assert result is False
+    
+    @patch('src.rag.ingest_companies.log_message')
+    def test_failures_collected_for_summary(self, mock_log):
+        """Test failures are kept for one end-of-run summary and then cleared."""
+        from src.rag.ingest_companies import record_failure, log_failure_summary, _failures
+        
+        _failures.clear()
+        try:
+            raise RuntimeError("rate limited")
+        except RuntimeError as e:
+            record_failure("test-company", "store", e)
+        
+        assert _failures == [{'company': 'test-company', 'stage': 'store', 'error': 'rate limited'}]
+        
+        log_failure_summary()
+        
+        assert _failures == []
+        assert any("test-company" in call.args[0] and "rate limited" in call.args[0]
+                   for call in mock_log.call_args_list)
+
+
+class TestIngestCompaniesBatched:
+    """Tests for ingest_companies_batched function."""
+    
+    @patch('src.rag.rag_pipeline.load_company_data_from_disk')
+    @patch('src.rag.ingest_companies.log_message')
+    def test_embeds_all_companies_in_one_phase(self, mock_log, mock_load_data, sample_scraped_data):
+        """Test chunks from every company share one embedding call and are scattered back."""
+        from src.rag.ingest_companies import ingest_companies_batched
+        
+        mock_load_data.side_effect = lambda company, base: [] if company == "empty-co" else sample_scraped_data
+        
+        vs = Mock()
+        vs.prepare_company_chunks.side_effect = lambda company, data: {
+            'texts': [f"{company}-{i}" for i in range(2)],
+            'metadatas': [{}, {}],
+            'ids': ['a', 'b'],
+            'stats': {'errors': []}
+        }
+        vs.embed_documents_batched.side_effect = lambda texts: [[float(i)] for i in range(len(texts))]
+        vs.store_precomputed.side_effect = lambda company, prepared, embeddings, force: {
+            'chunks_stored': len(embeddings), 'errors': []
+        }
+        
+        succeeded, failed = ingest_companies_batched(
+            ["alpha", "empty-co", "beta"], "/fake/path", vs, force_refresh=True
+        )
+        
+        assert succeeded == ["alpha", "beta"]
+        assert failed == ["empty-co"]
+        vs.embed_documents_batched.assert_called_once_with(["alpha-0", "alpha-1", "beta-0", "beta-1"])
+        stored = {call.args[0]: call.args[2] for call in vs.store_precomputed.call_args_list}
+        assert stored == {"alpha": [[0.0], [1.0]], "beta": [[2.0], [3.0]]}
+        assert all(call.args[3] is True for call in vs.store_precomputed.call_args_list)
+    
+    @patch('src.rag.rag_pipeline.load_company_data_from_disk')
+    @patch('src.rag.ingest_companies.log_message')
+    def test_embedding_failure_fails_prepared_companies(self, mock_log, mock_load_data, sample_scraped_data):
+        """Test an embedding error marks every prepared company failed without storing."""
+        from src.rag.ingest_companies import ingest_companies_batched
+        from src.rag.rag_pipeline import EmbeddingServiceError
+        
+        mock_load_data.return_value = sample_scraped_data
+        vs = Mock()
+        vs.prepare_company_chunks.return_value = {'texts': ['t'], 'metadatas': [{}], 'ids': ['a'], 'stats': {}}
+        vs.embed_documents_batched.side_effect = EmbeddingServiceError("OpenAI embeddings request failed: 401")
+        
+        succeeded, failed = ingest_companies_batched(["alpha", "beta"], "/fake/path", vs)
+        
+        assert succeeded == []
+        assert failed == ["alpha", "beta"]
+        vs.store_precomputed.assert_not_called()
+        assert any("OPENAI_API_KEY" in call.args[0] for call in mock_log.call_args_list)
+    
+    @patch('src.rag.rag_pipeline.load_company_data_from_disk')
+    @patch('src.rag.ingest_companies.log_message')
+    def test_groups_are_embedded_and_stored_independently(self, mock_log, mock_load_data, sample_scraped_data):
+        """Test companies are embedded in groups and a failed group only fails its companies."""
+        from src.rag.ingest_companies import ingest_companies_batched
+        
+        mock_load_data.return_value = sample_scraped_data
+        vs = Mock()
+        vs.prepare_company_chunks.side_effect = lambda company, data: {
+            'texts': [f"{company}-{i}" for i in range(2)],
+            'metadatas': [{}, {}],
+            'ids': ['a', 'b'],
+            'stats': {'errors': []}
+        }
+        
+        def embed(texts):
+            if texts[0].startswith("beta"):
+                raise RuntimeError("timeout")
+            return [[float(len(text))] for text in texts]
+        
+        vs.embed_documents_batched.side_effect = embed
+        vs.store_precomputed.side_effect = lambda company, prepared, embeddings, force: {
+            'chunks_stored': len(embeddings), 'errors': []
+        }
+        
+        succeeded, failed = ingest_companies_batched(
+            ["alpha", "beta", "gamma"], "/fake/path", vs, embed_group_size=2
+        )
+        
+        assert succeeded == ["alpha", "gamma"]
+        assert failed == ["beta"]
+        assert vs.embed_documents_batched.call_count == 3
+        stored = {call.args[0]: call.args[2] for call in vs.store_precomputed.call_args_list}
+        assert stored == {"alpha": [[7.0], [7.0]], "gamma": [[7.0], [7.0]]}
 
 
 class TestMain:
     """Tests for main function."""
     
+    @pytest.fixture(autouse=True)
+    def isolated_ingestion_state(self, tmp_path):
+        """Keep main() from reading or writing the real ingestion state file."""
+        state_path = tmp_path / "state" / "ingestion_state.json"
+        with patch('src.rag.ingest_companies.INGESTION_STATE_PATH', state_path):
+            yield state_path
+    
     @patch('src.rag.ingest_companies.input')
     @patch('src.rag.ingest_companies.get_all_companies')
-    @patch('src.rag.ingest_companies.VectorStore')
+    @patch('src.rag.rag_pipeline.VectorStore')
     @patch('src.rag.ingest_companies.setup_log_file')
-    @patch('src.rag.ingest_companies.ingest_single_company')
+    @patch('src.rag.ingest_companies.ingest_companies_batched')
     @patch.dict('os.environ', {
         'CHROMA_API_KEY': 'test_key',
         'CHROMA_TENANT': 'test_tenant',
@@ -241,8 +425,8 @@ class TestMain:
         
         mock_setup_log.return_value = Path("/fake/log/path")
         mock_get_companies.return_value = ['company-1', 'company-2']
-        mock_input.side_effect = ['yes', 'no']  # Continue? yes, Force refresh? no
-        mock_ingest.return_value = True
+        mock_input.return_value = 'refresh'  # Continue, deleting existing data first
+        mock_ingest.return_value = (['company-1', 'company-2'], [])
         
         mock_vs_instance = Mock()
         mock_vector_store_class.return_value = mock_vs_instance
@@ -256,9 +440,110 @@ class TestMain:
                 
                 # Should not raise exception
                 try:
-                    main()
+                    with patch('sys.stdin.isatty', return_value=True):
+                        main([])
                 except SystemExit:
                     pass  # Expected when function calls sys.exit()
+        
+        mock_input.assert_called_once()
+        mock_ingest.assert_called_once()
+        assert mock_ingest.call_args.args[0] == ['company-1', 'company-2']
+        assert mock_ingest.call_args.args[3] is True
+    
+    @patch('src.rag.ingest_companies.input')
+    @patch('src.rag.ingest_companies.get_all_companies', return_value=['company-1'])
+    @patch('src.rag.rag_pipeline.VectorStore')
+    @patch('src.rag.ingest_companies.setup_log_file', return_value=Path("/fake/log/path"))
+    @patch('src.rag.ingest_companies.ingest_companies_batched', return_value=(['company-1'], []))
+    @patch.dict('os.environ', {
+        'CHROMA_API_KEY': 'test_key',
+        'CHROMA_TENANT': 'test_tenant',
+        'CHROMA_DB': 'test_db',
+        'OPENAI_API_KEY': 'test_openai_key'
+    })
+    def test_main_non_interactive(self, mock_ingest, *mocks):
+        """Test --yes skips the prompts and CLI flags reach the ingestion."""
+        from src.rag.ingest_companies import main
+        import src.rag.ingest_companies
+        mock_input = mocks[-1]
+        
+        original_log_file = src.rag.ingest_companies.log_file
+        src.rag.ingest_companies.log_file = MagicMock()
+        try:
+            main(['--yes', '--force-refresh', '--concurrency', '3'])
+        finally:
+            src.rag.ingest_companies.log_file = original_log_file
+        
+        mock_input.assert_not_called()
+        assert mock_ingest.call_args.args[3] is True
+        assert mock_ingest.call_args.kwargs['max_workers'] == 3
+    
+    @patch('src.rag.ingest_companies.get_all_companies')
+    @patch('src.rag.rag_pipeline.VectorStore')
+    @patch('src.rag.ingest_companies.setup_log_file', return_value=Path("/fake/log/path"))
+    @patch('src.rag.ingest_companies.ingest_companies_batched', return_value=(['alpha'], []))
+    @patch.dict('os.environ', {
+        'CHROMA_API_KEY': 'test_key',
+        'CHROMA_TENANT': 'test_tenant',
+        'CHROMA_DB': 'test_db',
+        'OPENAI_API_KEY': 'test_openai_key'
+    })
+    def test_main_companies_filter(self, mock_ingest, mock_setup, mock_vs, mock_get_companies, tmp_path):
+        """Test --companies ingests only the named companies that exist, without discovery."""
+        from src.rag.ingest_companies import main
+        import src.rag.ingest_companies
+        
+        (tmp_path / "alpha" / "initial").mkdir(parents=True)
+        (tmp_path / "beta").mkdir()
+        
+        original_log_file = src.rag.ingest_companies.log_file
+        src.rag.ingest_companies.log_file = MagicMock()
+        try:
+            with patch.dict('os.environ', {'DATA_PATH': str(tmp_path)}):
+                main(['--yes', '--companies', 'alpha, beta,missing'])
+        finally:
+            src.rag.ingest_companies.log_file = original_log_file
+        
+        mock_get_companies.assert_not_called()
+        assert mock_ingest.call_args.args[0] == ['alpha']
+    
+    @patch('src.rag.rag_pipeline.VectorStore')
+    @patch('src.rag.ingest_companies.setup_log_file', return_value=Path("/fake/log/path"))
+    @patch('src.rag.ingest_companies.ingest_companies_batched')
+    @patch.dict('os.environ', {
+        'CHROMA_API_KEY': 'test_key',
+        'CHROMA_TENANT': 'test_tenant',
+        'CHROMA_DB': 'test_db',
+        'OPENAI_API_KEY': 'test_openai_key'
+    })
+    def test_main_skips_unchanged_companies(self, mock_ingest, mock_setup, mock_vs, tmp_path, isolated_ingestion_state):
+        """Test a second run only ingests companies whose snapshot changed."""
+        import json
+        from src.rag.ingest_companies import main
+        import src.rag.ingest_companies
+        
+        data_path = tmp_path / "raw"
+        for company in ("alpha", "beta"):
+            (data_path / company / "initial").mkdir(parents=True)
+            (data_path / company / "initial" / "about.txt").write_text("About " * 20)
+        mock_ingest.side_effect = lambda companies, *args, **kwargs: (list(companies), [])
+        
+        original_log_file = src.rag.ingest_companies.log_file
+        src.rag.ingest_companies.log_file = MagicMock()
+        try:
+            with patch.dict('os.environ', {'DATA_PATH': str(data_path)}):
+                main(['--yes'])
+                (data_path / "beta" / "initial" / "about.txt").write_text("Changed " * 20)
+                main(['--yes'])
+                with pytest.raises(SystemExit):
+                    main(['--yes'])  # nothing left to ingest
+                with patch.dict('os.environ', {'CHROMA_DB': 'other_db'}):
+                    main(['--yes'])  # a new target re-ingests everything
+        finally:
+            src.rag.ingest_companies.log_file = original_log_file
+        
+        assert [call.args[0] for call in mock_ingest.call_args_list] == [['alpha', 'beta'], ['beta'], ['alpha', 'beta']]
+        assert set(json.loads(isolated_ingestion_state.read_text())) == {'alpha', 'beta'}
     
     @patch.dict('os.environ', {}, clear=True)
     @patch('src.rag.ingest_companies.setup_log_file')
@@ -284,7 +569,7 @@ class TestMain:
             mock_getenv.side_effect = lambda key, default=None: default if key == 'DATA_PATH' else None
             try:
                 with pytest.raises(SystemExit):
-                    main()
+                    main([])
             finally:
                 # Restore original log_file
                 src.rag.ingest_companies.log_file = original_log_file
@@ -320,9 +605,9 @@ class TestMain:
         try:
             with patch('chromadb.CloudClient'):
                 with patch('langchain_openai.OpenAIEmbeddings'):
-                    with patch('src.rag.ingest_companies.VectorStore'):
+                    with patch('src.rag.rag_pipeline.VectorStore'):
                         with pytest.raises(SystemExit):
-                            main()
+                            main([])
         finally:
             # Restore original log_file
             src.rag.ingest_companies.log_file = original_log_file
@@ -54,6 +54,25 @@ class TestCompanyRegistry:
             result = load_company_registry()
             assert result == test_data
     
+    def test_load_company_registry_cached_until_file_changes(self, tmp_path):
+        """Test the parsed registry is reused until the file is rewritten."""
+        from src.rag.rag_pipeline import load_company_registry
+        import os
+        
+        registry_file = tmp_path / "companies_registry.json"
+        registry_file.write_text(json.dumps({"a": {"chunks_count": 1}}))
+        
+        with patch('src.rag.rag_pipeline.get_registry_path', return_value=registry_file):
+            first = load_company_registry()
+            first["mutated"] = {}
+            with patch('src.rag.rag_pipeline.json.load') as mock_load:
+                assert load_company_registry() == {"a": {"chunks_count": 1}}
+                mock_load.assert_not_called()
+            
+            registry_file.write_text(json.dumps({"b": {"chunks_count": 22}}))
+            os.utime(registry_file, ns=(0, 0))
+            assert load_company_registry() == {"b": {"chunks_count": 22}}
+    
     def test_save_company_registry(self, tmp_path):
         """Test save_company_registry saves data."""
         from src.rag.rag_pipeline import save_company_registry
@@ -64,6 +83,7 @@ class TestCompanyRegistry:
         with patch('src.rag.rag_pipeline.get_registry_path', return_value=registry_file):
             save_company_registry(test_data)
             assert registry_file.exists()
+            assert list(tmp_path.glob("*.tmp")) == []
             loaded = json.loads(registry_file.read_text())
             assert loaded == test_data
     
@@ -157,6 +177,9 @@ class TestLoadCompanyDataFromDisk:
         assert len(result) >= 2
         assert any(item['source_type'] == 'homepage' for item in result)
         assert any(item['source_type'] == 'about' for item in result)
+        homepage = next(item for item in result if item['source_type'] == 'homepage')
+        assert homepage['source_url'] == "https://test-company.com"
+        assert homepage['crawled_at'] == "2024-01-01T00:00:00Z"
     
     def test_load_company_data_from_disk_not_exists(self, tmp_path):
         """Test loading when company directory doesn't exist."""
@@ -178,6 +201,18 @@ class TestLoadCompanyDataFromDisk:
         result = load_company_data_from_disk("test-company", str(tmp_path))
         # Should skip files with less than 50 characters
         assert len(result) == 0
+    
+    def test_load_company_data_from_disk_normalizes_newlines(self, tmp_path):
+        """Test CRLF and CR line endings are read as LF, as in text mode."""
+        from src.rag.rag_pipeline import load_company_data_from_disk
+        
+        company_dir = tmp_path / "test-company" / "initial"
+        company_dir.mkdir(parents=True)
+        
+        (company_dir / "about.txt").write_bytes(b"First line of the about page\r\nSecond line\rThird line here\n")
+        
+        result = load_company_data_from_disk("test-company", str(tmp_path))
+        assert result[0]['text'] == "First line of the about page\nSecond line\nThird line here\n"
 
 
 class TestVectorStore:
@@ -314,6 +349,125 @@ class TestVectorStore:
         assert stats['chunks_created'] > 0
         assert stats['chunks_stored'] > 0
     
+    @patch('src.rag.rag_pipeline.chromadb.CloudClient')
+    @patch('src.rag.rag_pipeline.OpenAIEmbeddings')
+    @patch('src.rag.rag_pipeline.register_company')
+    def test_vector_store_store_precomputed_batches_adds(self, mock_register, mock_embeddings, mock_chromadb):
+        """Test records are written to ChromaDB in concurrent add_batch_size slices."""
+        from src.rag.rag_pipeline import VectorStore
+        
+        mock_client = Mock()
+        mock_collection = Mock()
+        mock_client.get_or_create_collection.return_value = mock_collection
+        mock_chromadb.return_value = mock_client
+        
+        vs = VectorStore(
+            api_key="test_key",
+            tenant="test_tenant",
+            database="test_db",
+            openai_api_key="test_openai_key",
+            add_batch_size=250
+        )
+        
+        count = 600
+        prepared = {
+            'texts': [f"chunk {i}" for i in range(count)],
+            'metadatas': [{'chunk_index': i} for i in range(count)],
+            'ids': [f"id-{i}" for i in range(count)],
+            'stats': {'sources_processed': 1, 'chunks_created': count, 'chunks_stored': 0, 'errors': []}
+        }
+        stats = vs.store_precomputed("test-company", prepared, [[0.1]] * count)
+        
+        assert stats['chunks_stored'] == count
+        # Batches are sent concurrently, so compare without relying on call order
+        batches = [call.kwargs['ids'] for call in mock_collection.add.call_args_list]
+        assert sorted(len(ids) for ids in batches) == [100, 250, 250]
+        assert sorted(id_ for ids in batches for id_ in ids) == sorted(prepared['ids'])
+    
+    @patch('src.rag.rag_pipeline.chromadb.CloudClient')
+    @patch('src.rag.rag_pipeline.OpenAIEmbeddings')
+    def test_vector_store_embed_documents_batched(self, mock_embeddings, mock_chromadb):
+        """Test documents are embedded in slices and reassembled in order."""
+        from src.rag.rag_pipeline import VectorStore
+        
+        mock_client = Mock()
+        mock_client.get_or_create_collection.return_value = Mock()
+        mock_chromadb.return_value = mock_client
+        
+        mock_emb = Mock()
+        mock_emb.embed_documents.side_effect = lambda texts: [[float(t)] for t in texts]
+        mock_embeddings.return_value = mock_emb
+        
+        vs = VectorStore(
+            api_key="test_key",
+            tenant="test_tenant",
+            database="test_db",
+            openai_api_key="test_openai_key"
+        )
+        
+        texts = [str(i) for i in range(5)]
+        embeddings = vs.embed_documents_batched(texts, batch_size=2, max_workers=3)
+        
+        assert embeddings == [[0.0], [1.0], [2.0], [3.0], [4.0]]
+        assert mock_emb.embed_documents.call_count == 3
+        assert vs.embed_documents_batched([]) == []
+        
+        mock_emb.embed_documents.reset_mock()
+        assert vs.embed_documents_batched(["7", "8", "7"]) == [[7.0], [8.0], [7.0]]
+        mock_emb.embed_documents.assert_called_once_with(["7", "8"])
+    
+    @patch('src.rag.rag_pipeline.chromadb.CloudClient')
+    @patch('src.rag.rag_pipeline.OpenAIEmbeddings')
+    def test_vector_store_embed_documents_uses_cache(self, mock_embeddings, mock_chromadb, tmp_path):
+        """Test cached texts are not re-embedded and duplicate misses are embedded once."""
+        from src.rag.rag_pipeline import VectorStore
+        
+        mock_client = Mock()
+        mock_client.get_or_create_collection.return_value = Mock()
+        mock_chromadb.return_value = mock_client
+        
+        mock_emb = Mock()
+        mock_emb.embed_documents.side_effect = lambda texts: [[float(t)] for t in texts]
+        mock_embeddings.return_value = mock_emb
+        
+        vs = VectorStore(
+            api_key="test_key",
+            tenant="test_tenant",
+            database="test_db",
+            openai_api_key="test_openai_key",
+            embedding_cache_path=str(tmp_path / "emb.sqlite")
+        )
+        
+        assert vs.embed_documents_batched(["1", "2"]) == [[1.0], [2.0]]
+        assert vs.embed_documents_batched(["2", "3", "3", "1"]) == [[2.0], [3.0], [3.0], [1.0]]
+        
+        sent = [call.args[0] for call in mock_emb.embed_documents.call_args_list]
+        assert sent == [["1", "2"], ["3"]]
+    
+    @patch('src.rag.rag_pipeline.chromadb.CloudClient')
+    @patch('src.rag.rag_pipeline.OpenAIEmbeddings')
+    def test_vector_store_embedding_failure_is_distinctive(self, mock_embeddings, mock_chromadb):
+        """Test a failing embeddings request raises EmbeddingServiceError."""
+        from src.rag.rag_pipeline import VectorStore, EmbeddingServiceError
+        
+        mock_client = Mock()
+        mock_client.get_or_create_collection.return_value = Mock()
+        mock_chromadb.return_value = mock_client
+        
+        mock_emb = Mock()
+        mock_emb.embed_documents.side_effect = RuntimeError("invalid api key")
+        mock_embeddings.return_value = mock_emb
+        
+        vs = VectorStore(
+            api_key="test_key",
+            tenant="test_tenant",
+            database="test_db",
+            openai_api_key="test_openai_key"
+        )
+        
+        with pytest.raises(EmbeddingServiceError, match="invalid api key"):
+            vs.embed_documents_batched(["a", "b"])
+    
     @patch('src.rag.rag_pipeline.chromadb.CloudClient')
     @patch('src.rag.rag_pipeline.OpenAIEmbeddings')
     def test_vector_store_delete_company_data(self, mock_embeddings, mock_chromadb):
@@ -322,9 +476,6 @@ class TestVectorStore:
         
         mock_client = Mock()
         mock_collection = Mock()
-        mock_collection.get.return_value = {
-            'ids': ['id1', 'id2', 'id3']
-        }
         mock_client.get_or_create_collection.return_value = mock_collection
         mock_chromadb.return_value = mock_client
         
@@ -335,10 +486,12 @@ class TestVectorStore:
             openai_api_key="test_openai_key"
         )
         
-        vs._delete_company_data("test-company")
+        with patch('src.rag.rag_pipeline.unregister_company') as mock_unregister:
+            vs._delete_company_data("test-company")
         
-        mock_collection.get.assert_called_once_with(where={"company_name": "test-company"})
-        mock_collection.delete.assert_called_once_with(ids=['id1', 'id2', 'id3'])
+        mock_collection.get.assert_not_called()
+        mock_collection.delete.assert_called_once_with(where={"company_name": "test-company"})
+        mock_unregister.assert_called_once()
     
     @patch('src.rag.rag_pipeline.chromadb.CloudClient')
     @patch('src.rag.rag_pipeline.OpenAIEmbeddings')
@@ -422,7 +575,8 @@ class TestVectorStore:
         mock_client = Mock()
         mock_collection = Mock()
         mock_collection.get.return_value = {
-            'documents': ['doc1', 'doc2', 'doc3'],
+            'ids': ['id1', 'id2', 'id3'],
+            'documents': None,
             'metadatas': [
                 {'company_name': 'company-1', 'source_type': 'homepage'},
                 {'company_name': 'company-2', 'source_type': 'about'},
@@ -441,7 +595,390 @@ class TestVectorStore:
         
         stats = vs.get_stats()
         
+        mock_collection.get.assert_called_once_with(include=["metadatas"])
         assert stats['total_chunks'] == 3
         assert stats['total_companies'] == 2
         assert 'company-1' in stats['companies']
         assert 'company-2' in stats['companies']
+        assert stats['chunks_per_company'] == {'company-1': 2, 'company-2': 1}
+    
+    @patch('src.rag.rag_pipeline.load_company_registry', return_value={"test-company": {"chunks_count": 3}})
+    @patch('src.rag.rag_pipeline.chromadb.CloudClient')
+    @patch('src.rag.rag_pipeline.OpenAIEmbeddings')
+    def test_vector_store_search_local_index(self, mock_embeddings, mock_chromadb, mock_registry):
+        """Test local_index_ttl serves searches from one in-memory load of the company."""
+        from src.rag.rag_pipeline import VectorStore
+        import numpy as np
+        
+        mock_client = Mock()
+        mock_collection = Mock()
+        mock_collection.get.return_value = {
+            'ids': ['a', 'b', 'c'],
+            'documents': ['doc a', 'doc b', 'doc c'],
+            'metadatas': [{'source_type': 'homepage'}, {'source_type': 'about'}, {'source_type': 'blog'}],
+            'embeddings': np.array([[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]])
+        }
+        mock_client.get_or_create_collection.return_value = mock_collection
+        mock_chromadb.return_value = mock_client
+        
+        vs = VectorStore(
+            api_key="test_key",
+            tenant="test_tenant",
+            database="test_db",
+            openai_api_key="test_openai_key",
+            local_index_ttl=60
+        )
+        
+        results = vs.search("test-company", "query", top_k=2, query_embedding=[0.0, 1.0])
+        assert [r['text'] for r in results] == ['doc b', 'doc c']
+        # Vectors are held as int8, so distances are close but not exact
+        assert results[0]['distance'] == pytest.approx(0.0, abs=1e-2)
+        assert results[1]['distance'] == pytest.approx(0.4, abs=1e-2)
+        
+        per_query = vs.multi_search(
+            "test-company", ["q1", "q2"], top_k_per_query=1,
+            query_embeddings=[[1.0, 0.0], [0.0, 1.0]], include_embeddings=True
+        )
+        assert [[r['text'] for r in rs] for rs in per_query] == [['doc a'], ['doc b']]
+        assert list(per_query[0][0]['embedding']) == pytest.approx([1.0, 0.0], abs=1e-2)
+        
+        mock_collection.get.assert_called_once()
+        mock_collection.query.assert_not_called()
+        
+        # Re-ingesting the company drops its local index
+        with patch('src.rag.rag_pipeline.unregister_company'):
+            vs._delete_company_data("test-company")
+        vs.search("test-company", "query", top_k=1, query_embedding=[1.0, 0.0])
+        assert mock_collection.get.call_count == 2
+    
+    @patch('src.rag.rag_pipeline.load_company_registry', return_value={"test-company": {"chunks_count": 3}})
+    @patch('src.rag.rag_pipeline.chromadb.CloudClient')
+    @patch('src.rag.rag_pipeline.OpenAIEmbeddings')
+    def test_vector_store_local_index_pages_and_loads_once(self, mock_embeddings, mock_chromadb, mock_registry):
+        """Test concurrent cold searches share one paged load of the company."""
+        from src.rag.rag_pipeline import VectorStore
+        from concurrent.futures import ThreadPoolExecutor
+        import numpy as np
+        import time
+        
+        pages = [
+            {'ids': ['a', 'b'], 'documents': ['doc a', 'doc b'],
+             'metadatas': [{}, {}], 'embeddings': np.array([[1.0, 0.0], [0.0, 1.0]])},
+            {'ids': ['c'], 'documents': ['doc c'],
+             'metadatas': [{}], 'embeddings': np.array([[0.6, 0.8]])}
+        ]
+        
+        def get_page(**kwargs):
+            time.sleep(0.05)
+            return pages[kwargs['offset'] // kwargs['limit']]
+        
+        mock_client = Mock()
+        mock_collection = Mock()
+        mock_collection.get.side_effect = get_page
+        mock_client.get_or_create_collection.return_value = mock_collection
+        mock_chromadb.return_value = mock_client
+        
+        vs = VectorStore(
+            api_key="test_key",
+            tenant="test_tenant",
+            database="test_db",
+            openai_api_key="test_openai_key",
+            local_index_ttl=60
+        )
+        vs._LOCAL_INDEX_PAGE = 2
+        
+        # Blocks smaller than the index exercise the blockwise dot products
+        with patch.object(VectorStore, '_LOCAL_SEARCH_BLOCK', 2), \
+                ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(
+                lambda _: vs.search("test-company", "query", top_k=3, query_embedding=[0.0, 1.0]),
+                range(4)
+            ))
+        
+        assert all([r['text'] for r in rs] == ['doc b', 'doc c', 'doc a'] for rs in results)
+        assert [c.kwargs['offset'] for c in mock_collection.get.call_args_list] == [0, 2]
+        mock_collection.query.assert_not_called()
+    
+    @patch('src.rag.rag_pipeline.load_company_registry', return_value={"test-company": {"chunks_count": 3}})
+    @patch('src.rag.rag_pipeline.chromadb.CloudClient')
+    @patch('src.rag.rag_pipeline.OpenAIEmbeddings')
+    def test_vector_store_local_index_failure_falls_back(self, mock_embeddings, mock_chromadb, mock_registry):
+        """Test a failed local index load queries ChromaDB instead of returning nothing."""
+        from src.rag.rag_pipeline import VectorStore
+        
+        mock_client = Mock()
+        mock_collection = Mock()
+        mock_collection.get.side_effect = RuntimeError("chroma timeout")
+        mock_collection.query.return_value = {
+            'documents': [['doc1']],
+            'metadatas': [[{'source_type': 'homepage'}]],
+            'distances': [[0.1]]
+        }
+        mock_client.get_or_create_collection.return_value = mock_collection
+        mock_chromadb.return_value = mock_client
+        
+        vs = VectorStore(
+            api_key="test_key",
+            tenant="test_tenant",
+            database="test_db",
+            openai_api_key="test_openai_key",
+            local_index_ttl=60
+        )
+        
+        results = vs.search("test-company", "query", top_k=1, query_embedding=[0.0, 1.0])
+        
+        assert [r['text'] for r in results] == ['doc1']
+        mock_collection.query.assert_called_once()
+    
+    @patch('src.rag.rag_pipeline.load_company_registry')
+    @patch('src.rag.rag_pipeline.chromadb.CloudClient')
+    @patch('src.rag.rag_pipeline.OpenAIEmbeddings')
+    def test_vector_store_local_index_follows_registry(self, mock_embeddings, mock_chromadb, mock_registry):
+        """Test unknown companies are not indexed and a changed chunk count forces a reload."""
+        from src.rag.rag_pipeline import VectorStore
+        import numpy as np
+        
+        mock_client = Mock()
+        mock_collection = Mock()
+        mock_collection.get.return_value = {
+            'ids': ['a'], 'documents': ['doc a'], 'metadatas': [{}],
+            'embeddings': np.array([[1.0, 0.0]])
+        }
+        mock_collection.query.return_value = {'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
+        mock_client.get_or_create_collection.return_value = mock_collection
+        mock_chromadb.return_value = mock_client
+        mock_registry.return_value = {"test-company": {"chunks_count": 1}}
+        
+        vs = VectorStore(
+            api_key="test_key",
+            tenant="test_tenant",
+            database="test_db",
+            openai_api_key="test_openai_key",
+            local_index_ttl=60
+        )
+        
+        # Unknown company: queried in ChromaDB, never bulk-loaded or tracked
+        vs.search("no-such-company", "query", top_k=1, query_embedding=[1.0, 0.0])
+        mock_collection.get.assert_not_called()
+        mock_collection.query.assert_called_once()
+        assert vs._local_index_loads == {}
+        
+        vs.search("test-company", "query", top_k=1, query_embedding=[1.0, 0.0])
+        vs.search("test-company", "query", top_k=1, query_embedding=[1.0, 0.0])
+        assert mock_collection.get.call_count == 1
+        
+        # Re-ingested by another process: the registered chunk count changed
+        mock_registry.return_value = {"test-company": {"chunks_count": 2}}
+        vs.search("test-company", "query", top_k=1, query_embedding=[1.0, 0.0])
+        assert mock_collection.get.call_count == 2
+    
+    @patch('src.rag.rag_pipeline.chromadb.CloudClient')
+    @patch('src.rag.rag_pipeline.OpenAIEmbeddings')
+    def test_vector_store_search_precomputed_embedding(self, mock_embeddings, mock_chromadb):
+        """Test search skips the embedding call when an embedding is supplied."""
+        from src.rag.rag_pipeline import VectorStore
+        
+        mock_client = Mock()
+        mock_collection = Mock()
+        mock_collection.query.return_value = {
+            'documents': [['doc1']],
+            'metadatas': [[{'company_name': 'test-company', 'source_type': 'homepage'}]],
+            'distances': [[0.1]]
+        }
+        mock_client.get_or_create_collection.return_value = mock_collection
+        mock_chromadb.return_value = mock_client
+        
+        mock_emb = Mock()
+        mock_embeddings.return_value = mock_emb
+        
+        vs = VectorStore(
+            api_key="test_key",
+            tenant="test_tenant",
+            database="test_db",
+            openai_api_key="test_openai_key"
+        )
+        
+        results = vs.search("test-company", "test query", top_k=5, query_embedding=[0.2] * 384)
+        
+        assert len(results) == 1
+        mock_emb.embed_query.assert_not_called()
+        assert mock_collection.query.call_args.kwargs['query_embeddings'] == [[0.2] * 384]
+    
+    @patch('src.rag.rag_pipeline.chromadb.CloudClient')
+    @patch('src.rag.rag_pipeline.OpenAIEmbeddings')
+    def test_vector_store_embed_queries_cached(self, mock_embeddings, mock_chromadb):
+        """Test repeated queries are served from the query embedding cache."""
+        from src.rag.rag_pipeline import VectorStore
+        
+        mock_client = Mock()
+        mock_client.get_or_create_collection.return_value = Mock()
+        mock_chromadb.return_value = mock_client
+        
+        mock_emb = Mock()
+        mock_emb.embed_documents.side_effect = lambda texts: [[float(len(t))] for t in texts]
+        mock_embeddings.return_value = mock_emb
+        
+        vs = VectorStore(
+            api_key="test_key",
+            tenant="test_tenant",
+            database="test_db",
+            openai_api_key="test_openai_key"
+        )
+        
+        first = vs.embed_queries(["funding round", "awards"])
+        second = vs.embed_queries(["Funding Round", "  awards ", "hiring"])
+        
+        assert first == [[13.0], [6.0]]
+        assert second == [[13.0], [6.0], [6.0]]
+        # Surrounding whitespace shares a cache entry; a different case does not,
+        # and misses are embedded with the caller's original text
+        assert mock_emb.embed_documents.call_count == 2
+        mock_emb.embed_documents.assert_called_with(["Funding Round", "hiring"])
+        
+        vs.embed_query("awards")
+        mock_emb.embed_query.assert_not_called()
+        
+        mock_emb.embed_query.return_value = [1.0]
+        vs.embed_query("AAPL outlook ")
+        mock_emb.embed_query.assert_called_once_with("AAPL outlook ")
+    
+    @patch('src.rag.rag_pipeline.chromadb.CloudClient')
+    @patch('src.rag.rag_pipeline.OpenAIEmbeddings')
+    def test_vector_store_query_cache_evicts_lru(self, mock_embeddings, mock_chromadb):
+        """Test the query embedding cache evicts least recently used entries."""
+        from src.rag.rag_pipeline import VectorStore
+        
+        mock_client = Mock()
+        mock_client.get_or_create_collection.return_value = Mock()
+        mock_chromadb.return_value = mock_client
+        
+        mock_emb = Mock()
+        mock_emb.embed_query.side_effect = lambda text: [float(len(text))]
+        mock_embeddings.return_value = mock_emb
+        
+        vs = VectorStore(
+            api_key="test_key",
+            tenant="test_tenant",
+            database="test_db",
+            openai_api_key="test_openai_key",
+            query_cache_size=2
+        )
+        
+        vs.embed_query("a")
+        vs.embed_query("bb")
+        vs.embed_query("a")      # refresh "a"
+        vs.embed_query("ccc")    # evicts "bb"
+        vs.embed_query("bb")
+        
+        assert mock_emb.embed_query.call_count == 4
+    
+    @patch('src.rag.rag_pipeline.chromadb.CloudClient')
+    @patch('src.rag.rag_pipeline.OpenAIEmbeddings')
+    def test_vector_store_multi_search(self, mock_embeddings, mock_chromadb):
+        """Test multi_search issues one embedding call and one ChromaDB query."""
+        from src.rag.rag_pipeline import VectorStore
+        
+        mock_client = Mock()
+        mock_collection = Mock()
+        mock_collection.query.return_value = {
+            'documents': [['doc1', 'doc2'], ['doc3']],
+            'metadatas': [
+                [
+                    {'company_name': 'test-company', 'source_type': 'homepage', 'chunk_index': 0},
+                    {'company_name': 'test-company', 'source_type': 'about', 'chunk_index': 1}
+                ],
+                [{'company_name': 'test-company', 'source_type': 'blog', 'chunk_index': 2}]
+            ],
+            'distances': [[0.1, 0.2], [0.3]]
+        }
+        mock_client.get_or_create_collection.return_value = mock_collection
+        mock_chromadb.return_value = mock_client
+        
+        mock_emb = Mock()
+        mock_emb.embed_documents.return_value = [[0.1] * 384, [0.2] * 384]
+        mock_embeddings.return_value = mock_emb
+        
+        vs = VectorStore(
+            api_key="test_key",
+            tenant="test_tenant",
+            database="test_db",
+            openai_api_key="test_openai_key"
+        )
+        
+        results = vs.multi_search("test-company", ["funding", "press"], top_k_per_query=2)
+        
+        assert [len(r) for r in results] == [2, 1]
+        assert results[1][0]['source_type'] == 'blog'
+        assert results[1][0]['distance'] == 0.3
+        mock_emb.embed_documents.assert_called_once_with(["funding", "press"])
+        mock_collection.query.assert_called_once_with(
+            query_embeddings=[[0.1] * 384, [0.2] * 384],
+            n_results=2,
+            where={"company_name": "test-company"},
+            include=["documents", "metadatas", "distances"]
+        )
+        assert 'embedding' not in results[0][0]
+    
+    @patch('src.rag.rag_pipeline.chromadb.CloudClient')
+    @patch('src.rag.rag_pipeline.OpenAIEmbeddings')
+    def test_vector_store_multi_search_include_embeddings(self, mock_embeddings, mock_chromadb):
+        """Test multi_search attaches stored vectors when requested."""
+        from src.rag.rag_pipeline import VectorStore
+        
+        mock_client = Mock()
+        mock_collection = Mock()
+        mock_collection.query.return_value = {
+            'documents': [['doc1']],
+            'metadatas': [[{'company_name': 'test-company', 'source_type': 'homepage', 'chunk_index': 0}]],
+            'distances': [[0.1]],
+            'embeddings': [[[0.5, 0.5]]]
+        }
+        mock_client.get_or_create_collection.return_value = mock_collection
+        mock_chromadb.return_value = mock_client
+        
+        vs = VectorStore(
+            api_key="test_key",
+            tenant="test_tenant",
+            database="test_db",
+            openai_api_key="test_openai_key"
+        )
+        
+        results = vs.multi_search(
+            "test-company", ["funding"], query_embeddings=[[0.1] * 384], include_embeddings=True
+        )
+        
+        assert results[0][0]['embedding'] == [0.5, 0.5]
+        _, kwargs = mock_collection.query.call_args
+        assert "embeddings" in kwargs['include']
+
+
+class TestMaximalMarginalRelevance:
+    """Tests for maximal_marginal_relevance function."""
+    
+    def test_mmr_prefers_diverse_chunks(self):
+        """Test a near-duplicate of the best chunk loses to a diverse one."""
+        from src.rag.rag_pipeline import maximal_marginal_relevance
+        
+        chunks = [
+            {'text': 'best', 'distance': 0.10, 'embedding': [1.0, 0.0]},
+            {'text': 'duplicate', 'distance': 0.12, 'embedding': [0.99, 0.01]},
+            {'text': 'diverse', 'distance': 0.30, 'embedding': [0.0, 1.0]}
+        ]
+        
+        selected = maximal_marginal_relevance(chunks, top_k=2)
+        
+        assert [c['text'] for c in selected] == ['best', 'diverse']
+    
+    def test_mmr_without_embeddings_falls_back_to_distance(self):
+        """Test chunks without embeddings are ranked by distance."""
+        from src.rag.rag_pipeline import maximal_marginal_relevance
+        
+        chunks = [
+            {'text': 'far', 'distance': 0.9},
+            {'text': 'near', 'distance': 0.1},
+            {'text': 'mid', 'distance': 0.5}
+        ]
+        
+        selected = maximal_marginal_relevance(chunks, top_k=2)
+        
+        assert [c['text'] for c in selected] == ['near', 'mid']